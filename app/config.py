@@ -7,13 +7,143 @@ class Settings(BaseSettings):
     APP_NAME: str = "AI Doctor Assistant API"
     APP_VERSION: str = "1.0.0"
     DEBUG: bool = True
+    # Worker processes for `python -m app.server` (0 = one per CPU)
+    WEB_CONCURRENCY: int = 0
 
     DATABASE_URL: str = "sqlite:///./doctor_assistant.db"
+    # Derived from DATABASE_URL when unset (sqlite -> sqlite+aiosqlite)
+    ASYNC_DATABASE_URL: str | None = None
+    # False serves requests through the sync engine in the threadpool
+    DATABASE_ASYNC: bool = True
+    # Optional replica for GET requests; defaults to DATABASE_URL
+    READ_DATABASE_URL: str | None = None
+
+    # "production" applies the pragmas/pools below; "default" is a bare engine
+    DATABASE_ENGINE_PROFILE: str = "production"
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_FOREIGN_KEYS: bool = True
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB
+    # Concurrent write requests; SQLite itself serializes their transactions
+    SQLITE_WRITE_POOL_SIZE: int = 8
+    SQLITE_READ_POOL_SIZE: int = 8
+    DB_POOL_SIZE: int = 10
+    DB_READ_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    # Apply migrations at startup instead of via `python -m app.migrations`
+    # (single-process development only; workers would race on the DDL)
+    DATABASE_AUTO_MIGRATE: bool = False
 
     SECRET_KEY: str = "your-secret-key-change-in-production"
+    # Shared key files (fernet.keys, secret_key); see app/utils/keystore.py
+    KEYSTORE_DIR: str = "./keys"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     OTP_EXPIRY_MINUTES: int = 10
+    # OTP store: "memory" (per process) or "sqlite" (shared across workers)
+    OTP_BACKEND: str = "memory"
+    OTP_SQLITE_PATH: str = "./otp_codes.db"
+    OTP_MAX_ATTEMPTS: int = 5
+    OTP_SWEEP_INTERVAL_SECONDS: float = 60.0
+
+    # Notification outbox; SMS_PROVIDER names a registered transport
+    SMS_PROVIDER: str = "file"
+    OUTBOX_FILE_PATH: str = "./outbox.jsonl"
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL_SECONDS: float = 5.0
+    OUTBOX_LEASE_SECONDS: float = 60.0
+    OUTBOX_MAX_ATTEMPTS: int = 8
+    OUTBOX_RETRY_BASE_SECONDS: float = 2.0
+    OUTBOX_RETRY_MAX_SECONDS: float = 600.0
+
+    # Authenticated-principal cache used by get_current_user
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 60.0
+    # TTL cap under app.server with several workers (invalidation is per process)
+    PRINCIPAL_CACHE_MULTI_WORKER_TTL_SECONDS: float = 5.0
+
+    # Argon2 worker pool: concurrent hashes, extra waiters, 503 back-off hint
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+    # False runs hashes in the threadpool instead of worker processes
+    PASSWORD_HASH_USE_PROCESSES: bool = True
+
+    # Keyset pagination for list endpoints
+    PAGE_DEFAULT_LIMIT: int = 100
+    PAGE_MAX_LIMIT: int = 500
+
+    # orjson responses and precompiled list serializers (needs orjson)
+    FAST_JSON: bool = False
+
+    # Prometheus /metrics endpoint and request instrumentation
+    METRICS_ENABLED: bool = True
+    # Serve /metrics without X-Admin-Token (only when the port is private)
+    METRICS_PUBLIC: bool = False
+
+    # Serialized JSON of per-user list responses, keyed by collection version
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000  # (user, collection) groups
+
+    # Per-request SQL tracking (Server-Timing, slow query log)
+    SQL_INSTRUMENTATION_ENABLED: bool = True
+    SQL_SLOW_QUERY_MS: float = 200.0
+    # Strict N+1 mode for tests: fail a request repeating a statement more often (0 = off)
+    SQL_MAX_REPEATED_STATEMENTS: int = 0
+
+    # Maximum number of items accepted by the /bulk endpoints
+    BULK_MAX_ITEMS: int = 500
+
+    # Plaintext cache and worker pool for Fernet-encrypted fields
+    DECRYPT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    DECRYPT_CACHE_MAX_ENTRIES: int = 100000
+    DECRYPT_BATCH_THRESHOLD: int = 64
+    DECRYPT_BATCH_CHUNK_SIZE: int = 128
+    DECRYPT_WORKERS: int = 4
+
+    # Rate limiting for /auth endpoints ("<count>/<period>")
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # or "sqlite" to share across workers
+    RATE_LIMIT_SQLITE_PATH: str = "./rate_limits.db"
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False
+    RATE_LIMIT_LOGIN_PER_IP: str = "30/minute"
+    RATE_LIMIT_LOGIN_PER_PHONE: str = "5/minute"
+    RATE_LIMIT_FORGOT_PASSWORD_PER_IP: str = "10/minute"
+    RATE_LIMIT_FORGOT_PASSWORD_PER_PHONE: str = "3/15 minutes"
+    RATE_LIMIT_OTP_PER_IP: str = "30/minute"
+    RATE_LIMIT_OTP_PER_PHONE: str = "5/10 minutes"
+
+    # Content-addressed storage for lab/scan test uploads
+    FILE_STORAGE_DIR: str = "./storage"
+    FILE_MAX_UPLOAD_BYTES: int = 50 * 1024 * 1024
+    # Unreferenced blobs younger than this are kept (in-flight duplicate uploads)
+    FILE_GC_GRACE_SECONDS: float = 300.0
+    # How often blobs left behind by the grace period are swept
+    FILE_GC_INTERVAL_SECONDS: float = 3600.0
+
+    # Delta sync (GET /sync) page size and change log compaction
+    SYNC_PAGE_DEFAULT_LIMIT: int = 200
+    SYNC_PAGE_MAX_LIMIT: int = 1000
+    CHANGE_LOG_COMPACT_INTERVAL_SECONDS: float = 3600.0
+
+    # Live updates (GET /live/events): per-subscriber queue bound (full = evicted),
+    # subscribers per worker, change log polling and stream keepalives
+    LIVE_QUEUE_SIZE: int = 64
+    LIVE_MAX_SUBSCRIBERS: int = 10000
+    LIVE_POLL_INTERVAL_SECONDS: float = 1.0
+    LIVE_FEED_BATCH_SIZE: int = 1000
+    LIVE_HEARTBEAT_SECONDS: float = 15.0
+    LIVE_RETRY_MS: int = 5000
+    LIVE_REPLAY_LIMIT: int = 500
+
+    # NDJSON exports: rows fetched per server-side cursor batch
+    EXPORT_YIELD_PER: int = 1000
+    # Token for the /admin endpoints (X-Admin-Token); unset disables them
+    ADMIN_API_TOKEN: str | None = None
 
     class Config:
         env_file = ".env"
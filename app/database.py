@@ -1,22 +1,352 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
+import os
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Optional
+
+from fastapi import Request
+from sqlalchemy import Engine, create_engine, event
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching async driver."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+
+def is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+
+def is_memory_sqlite(url: str) -> bool:
+    return is_sqlite(url) and (":memory:" in url or url.split("://", 1)[-1] in ("", "/"))
+
+
+def get_engine_options(url: str, read_only: bool = False) -> dict[str, Any]:
+    """Build create_engine() keyword arguments for the configured profile.
+
+    SQLite allows a single writer, but a request holds its pooled connection
+    from its first query until the session closes, including any slow work
+    in between (password hashing, uploads). The writer pool therefore has
+    several connections and SQLite serializes the actual write transactions,
+    which pysqlite only opens at the first DML statement, through
+    busy_timeout. Readers get their own pool that WAL lets run alongside.
+    Server databases use the regular pool sizes.
+    """
+    options: dict[str, Any] = {}
+    if is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}  # Needed for SQLite
+
+    if settings.DATABASE_ENGINE_PROFILE != "production" or is_memory_sqlite(url):
+        return options
+
+    options["pool_timeout"] = settings.DB_POOL_TIMEOUT
+    if is_sqlite(url):
+        options["pool_size"] = (
+            settings.SQLITE_READ_POOL_SIZE if read_only else settings.SQLITE_WRITE_POOL_SIZE
+        )
+        options["max_overflow"] = 0
+    else:
+        options["pool_size"] = settings.DB_READ_POOL_SIZE if read_only else settings.DB_POOL_SIZE
+        options["max_overflow"] = settings.DB_MAX_OVERFLOW
+        options["pool_pre_ping"] = True
+    return options
+
+
+def configure_sqlite_connection(dbapi_connection, read_only: bool = False) -> None:
+    """Apply the production PRAGMA set to a new SQLite connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA foreign_keys={'ON' if settings.SQLITE_FOREIGN_KEYS else 'OFF'}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.SQLITE_CACHE_SIZE)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(sync_engine: Engine, read_only: bool = False) -> None:
+    if not is_sqlite(str(sync_engine.url)):
+        return
+
+    @event.listens_for(sync_engine, "savepoint")
+    def _on_savepoint(conn, name):
+        # pysqlite only sends BEGIN ahead of DML: a leading SAVEPOINT would
+        # open a transaction of its own, and its RELEASE would commit
+        if not conn.connection.driver_connection.in_transaction:
+            conn.exec_driver_sql("BEGIN")
+
+    if settings.DATABASE_ENGINE_PROFILE != "production":
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        configure_sqlite_connection(dbapi_connection, read_only=read_only)
+
+
+class CheckoutTimingMixin:
+    """Records how long pool checkouts wait for a connection (for /metrics)."""
+
+    checkouts = 0
+    checkout_timeouts = 0
+    checkout_wait_seconds = 0.0
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            self.checkout_timeouts += 1
+            raise
+        finally:
+            self.checkouts += 1
+            self.checkout_wait_seconds += time.perf_counter() - started_at
+
+
+class TimedQueuePool(CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def create_db_engine(url: str, read_only: bool = False) -> Engine:
+    options = get_engine_options(url, read_only)
+    if "pool_size" in options:
+        options["poolclass"] = TimedQueuePool
+    db_engine = create_engine(url, **options)
+    install_sqlite_pragmas(db_engine, read_only)
+    return db_engine
+
+
+def create_async_db_engine(url: str, read_only: bool = False) -> AsyncEngine:
+    options = get_engine_options(url, read_only)
+    if "pool_size" in options:
+        # aiosqlite defaults to NullPool, which would reopen (and re-PRAGMA) per request
+        options["poolclass"] = TimedAsyncAdaptedQueuePool
+    db_engine = create_async_engine(url, **options)
+    install_sqlite_pragmas(db_engine.sync_engine, read_only)
+    return db_engine
+
+
+def has_read_engine() -> bool:
+    """Whether GET requests get a separate read-only engine."""
+    return (
+        settings.DATABASE_ENGINE_PROFILE == "production"
+        and not is_memory_sqlite(settings.DATABASE_URL)
+    )
+
+
+READ_DATABASE_URL = settings.READ_DATABASE_URL or settings.DATABASE_URL
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+ASYNC_READ_DATABASE_URL = get_async_database_url(READ_DATABASE_URL)
+
+engine = create_db_engine(settings.DATABASE_URL)
+read_engine = create_db_engine(READ_DATABASE_URL, read_only=True) if has_read_engine() else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+async_engine = create_async_db_engine(ASYNC_DATABASE_URL)
+async_read_engine = (
+    create_async_db_engine(ASYNC_READ_DATABASE_URL, read_only=True)
+    if has_read_engine()
+    else async_engine
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
 
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency to get database session."""
-    db = SessionLocal()
+async def dispose_engines() -> None:
+    """Close pooled connections (aiosqlite threads keep the process alive)."""
+    for db_engine in {async_engine, async_read_engine}:
+        await db_engine.dispose()
+    for db_engine in {engine, read_engine}:
+        db_engine.dispose()
+
+
+def _discard_inherited_connections() -> None:
+    # A forked worker must not reuse the parent's pooled connections
+    for db_engine in {engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine}:
+        db_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_discard_inherited_connections)
+
+
+class ThreadedSession:
+    """AsyncSession-compatible wrapper that runs a sync Session in the threadpool.
+
+    Used when DATABASE_ASYNC is off so the async route handlers can run
+    unchanged against the original synchronous engine. With ``slots`` (see
+    pool_slots) a transaction first waits in the event loop for a pooled
+    connection and gives it back when it ends.
+    """
+
+    _EXECUTE_OPTIONS = {"prebuffer_rows": True}
+
+    def __init__(self, session: Session, slots: Optional[asyncio.Semaphore] = None):
+        self.sync_session = session
+        self._slots = slots
+        self._holds_slot = False
+
+    async def _run(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        if self._slots is not None and not self._holds_slot:
+            await self._slots.acquire()
+            self._holds_slot = True
+        try:
+            return await run_in_threadpool(func, *args, **kwargs)
+        finally:
+            if self._holds_slot and not self.sync_session.in_transaction():
+                self._holds_slot = False
+                self._slots.release()
+
+    def add(self, instance: Any) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances: Any) -> None:
+        self.sync_session.add_all(instances)
+
+    def expunge(self, instance: Any) -> None:
+        self.sync_session.expunge(instance)
+
+    async def execute(self, statement: Any, params: Any = None, **kwargs: Any):
+        options = {**self._EXECUTE_OPTIONS, **kwargs.pop("execution_options", {})}
+        return await self._run(
+            self.sync_session.execute,
+            statement,
+            params,
+            execution_options=options,
+            **kwargs,
+        )
+
+    async def scalar(self, statement: Any, params: Any = None, **kwargs: Any):
+        result = await self.execute(statement, params, **kwargs)
+        return result.scalar()
+
+    async def scalars(self, statement: Any, params: Any = None, **kwargs: Any):
+        result = await self.execute(statement, params, **kwargs)
+        return result.scalars()
+
+    async def get(self, entity: Any, ident: Any, **kwargs: Any):
+        return await self._run(self.sync_session.get, entity, ident, **kwargs)
+
+    async def merge(self, instance: Any, load: bool = True, **kwargs: Any):
+        return await self._run(self.sync_session.merge, instance, load=load, **kwargs)
+
+    async def delete(self, instance: Any) -> None:
+        await self._run(self.sync_session.delete, instance)
+
+    async def flush(self, objects: Any = None) -> None:
+        await self._run(self.sync_session.flush, objects)
+
+    async def refresh(self, instance: Any, attribute_names: Any = None) -> None:
+        await self._run(self.sync_session.refresh, instance, attribute_names)
+
+    @asynccontextmanager
+    async def begin_nested(self):
+        transaction = await self._run(self.sync_session.begin_nested)
+        try:
+            yield transaction
+        except BaseException:
+            await self._run(transaction.rollback)
+            raise
+        else:
+            await self._run(transaction.commit)
+
+    async def commit(self) -> None:
+        await self._run(self.sync_session.commit)
+
+    async def rollback(self) -> None:
+        await self._run(self.sync_session.rollback)
+
+    async def close(self) -> None:
+        await self._run(self.sync_session.close)
+
+
+READ_ONLY_METHODS = frozenset({"GET", "HEAD"})
+
+# Event loop -> engine -> free pooled connections (see pool_slots)
+_pool_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[Engine, asyncio.Semaphore]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def pool_slots(bind: Engine) -> Optional[asyncio.Semaphore]:
+    """Semaphore counting the connections bind's pool can still hand out.
+
+    A threadpool thread blocked in pool checkout cannot run the requests
+    that hold the connections, so with more concurrent transactions than
+    pooled connections the sync engine would time out instead of queueing.
+    ThreadedSession therefore waits for a slot in the event loop instead.
+    """
+    pool = bind.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    slots = _pool_slots.setdefault(asyncio.get_running_loop(), {})
+    semaphore = slots.get(bind)
+    if semaphore is None:
+        semaphore = slots[bind] = asyncio.Semaphore(pool.size() + max(pool._max_overflow, 0))
+    return semaphore
+
+
+@asynccontextmanager
+async def open_session(read_only: bool):
+    """A request session on the read-only or the writer engine."""
+    if settings.DATABASE_ASYNC:
+        session_factory = AsyncReadSessionLocal if read_only else AsyncSessionLocal
+        async with session_factory() as db:
+            yield db
+        return
+
+    session_factory = ReadSessionLocal if read_only else SessionLocal
+    db = ThreadedSession(
+        session_factory(expire_on_commit=False),
+        slots=pool_slots(session_factory.kw["bind"]),
+    )
     try:
         yield db
     finally:
-        db.close()
+        await db.close()
+
+
+async def get_db(request: Request):
+    """Dependency to get database session.
+
+    GET/HEAD requests are served from the read-only engine.
+    """
+    async with open_session(read_only=request.method in READ_ONLY_METHODS) as db:
+        yield db
+
+
+async def get_read_db():
+    """Dependency for a read-only session whatever the request method."""
+    async with open_session(read_only=True) as db:
+        yield db
@@ -1,47 +1,58 @@
-import uvicorn
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import APIRouter, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
-from app.database import engine, Base
-from app.routers import (
-    auth,
-    users,
-    family_members,
-    allergies,
-    chronic_diseases,
-    lab_scan_tests,
-    health_profile,
-    medications,
-)
-
-Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title=settings.APP_NAME,
-    version=settings.APP_VERSION,
-    description="Backend API for AI Doctor Assistant application",
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-app.include_router(auth.router)
-app.include_router(users.router)
-app.include_router(family_members.router)
-app.include_router(allergies.router)
-app.include_router(chronic_diseases.router)
-app.include_router(lab_scan_tests.router)
-app.include_router(health_profile.router)
-app.include_router(medications.router)
-
-
-@app.get("/", tags=["Root"])
+from app import database
+from app.database import dispose_engines
+from app.migrations import check_schema
+from app.utils.hashing import password_hasher
+from app.utils import decryption
+from app.utils.otp import run_sweeper
+from app.utils.changelog import run_compactor
+from app.utils.file_storage import run_blob_gc
+from app.utils.live_updates import change_feed
+from app.utils.notifications import dispatcher
+from app.utils.serialization import default_response_class
+from app.utils.metrics import MetricsMiddleware
+from app.utils.query_tracking import QueryTrackingMiddleware, instrument_engine
+from app.utils.security import load_keys
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Check the schema and start background work; tear it all down on exit."""
+    await run_in_threadpool(check_schema, database.engine)
+
+    # Expired-OTP sweeper, outbox dispatcher, change log compaction, the
+    # feed behind live updates and the unreferenced-file sweep
+    background_tasks = {
+        asyncio.create_task(run_sweeper()),
+        asyncio.create_task(dispatcher.run()),
+        asyncio.create_task(run_compactor(database.engine)),
+        asyncio.create_task(change_feed.run(database.read_engine)),
+        asyncio.create_task(run_blob_gc(database.read_engine)),
+    }
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+
+        # Argon2 and decryption worker pools, then pooled connections
+        password_hasher.shutdown()
+        decryption.shutdown()
+        await dispose_engines()
+
+
+root_router = APIRouter(tags=["Root"])
+
+
+@root_router.get("/")
 def root():
     """Root endpoint - API health check."""
     return {
@@ -51,9 +62,90 @@ def root():
     }
 
 
-@app.get("/health", tags=["Root"])
+@root_router.get("/health")
 def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+def create_app() -> FastAPI:
+    """Build the application; the schema must already be migrated.
+
+    Raises KeyStoreError if the encryption keys are not configured.
+    """
+    load_keys()
+
+    from app.routers import (
+        auth,
+        users,
+        family_members,
+        allergies,
+        chronic_diseases,
+        lab_scan_tests,
+        health_profile,
+        medications,
+        metrics,
+        admin,
+        sync,
+        live,
+    )
+
+    app = FastAPI(
+        title=settings.APP_NAME,
+        version=settings.APP_VERSION,
+        description="Backend API for AI Doctor Assistant application",
+        default_response_class=default_response_class(),
+        lifespan=lifespan,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "Link", "Server-Timing"],
+    )
+
+    app.include_router(root_router)
+    app.include_router(auth.router)
+    app.include_router(users.router)
+    app.include_router(family_members.router)
+    app.include_router(allergies.router)
+    app.include_router(chronic_diseases.router)
+    app.include_router(lab_scan_tests.router)
+    app.include_router(health_profile.router)
+    app.include_router(medications.router)
+    app.include_router(sync.router)
+    app.include_router(live.router)
+    app.include_router(admin.router)
+    if settings.SQL_INSTRUMENTATION_ENABLED:
+        for db_engine in (
+            database.engine,
+            database.read_engine,
+            database.async_engine.sync_engine,
+            database.async_read_engine.sync_engine,
+        ):
+            instrument_engine(db_engine)
+        app.add_middleware(QueryTrackingMiddleware)
+    if settings.METRICS_ENABLED:
+        app.include_router(metrics.router)
+        app.add_middleware(MetricsMiddleware)
+
+    return app
+
+
+def __getattr__(name: str):
+    # `uvicorn app.main:app` builds the app on first access, not at import
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    import uvicorn
+
+    # Single process; see app.server for pre-forked workers
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
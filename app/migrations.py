@@ -0,0 +1,212 @@
+"""Versioned schema migrations.
+
+``Base.metadata.create_all`` only creates missing tables, so changes to
+existing tables are applied here. Each migration runs once, in order, and
+is recorded in the ``schema_migrations`` table. Migrations must tolerate
+a database freshly created by ``create_all`` (where the change is
+already present).
+
+Migrations run out-of-band, once per deploy, before the workers start::
+
+    python -m app.migrations
+
+The app itself only checks at startup that nothing is pending (or, with
+``DATABASE_AUTO_MIGRATE``, applies migrations itself -- for development
+with a single process).
+"""
+import argparse
+import sys
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import Connection, Engine, Index, inspect, text
+
+import app.models  # noqa: F401 (registers every table)
+from app.config import settings
+from app.database import Base
+
+# Child tables that gained created_at + (user_id, created_at, id) indexes
+KEYSET_TABLES = (
+    "allergies",
+    "chronic_diseases",
+    "family_members",
+    "lab_scan_tests",
+    "medications",
+)
+
+
+def get_index(table_name: str, index_name: str) -> Index:
+    """Look up an index declared on a model's table."""
+    return next(
+        index for index in Base.metadata.tables[table_name].indexes
+        if index.name == index_name
+    )
+
+
+def add_keyset_pagination_columns(conn: Connection) -> None:
+    """Add created_at to child tables and index them for keyset pagination."""
+    inspector = inspect(conn)
+    now = datetime.utcnow().isoformat(sep=" ")
+
+    for table_name in KEYSET_TABLES:
+        columns = {column["name"] for column in inspector.get_columns(table_name)}
+        if "created_at" not in columns:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN created_at DATETIME"))
+        conn.execute(
+            text(f"UPDATE {table_name} SET created_at = :now WHERE created_at IS NULL"),
+            {"now": now},
+        )
+
+        # Superseded by the composite index, whose leading column is user_id
+        conn.execute(text(f"DROP INDEX IF EXISTS ix_{table_name}_user_id"))
+        get_index(table_name, f"ix_{table_name}_user_created").create(conn, checkfirst=True)
+
+
+def add_lab_scan_test_file_columns(conn: Connection) -> None:
+    """Add content-addressed file metadata to lab_scan_tests."""
+    columns = {column["name"] for column in inspect(conn).get_columns("lab_scan_tests")}
+    for name, ddl in (
+        ("file_sha256", "CHAR(64)"),
+        ("file_size", "INTEGER"),
+        ("file_content_type", "VARCHAR(100)"),
+    ):
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE lab_scan_tests ADD COLUMN {name} {ddl}"))
+    get_index("lab_scan_tests", "ix_lab_scan_tests_file_sha256").create(conn, checkfirst=True)
+
+
+def add_resource_versions_table(conn: Connection) -> None:
+    """Per-user collection version counters for conditional GETs."""
+    Base.metadata.tables["resource_versions"].create(conn, checkfirst=True)
+
+
+# Synced tables and their primary keys, for the change log backfill
+SYNCED_TABLES = {
+    "users": "user_id",
+    "health_profiles": "profile_id",
+    "medications": "med_id",
+    "allergies": "allergy_id",
+    "chronic_diseases": "disease_id",
+    "lab_scan_tests": "test_id",
+    "family_members": "family_id",
+}
+
+
+def add_change_log(conn: Connection) -> None:
+    """Add updated_at to synced child tables and seed the change log.
+
+    Every existing record gets one entry, so a sync from the beginning
+    returns the whole current state.
+    """
+    inspector = inspect(conn)
+    now = datetime.utcnow().isoformat(sep=" ")
+
+    for table_name in (*KEYSET_TABLES, "health_profiles"):
+        columns = {column["name"] for column in inspector.get_columns(table_name)}
+        if "updated_at" not in columns:
+            conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN updated_at DATETIME"))
+        created_at = "created_at" if "created_at" in columns else ":now"
+        conn.execute(
+            text(f"UPDATE {table_name} SET updated_at = COALESCE({created_at}, :now) WHERE updated_at IS NULL"),
+            {"now": now},
+        )
+
+    change_log = Base.metadata.tables["change_log"]
+    change_log.create(conn, checkfirst=True)
+    for table_name, primary_key in SYNCED_TABLES.items():
+        conn.execute(
+            text(
+                "INSERT INTO change_log (user_id, resource, record_id, deleted, changed_at) "
+                f"SELECT user_id, :resource, {primary_key}, :deleted, COALESCE(updated_at, :now) "
+                f"FROM {table_name} ORDER BY updated_at"
+            ),
+            {"resource": table_name, "deleted": False, "now": now},
+        )
+
+
+MIGRATIONS: list[tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "keyset pagination columns and indexes", add_keyset_pagination_columns),
+    (2, "lab/scan test file columns", add_lab_scan_test_file_columns),
+    (3, "resource version counters", add_resource_versions_table),
+    (4, "change log and updated_at columns", add_change_log),
+]
+
+
+def run_migrations(bind: Engine) -> list[int]:
+    """Apply pending migrations and return the versions that ran."""
+    applied_now = []
+    with bind.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "version INTEGER PRIMARY KEY, "
+            "description VARCHAR(200) NOT NULL, "
+            "applied_at DATETIME NOT NULL)"
+        ))
+        applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+        for version, description, migrate in MIGRATIONS:
+            if version in applied:
+                continue
+            migrate(conn)
+            conn.execute(
+                text(
+                    "INSERT INTO schema_migrations (version, description, applied_at) "
+                    "VALUES (:version, :description, :applied_at)"
+                ),
+                {
+                    "version": version,
+                    "description": description,
+                    "applied_at": datetime.utcnow(),
+                },
+            )
+            applied_now.append(version)
+    return applied_now
+
+
+def pending_migrations(bind: Engine) -> list[int]:
+    """Versions not yet recorded (all of them for an unmigrated database)."""
+    with bind.connect() as conn:
+        if not inspect(conn).has_table("schema_migrations"):
+            return [version for version, _, _ in MIGRATIONS]
+        applied = set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+    return [version for version, _, _ in MIGRATIONS if version not in applied]
+
+
+def migrate(bind: Engine) -> list[int]:
+    """Create missing tables, then apply pending migrations."""
+    Base.metadata.create_all(bind=bind)
+    return run_migrations(bind)
+
+
+def check_schema(bind: Engine) -> None:
+    """Startup check: refuse to serve a database with pending migrations."""
+    if settings.DATABASE_AUTO_MIGRATE:
+        migrate(bind)
+        return
+    pending = pending_migrations(bind)
+    if pending:
+        raise RuntimeError(
+            f"Database schema is out of date (pending migrations: {pending}); "
+            "run `python -m app.migrations` or set DATABASE_AUTO_MIGRATE=true"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Apply database schema migrations.")
+    parser.add_argument("--check", action="store_true",
+                        help="Only report pending migrations; exit 1 if there are any")
+    args = parser.parse_args()
+
+    from app.database import engine
+
+    if args.check:
+        pending = pending_migrations(engine)
+        print(f"Pending migrations: {pending}" if pending else "Schema is up to date")
+        sys.exit(1 if pending else 0)
+
+    applied = migrate(engine)
+    print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
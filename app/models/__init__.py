@@ -5,6 +5,9 @@ from app.models.chronic_disease import ChronicDisease
 from app.models.allergy import Allergy
 from app.models.lab_scan_test import LabScanTest
 from app.models.medication import Medication
+from app.models.outbox_message import OutboxMessage
+from app.models.resource_version import ResourceVersion
+from app.models.change_log import ChangeLogEntry
 
 __all__ = [
     "User",
@@ -14,4 +17,7 @@ __all__ = [
     "Allergy",
     "LabScanTest",
     "Medication",
+    "OutboxMessage",
+    "ResourceVersion",
+    "ChangeLogEntry",
 ]
@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.sqlite import CHAR
 from sqlalchemy.orm import relationship
 
@@ -10,10 +11,16 @@ class Allergy(Base):
     """Allergy model."""
     
     __tablename__ = "allergies"
+    __table_args__ = (
+        # Keyset pagination: per-user range scans ordered by (created_at, id)
+        Index("ix_allergies_user_created", "user_id", "created_at", "allergy_id"),
+    )
     
     allergy_id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     allergy_name = Column(String(200), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship
     user = relationship("User", back_populates="allergies")
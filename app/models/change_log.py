@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, DateTime, Index
+from sqlalchemy.dialects.sqlite import CHAR
+
+from app.database import Base
+
+
+class ChangeLogEntry(Base):
+    """One create/update/delete of a synced record, in commit order.
+
+    Written in the same transaction as the change; ``seq`` is the delta
+    sync cursor. Deletes are kept as tombstones (``deleted``).
+    """
+    
+    __tablename__ = "change_log"
+    __table_args__ = (
+        # Delta sync: per-user range scans ordered by seq
+        Index("ix_change_log_user_seq", "user_id", "seq"),
+        # Compaction: latest entry of each record
+        Index("ix_change_log_record", "resource", "record_id", "seq"),
+        # AUTOINCREMENT: seq values are never reused after deletes
+        {"sqlite_autoincrement": True},
+    )
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    resource = Column(String(50), nullable=False)  # table name of the record
+    record_id = Column(CHAR(36), nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -1,6 +1,6 @@
 import uuid
-from datetime import date
-from sqlalchemy import Column, String, Date, ForeignKey
+from datetime import date, datetime
+from sqlalchemy import Column, Text, Date, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.sqlite import CHAR
 from sqlalchemy.orm import relationship
 
@@ -11,11 +11,18 @@ class ChronicDisease(Base):
     """Chronic and genetic diseases model."""
     
     __tablename__ = "chronic_diseases"
+    __table_args__ = (
+        # Keyset pagination: per-user range scans ordered by (created_at, id)
+        Index("ix_chronic_diseases_user_created", "user_id", "created_at", "disease_id"),
+    )
     
     disease_id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
-    name = Column(String(200), nullable=False)
+    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
+    # Fernet ciphertext of the disease name, stored in the existing "name" column
+    name_encrypted = Column("name", Text, nullable=False)
     diagnosis_date = Column(Date, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
 
     user = relationship("User", back_populates="chronic_diseases")
@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, String, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.sqlite import CHAR
 from sqlalchemy.orm import relationship
 
@@ -10,14 +11,20 @@ class FamilyMember(Base):
     """Family member model."""
     
     __tablename__ = "family_members"
+    __table_args__ = (
+        # Keyset pagination: per-user range scans ordered by (created_at, id)
+        Index("ix_family_members_user_created", "user_id", "created_at", "family_id"),
+    )
     
     family_id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     name = Column(String(200), nullable=False)
     relation = Column(String(50), nullable=False)  # e.g., Spouse, Child, Parent
     
     # Optional: Link to an existing user in the system (identified by code_number during creation)
     linked_user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="SET NULL"), nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationships
     user = relationship("User", back_populates="family_members", foreign_keys=[user_id])
@@ -1,6 +1,7 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, Text, ForeignKey, Enum as SQLEnum
+from datetime import datetime
+from sqlalchemy import Column, String, Text, ForeignKey, DateTime, Enum as SQLEnum
 from sqlalchemy.dialects.sqlite import CHAR
 from sqlalchemy.orm import relationship
 
@@ -24,6 +25,7 @@ class HealthProfile(Base):
     activity_level = Column(String(50), nullable=True)  # e.g., Sedentary, Active
     dietary_notes = Column(Text, nullable=True)
     sleep_pattern = Column(String(100), nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship
     user = relationship("User", back_populates="health_profile")
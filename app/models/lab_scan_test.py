@@ -1,7 +1,7 @@
 import uuid
 import enum
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.dialects.sqlite import CHAR
 from sqlalchemy.orm import relationship
 
@@ -17,12 +17,22 @@ class LabScanTest(Base):
     """Lab and scan tests model."""
     
     __tablename__ = "lab_scan_tests"
+    __table_args__ = (
+        # Keyset pagination: per-user range scans ordered by (created_at, id)
+        Index("ix_lab_scan_tests_user_created", "user_id", "created_at", "test_id"),
+        # Reference counting for content-addressed blobs
+        Index("ix_lab_scan_tests_file_sha256", "file_sha256"),
+    )
     
     test_id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     test_type = Column(SQLEnum(TestTypeEnum), nullable=False)
     image_url = Column(String(500), nullable=True)  # Path to stored file
+    file_sha256 = Column(CHAR(64), nullable=True)  # Content address of the uploaded file
+    file_size = Column(Integer, nullable=True)
+    file_content_type = Column(String(100), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship
     user = relationship("User", back_populates="lab_scan_tests")
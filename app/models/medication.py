@@ -1,6 +1,6 @@
 import uuid
-from datetime import date
-from sqlalchemy import Column, String, Date, ForeignKey
+from datetime import date, datetime
+from sqlalchemy import Column, String, Date, ForeignKey, DateTime, Index
 from sqlalchemy.dialects.sqlite import CHAR
 from sqlalchemy.orm import relationship
 
@@ -11,13 +11,19 @@ class Medication(Base):
     """Medication model."""
     
     __tablename__ = "medications"
+    __table_args__ = (
+        # Keyset pagination: per-user range scans ordered by (created_at, id)
+        Index("ix_medications_user_created", "user_id", "created_at", "med_id"),
+    )
     
     med_id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False, index=True)
+    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), nullable=False)
     med_name = Column(String(200), nullable=False)
     dose = Column(String(50), nullable=True)  # e.g., 500mg
     frequency = Column(String(100), nullable=True)  # e.g., "2 times per day"
     duration_end = Column(Date, nullable=True)  # "Until when"
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # Relationship
     user = relationship("User", back_populates="medications")
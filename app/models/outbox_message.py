@@ -0,0 +1,36 @@
+import uuid
+import enum
+from datetime import datetime
+from sqlalchemy import Column, String, Text, Integer, Float, DateTime, Enum as SQLEnum, Index
+from sqlalchemy.dialects.sqlite import CHAR
+
+from app.database import Base
+
+
+class OutboxStatusEnum(str, enum.Enum):
+    PENDING = "Pending"
+    SENT = "Sent"
+    FAILED = "Failed"
+
+
+class OutboxMessage(Base):
+    """Outgoing notification awaiting delivery by the outbox dispatcher."""
+    
+    __tablename__ = "outbox_messages"
+    __table_args__ = (
+        # Dispatcher polls for due pending messages
+        Index("ix_outbox_messages_status_next_attempt", "status", "next_attempt_at"),
+    )
+    
+    message_id = Column(CHAR(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    provider = Column(String(50), nullable=False)
+    recipient = Column(String(50), nullable=False)
+    body_encrypted = Column(Text, nullable=False)  # Fernet ciphertext
+    status = Column(SQLEnum(OutboxStatusEnum), nullable=False, default=OutboxStatusEnum.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = Column(CHAR(36), nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+    latency_ms = Column(Float, nullable=True)  # created_at -> delivery
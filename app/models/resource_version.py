@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Integer, ForeignKey
+from sqlalchemy.dialects.sqlite import CHAR
+
+from app.database import Base
+
+
+class ResourceVersion(Base):
+    """Per-user change counter for one resource collection (e.g. medications).
+
+    Bumped in the same transaction as every create/update/delete of the
+    collection, and served as the ETag of its GET endpoints.
+    """
+    
+    __tablename__ = "resource_versions"
+    
+    user_id = Column(CHAR(36), ForeignKey("users.user_id", ondelete="CASCADE"), primary_key=True)
+    resource = Column(String(50), primary_key=True)  # table name of the collection
+    version = Column(Integer, nullable=False, default=0)
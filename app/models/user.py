@@ -29,6 +29,7 @@ class User(Base):
     marital_status = Column(String(50), nullable=True)
     phone_number = Column(String(20), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)
+    # Legacy OTP columns; codes now live in app.utils.otp.otp_store
     otp_code = Column(String(10), nullable=True)
     otp_expiry = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from app.utils import security
+from app.utils.dependencies import AdminDep
+from app.utils.export import NDJSON_MEDIA_TYPE, export_response
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def export_all_users(_: AdminDep, request: Request):
+    """Download every user's record as NDJSON, table by table.
+
+    Rows are read through server-side cursors, so memory use does not grow
+    with the number of users. Requires the ``X-Admin-Token`` header.
+    """
+    # Bypasses the decrypt cache so a full export does not evict hot entries
+    return export_response(request, None, security.decrypt_text, "export.ndjson")
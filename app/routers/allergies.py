@@ -1,15 +1,21 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.utils.dependencies import DatabaseDep, CurrentUserDep
+from app.utils.pagination import PageDep, paginate
+from app.utils.versioning import bump_version
+from app.utils.response_cache import cached_list_response
+from app.utils.bulk import BulkItemsBody, bulk_create
 from app.models.allergy import Allergy
 from app.schemas.allergy import AllergyCreate, AllergyRead
+from app.schemas.bulk import BulkResult
 
 router = APIRouter(prefix="/allergies", tags=["Allergies"])
 
 
 @router.post("", response_model=AllergyRead, status_code=status.HTTP_201_CREATED)
-def create_allergy(
+async def create_allergy(
     allergy_data: AllergyCreate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
@@ -21,32 +27,71 @@ def create_allergy(
     )
     
     db.add(new_allergy)
-    db.commit()
-    db.refresh(new_allergy)
+    await bump_version(db, current_user.user_id, Allergy.__tablename__)
+    await db.commit()
+    await db.refresh(new_allergy)
     
     return new_allergy
 
 
+@router.post("/bulk", response_model=BulkResult[AllergyRead])
+async def create_allergies_bulk(
+    items: BulkItemsBody,
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+):
+    """Register many allergies in one transaction.
+    
+    Each item is validated on its own; invalid items are reported in the
+    per-item results without aborting the rest of the batch.
+    """
+    return await bulk_create(
+        db,
+        items,
+        Allergy,
+        AllergyCreate,
+        build_row=lambda data: {"user_id": current_user.user_id, **data.model_dump()},
+        build_item=lambda row, data: row,
+    )
+
+
 @router.get("", response_model=List[AllergyRead])
-def get_allergies(current_user: CurrentUserDep, db: DatabaseDep):
-    """Retrieve all allergies for the current user."""
-    allergies = db.query(Allergy).filter(
-        Allergy.user_id == current_user.user_id
-    ).all()
-    return allergies
+async def get_allergies(
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+    page: PageDep,
+    request: Request,
+    response: Response,
+):
+    """Retrieve the current user's allergies, one page at a time."""
+    return await cached_list_response(
+        db, request, response, current_user.user_id, Allergy.__tablename__, AllergyRead,
+        load=lambda: paginate(
+            db,
+            select(Allergy).where(Allergy.user_id == current_user.user_id),
+            Allergy.created_at,
+            Allergy.allergy_id,
+            page,
+            request,
+            response,
+        ),
+    )
 
 
 @router.get("/{allergy_id}", response_model=AllergyRead)
-def get_allergy(
+async def get_allergy(
     allergy_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
     """Get a specific allergy."""
-    allergy = db.query(Allergy).filter(
-        Allergy.allergy_id == allergy_id,
-        Allergy.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Allergy).where(
+            Allergy.allergy_id == allergy_id,
+            Allergy.user_id == current_user.user_id
+        )
+    )
+    allergy = result.scalars().first()
     
     if not allergy:
         raise HTTPException(
@@ -58,16 +103,19 @@ def get_allergy(
 
 
 @router.delete("/{allergy_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_allergy(
+async def delete_allergy(
     allergy_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
     """Delete an allergy."""
-    allergy = db.query(Allergy).filter(
-        Allergy.allergy_id == allergy_id,
-        Allergy.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Allergy).where(
+            Allergy.allergy_id == allergy_id,
+            Allergy.user_id == current_user.user_id
+        )
+    )
+    allergy = result.scalars().first()
     
     if not allergy:
         raise HTTPException(
@@ -75,7 +123,8 @@ def delete_allergy(
             detail="Allergy not found"
         )
     
-    db.delete(allergy)
-    db.commit()
+    await db.delete(allergy)
+    await bump_version(db, current_user.user_id, Allergy.__tablename__)
+    await db.commit()
     
     return None
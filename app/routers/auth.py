@@ -1,14 +1,20 @@
 from typing import Annotated
+from sqlalchemy import select
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 
-from app.utils.dependencies import DatabaseDep
+from app.config import settings
+from app.utils.dependencies import DatabaseDep, ReadDatabaseDep, invalidate_principal
+from app.utils.hashing import password_hasher
+from app.utils.rate_limit import (
+    login_rate_limit,
+    forgot_password_rate_limit,
+    otp_rate_limit,
+)
+from app.utils.otp import OTPStatus, otp_store
+from app.utils.notifications import dispatcher, enqueue_sms
 from app.utils.security import (
-    hash_password,
-    verify_password,
     generate_otp,
-    get_otp_expiry,
-    is_otp_valid,
     generate_code_number,
     create_access_token,
 )
@@ -25,14 +31,33 @@ from app.schemas.user import (
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-@router.post("/login", response_model=Token)
-def login(
+def check_otp_status(otp_status: OTPStatus) -> None:
+    """Raise the client error matching a failed OTP check."""
+    if otp_status == OTPStatus.VALID:
+        return
+    if otp_status == OTPStatus.INVALID:
+        detail = "Invalid OTP code"
+    elif otp_status == OTPStatus.LOCKED:
+        detail = "Too many invalid attempts, please request a new OTP"
+    else:
+        detail = "OTP has expired"
+    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+
+@router.post("/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
+async def login(
     form_data: Annotated[OAuth2PasswordRequestForm, Depends()],
-    db: DatabaseDep,
+    db: ReadDatabaseDep,
 ):
-    user = db.query(User).filter(User.phone_number == form_data.username).first()
+    # Login never writes: the hash is verified without holding a writer connection
+    result = await db.execute(
+        select(User).where(User.phone_number == form_data.username)
+    )
+    user = result.scalars().first()
 
-    if not user or not verify_password(form_data.password, user.password_hash):
+    if not user or not await password_hasher.verify(
+        form_data.password, user.password_hash
+    ):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid phone number or password",
@@ -46,21 +71,30 @@ def login(
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(user_data: UserRegister, db: DatabaseDep):
+async def register_user(user_data: UserRegister, db: DatabaseDep):
     """Register a new user account."""
 
-    if db.query(User).filter(User.phone_number == user_data.phone_number).first():
+    result = await db.execute(
+        select(User).where(User.phone_number == user_data.phone_number)
+    )
+    if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Phone number already registered"
         )
 
-    if db.query(User).filter(User.passport_id == user_data.passport_id).first():
+    result = await db.execute(
+        select(User).where(User.passport_id == user_data.passport_id)
+    )
+    if result.scalars().first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Passport ID already registered"
         )
 
+    # Outside the try block so a 503 from the hashing pool is not masked
+    password_hash = await password_hasher.hash(user_data.password)
+
     try:
         new_user = User(
             code_number=generate_code_number(),
@@ -71,17 +105,17 @@ def register_user(user_data: UserRegister, db: DatabaseDep):
             nationality=user_data.nationality,
             marital_status=user_data.marital_status,
             phone_number=user_data.phone_number,
-            password_hash=hash_password(user_data.password),
+            password_hash=password_hash,
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
 
         return new_user
 
     except Exception:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create user"
@@ -89,82 +123,78 @@ def register_user(user_data: UserRegister, db: DatabaseDep):
 
 
 
-@router.post("/forgot-password", status_code=status.HTTP_200_OK)
-def forgot_password(request: ForgotPasswordRequest, db: DatabaseDep):
-    print("ALL USERS IN DB:", db.query(User).all())
-
-    user = db.query(User).filter(User.phone_number == request.phone_number).first()
-    if not user:
+@router.post(
+    "/forgot-password",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(forgot_password_rate_limit)],
+)
+async def forgot_password(request: ForgotPasswordRequest, db: DatabaseDep):
+    result = await db.execute(
+        select(User.user_id).where(User.phone_number == request.phone_number)
+    )
+    if result.first() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
     otp = generate_otp()
-    user.otp_code = otp
-    user.otp_expiry = get_otp_expiry()
+    await otp_store.issue(request.phone_number, otp, settings.OTP_EXPIRY_MINUTES * 60)
 
-    db.commit()
+    # Delivered by the outbox dispatcher; the request never waits on the gateway
+    enqueue_sms(
+        db,
+        request.phone_number,
+        f"Your verification code is {otp}. It expires in {settings.OTP_EXPIRY_MINUTES} minutes.",
+    )
+    await db.commit()
+    dispatcher.wake()
 
-    return {
-        "message": "OTP sent successfully",
-        "otp": otp
-    }
+    return {"message": "OTP sent successfully"}
 
 
 
 
-@router.post("/verify-otp", status_code=status.HTTP_200_OK)
-def verify_otp(request: VerifyOTPRequest, db: DatabaseDep):
+@router.post(
+    "/verify-otp",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(otp_rate_limit)],
+)
+async def verify_otp(request: VerifyOTPRequest):
     """Verify an OTP code."""
-    user = db.query(User).filter(User.phone_number == request.phone_number).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-
-    if not is_otp_valid(user.otp_expiry):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="OTP has expired"
-        )
-
-    if user.otp_code != request.otp_code:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid OTP code"
-        )
+    check_otp_status(await otp_store.verify(request.phone_number, request.otp_code))
 
     return {"message": "OTP verified successfully", "valid": True}
 
 
-@router.post("/change-password", status_code=status.HTTP_200_OK)
-def change_password(request: ChangePasswordRequest, db: DatabaseDep):
+@router.post(
+    "/change-password",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(otp_rate_limit)],
+)
+async def change_password(request: ChangePasswordRequest, db: DatabaseDep):
     """Change password using OTP verification."""
-    user = db.query(User).filter(User.phone_number == request.phone_number).first()
+    # Check before hashing so wrong guesses never cost an Argon2 run
+    check_otp_status(await otp_store.verify(request.phone_number, request.otp_code))
+
+    result = await db.execute(
+        select(User).where(User.phone_number == request.phone_number)
+    )
+    user = result.scalars().first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
 
-    if not is_otp_valid(user.otp_expiry):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="OTP has expired"
-        )
-
-    if user.otp_code != request.otp_code:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid OTP code"
-        )
-
-    user.password_hash = hash_password(request.new_password)
-    user.otp_code = None
-    user.otp_expiry = None
+    password_hash = await password_hasher.hash(request.new_password)
+    # Consume the code; a concurrent request may have used it meanwhile
+    check_otp_status(
+        await otp_store.verify(request.phone_number, request.otp_code, consume=True)
+    )
+    user.password_hash = password_hash
 
-    db.commit()
+    await db.commit()
+    invalidate_principal(user.user_id)
 
     return {"message": "password changed successfully"}
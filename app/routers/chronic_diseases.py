@@ -1,19 +1,26 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.utils.dependencies import DatabaseDep, CurrentUserDep
-from app.utils.security import encrypt_text, decrypt_text
+from app.utils.pagination import PageDep, paginate
+from app.utils.versioning import bump_version
+from app.utils.response_cache import cached_list_response
+from app.utils.bulk import BulkItemsBody, bulk_create
+from app.utils.security import encrypt_text
+from app.utils.decryption import decrypt_cached, decrypt_many
 from app.models.chronic_disease import ChronicDisease
 from app.schemas.chronic_disease import (
     ChronicDiseaseCreate,
     ChronicDiseaseRead,
 )
+from app.schemas.bulk import BulkResult
 
 router = APIRouter(prefix="/diseases", tags=["Chronic & Genetic Diseases"])
 
 
 @router.post("", response_model=ChronicDiseaseRead, status_code=status.HTTP_201_CREATED)
-def create_disease(
+async def create_disease(
     disease_data: ChronicDiseaseCreate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
@@ -25,35 +32,79 @@ def create_disease(
     )
 
     db.add(new_disease)
-    db.commit()
-    db.refresh(new_disease)
+    await bump_version(db, current_user.user_id, ChronicDisease.__tablename__)
+    await db.commit()
+    await db.refresh(new_disease)
 
-    new_disease.name = decrypt_text(new_disease.name_encrypted)
+    new_disease.name = disease_data.name
     return new_disease
 
 
+@router.post("/bulk", response_model=BulkResult[ChronicDiseaseRead])
+async def create_diseases_bulk(
+    items: BulkItemsBody,
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+):
+    """Create many diseases in one transaction, reporting failures per item."""
+    return await bulk_create(
+        db,
+        items,
+        ChronicDisease,
+        ChronicDiseaseCreate,
+        build_row=lambda data: {
+            "user_id": current_user.user_id,
+            "name_encrypted": encrypt_text(data.name),
+            "diagnosis_date": data.diagnosis_date,
+        },
+        build_item=lambda row, data: {**row, "name": data.name},
+    )
+
+
 @router.get("", response_model=List[ChronicDiseaseRead])
-def get_diseases(current_user: CurrentUserDep, db: DatabaseDep):
-    diseases = db.query(ChronicDisease).filter(
-        ChronicDisease.user_id == current_user.user_id
-    ).all()
+async def get_diseases(
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+    page: PageDep,
+    request: Request,
+    response: Response,
+):
+    async def load_diseases():
+        diseases = await paginate(
+            db,
+            select(ChronicDisease).where(ChronicDisease.user_id == current_user.user_id),
+            ChronicDisease.created_at,
+            ChronicDisease.disease_id,
+            page,
+            request,
+            response,
+        )
 
-    for d in diseases:
-        d.name = decrypt_text(d.name_encrypted)
+        names, decrypt_stats = await decrypt_many(d.name_encrypted for d in diseases)
+        for d, name in zip(diseases, names):
+            d.name = name
+        response.headers.append("Server-Timing", decrypt_stats.server_timing())
+        return diseases
 
-    return diseases
+    return await cached_list_response(
+        db, request, response, current_user.user_id, ChronicDisease.__tablename__,
+        ChronicDiseaseRead, load=load_diseases,
+    )
 
 
 @router.get("/{disease_id}", response_model=ChronicDiseaseRead)
-def get_disease(
+async def get_disease(
     disease_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
-    disease = db.query(ChronicDisease).filter(
-        ChronicDisease.disease_id == disease_id,
-        ChronicDisease.user_id == current_user.user_id,
-    ).first()
+    result = await db.execute(
+        select(ChronicDisease).where(
+            ChronicDisease.disease_id == disease_id,
+            ChronicDisease.user_id == current_user.user_id,
+        )
+    )
+    disease = result.scalars().first()
 
     if not disease:
         raise HTTPException(
@@ -61,20 +112,23 @@ def get_disease(
             detail="Disease not found",
         )
 
-    disease.name = decrypt_text(disease.name_encrypted)
+    disease.name = decrypt_cached(disease.name_encrypted)
     return disease
 
 
 @router.delete("/{disease_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_disease(
+async def delete_disease(
     disease_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
-    disease = db.query(ChronicDisease).filter(
-        ChronicDisease.disease_id == disease_id,
-        ChronicDisease.user_id == current_user.user_id,
-    ).first()
+    result = await db.execute(
+        select(ChronicDisease).where(
+            ChronicDisease.disease_id == disease_id,
+            ChronicDisease.user_id == current_user.user_id,
+        )
+    )
+    disease = result.scalars().first()
 
     if not disease:
         raise HTTPException(
@@ -82,6 +136,7 @@ def delete_disease(
             detail="Disease not found",
         )
 
-    db.delete(disease)
-    db.commit()
+    await db.delete(disease)
+    await bump_version(db, current_user.user_id, ChronicDisease.__tablename__)
+    await db.commit()
     return None
@@ -1,7 +1,12 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.utils.dependencies import DatabaseDep, CurrentUserDep
+from app.utils.pagination import PageDep, paginate
+from app.utils.changelog import log_changes
+from app.utils.versioning import bump_version
+from app.utils.response_cache import cached_list_response
 from app.models.user import User
 from app.models.family_member import FamilyMember
 from app.schemas.family_member import FamilyMemberCreate, FamilyMemberRead
@@ -9,10 +14,15 @@ from app.schemas.family_member import FamilyMemberCreate, FamilyMemberRead
 router = APIRouter(prefix="/family-members", tags=["Family Members"])
 
 
-def build_family_member_response(member: FamilyMember, db) -> dict:
+def select_members_with_linked_users():
+    """Select (FamilyMember, linked User) pairs in a single joined query."""
+    return select(FamilyMember, User).outerjoin(
+        User, FamilyMember.linked_user_id == User.user_id
+    )
+
+
+def build_family_member_response(member: FamilyMember, linked_user: User | None) -> dict:
     """Build response with linked user's name and code_number."""
-    linked_user = db.query(User).filter(User.user_id == member.linked_user_id).first()
-    
     return {
         "family_id": member.family_id,
         "user_id": member.user_id,
@@ -20,11 +30,26 @@ def build_family_member_response(member: FamilyMember, db) -> dict:
         "relation": member.relation,
         "linked_user_id": member.linked_user_id,
         "linked_user_code_number": linked_user.code_number if linked_user else None,
+        "updated_at": member.updated_at,
     }
 
 
+async def bump_linking_family_lists(db, linked_user_id: str) -> None:
+    """Invalidate the family lists that show a linked user's profile."""
+    result = await db.execute(
+        select(FamilyMember.user_id, FamilyMember.family_id).where(
+            FamilyMember.linked_user_id == linked_user_id
+        )
+    )
+    members = result.all()
+    # The shown name comes from the linked user's row, not the member's
+    await log_changes(db, FamilyMember.__tablename__, members)
+    for owner_id in {owner_id for owner_id, _ in members}:
+        await bump_version(db, owner_id, FamilyMember.__tablename__)
+
+
 @router.post("", response_model=FamilyMemberRead, status_code=status.HTTP_201_CREATED)
-def create_family_member(
+async def create_family_member(
     member_data: FamilyMemberCreate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
@@ -35,9 +60,12 @@ def create_family_member(
     Their name is automatically retrieved from their profile.
     """
     # Look up the user by code_number (required)
-    linked_user = db.query(User).filter(
-        User.code_number == member_data.linked_user_code_number
-    ).first()
+    result = await db.execute(
+        select(User).where(
+            User.code_number == member_data.linked_user_code_number
+        )
+    )
+    linked_user = result.scalars().first()
     
     if not linked_user:
         raise HTTPException(
@@ -53,10 +81,13 @@ def create_family_member(
         )
     
     # Check if this family member is already added
-    existing = db.query(FamilyMember).filter(
-        FamilyMember.user_id == current_user.user_id,
-        FamilyMember.linked_user_id == linked_user.user_id
-    ).first()
+    result = await db.execute(
+        select(FamilyMember).where(
+            FamilyMember.user_id == current_user.user_id,
+            FamilyMember.linked_user_id == linked_user.user_id
+        )
+    )
+    existing = result.scalars().first()
     
     if existing:
         raise HTTPException(
@@ -75,53 +106,81 @@ def create_family_member(
     )
     
     db.add(new_member)
-    db.commit()
-    db.refresh(new_member)
+    await bump_version(db, current_user.user_id, FamilyMember.__tablename__)
+    await db.commit()
+    await db.refresh(new_member)
     
-    return build_family_member_response(new_member, db)
+    return build_family_member_response(new_member, linked_user)
 
 
 @router.get("", response_model=List[FamilyMemberRead])
-def get_family_members(current_user: CurrentUserDep, db: DatabaseDep):
-    """Retrieve all family members for the current user."""
-    members = db.query(FamilyMember).filter(
-        FamilyMember.user_id == current_user.user_id
-    ).all()
-    return [build_family_member_response(m, db) for m in members]
+async def get_family_members(
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+    page: PageDep,
+    request: Request,
+    response: Response,
+):
+    """Retrieve the current user's family members, one page at a time."""
+    async def load_members():
+        rows = await paginate(
+            db,
+            select_members_with_linked_users().where(
+                FamilyMember.user_id == current_user.user_id
+            ),
+            FamilyMember.created_at,
+            FamilyMember.family_id,
+            page,
+            request,
+            response,
+        )
+        return [build_family_member_response(member, linked_user) for member, linked_user in rows]
+
+    return await cached_list_response(
+        db, request, response, current_user.user_id, FamilyMember.__tablename__,
+        FamilyMemberRead, load=load_members,
+    )
 
 
 @router.get("/{family_id}", response_model=FamilyMemberRead)
-def get_family_member(
+async def get_family_member(
     family_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
     """Get a specific family member."""
-    member = db.query(FamilyMember).filter(
-        FamilyMember.family_id == family_id,
-        FamilyMember.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select_members_with_linked_users().where(
+            FamilyMember.family_id == family_id,
+            FamilyMember.user_id == current_user.user_id
+        )
+    )
+    row = result.first()
     
-    if not member:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Family member not found"
         )
     
-    return build_family_member_response(member, db)
+    member, linked_user = row
+    return build_family_member_response(member, linked_user)
 
 
 @router.delete("/{family_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_family_member(
+async def delete_family_member(
     family_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
     """Delete a family member."""
-    member = db.query(FamilyMember).filter(
-        FamilyMember.family_id == family_id,
-        FamilyMember.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(FamilyMember).where(
+            FamilyMember.family_id == family_id,
+            FamilyMember.user_id == current_user.user_id
+        )
+    )
+    member = result.scalars().first()
     
     if not member:
         raise HTTPException(
@@ -129,7 +188,8 @@ def delete_family_member(
             detail="Family member not found"
         )
     
-    db.delete(member)
-    db.commit()
+    await db.delete(member)
+    await bump_version(db, current_user.user_id, FamilyMember.__tablename__)
+    await db.commit()
     
     return None
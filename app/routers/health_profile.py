@@ -1,6 +1,8 @@
-from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.utils.dependencies import DatabaseDep, CurrentUserDep
+from app.utils.versioning import bump_version, conditional_get
 from app.models.health_profile import HealthProfile
 from app.schemas.health_profile import HealthProfileCreate, HealthProfileRead, HealthProfileUpdate
 
@@ -8,16 +10,19 @@ router = APIRouter(prefix="/health-profile", tags=["Health Profile / Lifestyle"]
 
 
 @router.post("", response_model=HealthProfileRead, status_code=status.HTTP_201_CREATED)
-def create_health_profile(
+async def create_health_profile(
     profile_data: HealthProfileCreate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
     """Create a health profile / lifestyle information for the current user."""
     # Check if profile already exists
-    existing_profile = db.query(HealthProfile).filter(
-        HealthProfile.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(HealthProfile).where(
+            HealthProfile.user_id == current_user.user_id
+        )
+    )
+    existing_profile = result.scalars().first()
     
     if existing_profile:
         raise HTTPException(
@@ -34,18 +39,33 @@ def create_health_profile(
     )
     
     db.add(new_profile)
-    db.commit()
-    db.refresh(new_profile)
+    await bump_version(db, current_user.user_id, HealthProfile.__tablename__)
+    await db.commit()
+    await db.refresh(new_profile)
     
     return new_profile
 
 
 @router.get("", response_model=HealthProfileRead)
-def get_health_profile(current_user: CurrentUserDep, db: DatabaseDep):
+async def get_health_profile(
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+    request: Request,
+    response: Response,
+):
     """Get health profile / lifestyle information for the current user."""
-    profile = db.query(HealthProfile).filter(
-        HealthProfile.user_id == current_user.user_id
-    ).first()
+    not_modified = await conditional_get(
+        db, request, response, current_user.user_id, HealthProfile.__tablename__
+    )
+    if not_modified:
+        return not_modified
+
+    result = await db.execute(
+        select(HealthProfile).where(
+            HealthProfile.user_id == current_user.user_id
+        )
+    )
+    profile = result.scalars().first()
     
     if not profile:
         raise HTTPException(
@@ -57,15 +77,18 @@ def get_health_profile(current_user: CurrentUserDep, db: DatabaseDep):
 
 
 @router.put("", response_model=HealthProfileRead)
-def update_health_profile(
+async def update_health_profile(
     profile_data: HealthProfileUpdate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
     """Update health profile / lifestyle information for the current user."""
-    profile = db.query(HealthProfile).filter(
-        HealthProfile.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(HealthProfile).where(
+            HealthProfile.user_id == current_user.user_id
+        )
+    )
+    profile = result.scalars().first()
     
     if not profile:
         raise HTTPException(
@@ -78,18 +101,22 @@ def update_health_profile(
     for field, value in update_data.items():
         setattr(profile, field, value)
     
-    db.commit()
-    db.refresh(profile)
+    await bump_version(db, current_user.user_id, HealthProfile.__tablename__)
+    await db.commit()
+    await db.refresh(profile)
     
     return profile
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-def delete_health_profile(current_user: CurrentUserDep, db: DatabaseDep):
+async def delete_health_profile(current_user: CurrentUserDep, db: DatabaseDep):
     """Delete health profile for the current user."""
-    profile = db.query(HealthProfile).filter(
-        HealthProfile.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(HealthProfile).where(
+            HealthProfile.user_id == current_user.user_id
+        )
+    )
+    profile = result.scalars().first()
     
     if not profile:
         raise HTTPException(
@@ -97,7 +124,8 @@ def delete_health_profile(current_user: CurrentUserDep, db: DatabaseDep):
             detail="Health profile not found"
         )
     
-    db.delete(profile)
-    db.commit()
+    await db.delete(profile)
+    await bump_version(db, current_user.user_id, HealthProfile.__tablename__)
+    await db.commit()
     
     return None
@@ -1,15 +1,55 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, status, Query
+from sqlalchemy import func, select
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response
+from starlette.concurrency import run_in_threadpool
 
 from app.utils.dependencies import DatabaseDep, CurrentUserDep
+from app.utils.pagination import PageDep, paginate
+from app.utils.versioning import bump_version
+from app.utils.response_cache import cached_list_response
+from app.utils.bulk import BulkItemsBody, bulk_create
+from app.utils.file_storage import file_storage, save_upload
+from app.utils.responses import RangeFileResponse
 from app.models.lab_scan_test import LabScanTest, TestTypeEnum
 from app.schemas.lab_scan_test import LabScanTestCreate, LabScanTestRead
+from app.schemas.bulk import BulkResult
 
 router = APIRouter(prefix="/tests", tags=["Lab & Scan Tests"])
 
 
+async def get_user_test(db, test_id: str, user_id: str) -> LabScanTest:
+    result = await db.execute(
+        select(LabScanTest).where(
+            LabScanTest.test_id == test_id,
+            LabScanTest.user_id == user_id
+        )
+    )
+    test = result.scalars().first()
+
+    if not test:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Test not found"
+        )
+
+    return test
+
+
+async def release_file(db, file_sha256: Optional[str]) -> None:
+    """Remove a stored blob once no test references it any more."""
+    if not file_sha256:
+        return
+    references = await db.scalar(
+        select(func.count()).select_from(LabScanTest).where(
+            LabScanTest.file_sha256 == file_sha256
+        )
+    )
+    if not references:
+        await run_in_threadpool(file_storage.remove, file_sha256)
+
+
 @router.post("", response_model=LabScanTestRead, status_code=status.HTTP_201_CREATED)
-def create_test(
+async def create_test(
     test_data: LabScanTestCreate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
@@ -25,68 +65,156 @@ def create_test(
     )
 
     db.add(new_test)
-    db.commit()
-    db.refresh(new_test)
+    await bump_version(db, current_user.user_id, LabScanTest.__tablename__)
+    await db.commit()
+    await db.refresh(new_test)
 
     return new_test
 
 
+@router.post("/bulk", response_model=BulkResult[LabScanTestRead])
+async def create_tests_bulk(
+    items: BulkItemsBody,
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+):
+    """Register many lab or scan tests in one transaction.
+    
+    Each item is validated on its own; invalid items are reported in the
+    per-item results without aborting the rest of the batch.
+    """
+    return await bulk_create(
+        db,
+        items,
+        LabScanTest,
+        LabScanTestCreate,
+        build_row=lambda data: {"user_id": current_user.user_id, **data.model_dump()},
+        build_item=lambda row, data: row,
+    )
+
+
 @router.get("", response_model=List[LabScanTestRead])
-def get_tests(
+async def get_tests(
     current_user: CurrentUserDep,
     db: DatabaseDep,
+    page: PageDep,
+    request: Request,
+    response: Response,
     test_type: Optional[TestTypeEnum] = Query(None, description="Filter by test type (Lab or Scan)")
 ):
-    """Retrieve all tests for the current user, optionally filtered by type."""
-    query = db.query(LabScanTest).filter(LabScanTest.user_id == current_user.user_id)
+    """Retrieve the current user's tests, newest first, optionally filtered by type."""
+    query = select(LabScanTest).where(LabScanTest.user_id == current_user.user_id)
 
     if test_type:
-        query = query.filter(LabScanTest.test_type == test_type)
-
-    tests = query.order_by(LabScanTest.created_at.desc()).all()
-    return tests
+        query = query.where(LabScanTest.test_type == test_type)
+
+    return await cached_list_response(
+        db, request, response, current_user.user_id, LabScanTest.__tablename__, LabScanTestRead,
+        load=lambda: paginate(
+            db,
+            query,
+            LabScanTest.created_at,
+            LabScanTest.test_id,
+            page,
+            request,
+            response,
+            descending=True,
+        ),
+    )
 
 
 @router.get("/{test_id}", response_model=LabScanTestRead)
-def get_test(
+async def get_test(
     test_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
     """Get a specific test."""
-    test = db.query(LabScanTest).filter(
-        LabScanTest.test_id == test_id,
-        LabScanTest.user_id == current_user.user_id
-    ).first()
+    return await get_user_test(db, test_id, current_user.user_id)
 
-    if not test:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Test not found"
-        )
+
+@router.post("/{test_id}/file", response_model=LabScanTestRead)
+async def upload_test_file(
+    test_id: str,
+    request: Request,
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+):
+    """Upload the image/report for a test as multipart field 'file'.
+    
+    The body is streamed to content-addressed storage, so identical files
+    are stored once. Replaces any previously uploaded file.
+    """
+    user_id = current_user.user_id
+    # Reject uploads for unknown tests up front, then hand the connection
+    # back to the pool: a slow client must not hold it for the whole body
+    await get_user_test(db, test_id, user_id)
+    await db.commit()
+
+    blob = await save_upload(request)
+
+    try:
+        test = await get_user_test(db, test_id, user_id)
+    except HTTPException:
+        # Deleted during the upload
+        await release_file(db, blob.sha256)
+        raise
+    previous_sha256 = test.file_sha256
+
+    test.file_sha256 = blob.sha256
+    test.file_size = blob.size
+    test.file_content_type = blob.content_type
+    test.image_url = f"/tests/{test_id}/file"
+    await bump_version(db, user_id, LabScanTest.__tablename__)
+    await db.commit()
+
+    if previous_sha256 != blob.sha256:
+        await release_file(db, previous_sha256)
 
     return test
 
 
-@router.delete("/{test_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_test(
+@router.get("/{test_id}/file")
+async def download_test_file(
     test_id: str,
+    request: Request,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
-    """Delete a test record."""
-    test = db.query(LabScanTest).filter(
-        LabScanTest.test_id == test_id,
-        LabScanTest.user_id == current_user.user_id
-    ).first()
+    """Download the uploaded file of a test. Supports single byte ranges."""
+    test = await get_user_test(db, test_id, current_user.user_id)
 
-    if not test:
+    if not test.file_sha256 or not file_storage.exists(test.file_sha256):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Test not found"
+            detail="Test has no uploaded file"
         )
 
-    db.delete(test)
-    db.commit()
+    return RangeFileResponse(
+        file_storage.path_for(test.file_sha256),
+        range_header=request.headers.get("range"),
+        media_type=test.file_content_type,
+        headers={
+            "etag": f'"{test.file_sha256}"',
+            "cache-control": "private, max-age=0",
+        },
+        method=request.method,
+    )
+
+
+@router.delete("/{test_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_test(
+    test_id: str,
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+):
+    """Delete a test record."""
+    test = await get_user_test(db, test_id, current_user.user_id)
+    file_sha256 = test.file_sha256
+
+    await db.delete(test)
+    await bump_version(db, current_user.user_id, LabScanTest.__tablename__)
+    await db.commit()
+    await release_file(db, file_sha256)
 
     return None
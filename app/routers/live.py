@@ -0,0 +1,51 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from app.utils.dependencies import CurrentUserDep
+from app.utils.live_updates import hub, stream_events
+
+router = APIRouter(prefix="/live", tags=["Live Updates"])
+
+EVENT_STREAM_MEDIA_TYPE = "text/event-stream"
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {EVENT_STREAM_MEDIA_TYPE: {}}}},
+)
+async def live_events(
+    current_user: CurrentUserDep,
+    last_event_id: Optional[str] = Header(None),
+):
+    """Server-sent events for changes to the current user's linked family members.
+
+    Each ``change`` event names the linked user, the record type
+    (health_profile, medication, allergy, disease, test), its id and
+    whether it was deleted (identifiers only, never record contents). Reconnect
+    with ``Last-Event-ID`` to receive missed events. A ``reset`` event
+    means too many were missed, and ``evicted`` that the client fell too
+    far behind and should reconnect.
+    """
+    if hub.full:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live connections",
+            headers={"Retry-After": "5"},
+        )
+
+    try:
+        after = int(last_event_id) if last_event_id else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Last-Event-ID"
+        )
+
+    return StreamingResponse(
+        stream_events(current_user.user_id, after),
+        media_type=EVENT_STREAM_MEDIA_TYPE,
+        # Proxies must pass events through as they are written
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
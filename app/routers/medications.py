@@ -1,19 +1,33 @@
 from typing import List
-from fastapi import APIRouter, HTTPException, status
+from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Request, Response, status
 
 from app.utils.dependencies import DatabaseDep, CurrentUserDep
+from app.utils.pagination import PageDep, paginate
+from app.utils.versioning import bump_version
+from app.utils.response_cache import cached_list_response
+from app.utils.bulk import (
+    BulkItemsBody,
+    build_bulk_result,
+    bulk_create,
+    bulk_update,
+    error_result,
+    validate_bulk_items,
+)
 from app.models.medication import Medication
 from app.schemas.medication import (
     MedicationCreate,
     MedicationRead,
     MedicationUpdate,
+    MedicationBulkUpdate,
 )
+from app.schemas.bulk import BulkResult
 
 router = APIRouter(prefix="/medications", tags=["Medications"])
 
 
 @router.post("", response_model=MedicationRead, status_code=status.HTTP_201_CREATED)
-def create_medication(
+async def create_medication(
     med_data: MedicationCreate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
@@ -27,29 +41,118 @@ def create_medication(
     )
 
     db.add(new_medication)
-    db.commit()
-    db.refresh(new_medication)
+    await bump_version(db, current_user.user_id, Medication.__tablename__)
+    await db.commit()
+    await db.refresh(new_medication)
 
     return new_medication
 
 
+@router.post("/bulk", response_model=BulkResult[MedicationRead])
+async def create_medications_bulk(
+    items: BulkItemsBody,
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+):
+    """Create many medications in one transaction.
+
+    Each item is validated on its own; invalid items are reported in the
+    per-item results without aborting the rest of the batch.
+    """
+    return await bulk_create(
+        db,
+        items,
+        Medication,
+        MedicationCreate,
+        build_row=lambda data: {"user_id": current_user.user_id, **data.model_dump()},
+        build_item=lambda row, data: row,
+    )
+
+
+@router.patch("/bulk", response_model=BulkResult[MedicationRead])
+async def update_medications_bulk(
+    items: BulkItemsBody,
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+):
+    """Update many medications (identified by med_id) in one transaction.
+
+    Only the fields present in each item are changed. Invalid items,
+    unknown med_ids and updates the database rejects are reported per item
+    without aborting the batch.
+    """
+    valid, results = validate_bulk_items(items, MedicationBulkUpdate)
+
+    med_ids = {data.med_id for _, data in valid}
+    result = await db.execute(
+        select(Medication).where(
+            Medication.med_id.in_(med_ids),
+            Medication.user_id == current_user.user_id
+        )
+    )
+    medications = {medication.med_id: medication for medication in result.scalars().all()}
+
+    updates = []
+    for index, data in valid:
+        medication = medications.get(data.med_id)
+        if medication is None:
+            results[index] = error_result(index, "Medication not found")
+            continue
+        updates.append((index, medication, data.model_dump(exclude_unset=True, exclude={"med_id"})))
+
+    failures = await bulk_update(db, Medication, updates)
+    updated = [(index, medication) for index, medication, _ in updates if index not in failures]
+    if updated:
+        await bump_version(db, current_user.user_id, Medication.__tablename__)
+    await db.commit()
+
+    for index, error in failures.items():
+        results[index] = error_result(index, error)
+    for index, medication in updated:
+        results[index] = {
+            "index": index,
+            "status": "updated",
+            "item": medication,
+            "error": None,
+        }
+    return build_bulk_result(results)
+
+
 @router.get("", response_model=List[MedicationRead])
-def get_medications(current_user: CurrentUserDep, db: DatabaseDep):
-    return db.query(Medication).filter(
-        Medication.user_id == current_user.user_id
-    ).all()
+async def get_medications(
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+    page: PageDep,
+    request: Request,
+    response: Response,
+):
+    return await cached_list_response(
+        db, request, response, current_user.user_id, Medication.__tablename__, MedicationRead,
+        load=lambda: paginate(
+            db,
+            select(Medication).where(Medication.user_id == current_user.user_id),
+            Medication.created_at,
+            Medication.med_id,
+            page,
+            request,
+            response,
+        ),
+    )
 
 
 @router.get("/{med_id}", response_model=MedicationRead)
-def get_medication(
+async def get_medication(
     med_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
-    medication = db.query(Medication).filter(
-        Medication.med_id == med_id,
-        Medication.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Medication).where(
+            Medication.med_id == med_id,
+            Medication.user_id == current_user.user_id
+        )
+    )
+    medication = result.scalars().first()
 
     if not medication:
         raise HTTPException(
@@ -61,16 +164,19 @@ def get_medication(
 
 
 @router.put("/{med_id}", response_model=MedicationRead)
-def update_medication(
+async def update_medication(
     med_id: str,
     med_data: MedicationUpdate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
-    medication = db.query(Medication).filter(
-        Medication.med_id == med_id,
-        Medication.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Medication).where(
+            Medication.med_id == med_id,
+            Medication.user_id == current_user.user_id
+        )
+    )
+    medication = result.scalars().first()
 
     if not medication:
         raise HTTPException(
@@ -82,22 +188,26 @@ def update_medication(
     for field, value in update_data.items():
         setattr(medication, field, value)
 
-    db.commit()
-    db.refresh(medication)
+    await bump_version(db, current_user.user_id, Medication.__tablename__)
+    await db.commit()
+    await db.refresh(medication)
 
     return medication
 
 
 @router.delete("/{med_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_medication(
+async def delete_medication(
     med_id: str,
     current_user: CurrentUserDep,
     db: DatabaseDep,
 ):
-    medication = db.query(Medication).filter(
-        Medication.med_id == med_id,
-        Medication.user_id == current_user.user_id
-    ).first()
+    result = await db.execute(
+        select(Medication).where(
+            Medication.med_id == med_id,
+            Medication.user_id == current_user.user_id
+        )
+    )
+    medication = result.scalars().first()
 
     if not medication:
         raise HTTPException(
@@ -105,6 +215,7 @@ def delete_medication(
             detail="Medication not found"
         )
 
-    db.delete(medication)
-    db.commit()
+    await db.delete(medication)
+    await bump_version(db, current_user.user_id, Medication.__tablename__)
+    await db.commit()
     return None
@@ -0,0 +1,143 @@
+from typing import Annotated
+
+from anyio import to_thread
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app import database
+from app.config import settings
+from app.utils import metrics
+from app.utils.dependencies import admin_token_scheme, principal_cache, require_admin
+from app.utils.decryption import decrypt_cache
+from app.utils.response_cache import response_cache
+from app.utils.export import export_stats
+from app.utils.live_updates import hub
+from app.utils.hashing import password_hasher
+from app.utils.notifications import dispatcher
+from app.utils.rate_limit import (
+    login_rate_limit,
+    forgot_password_rate_limit,
+    otp_rate_limit,
+)
+
+router = APIRouter(tags=["Root"])
+
+# Starlette appends "; charset=utf-8" to text/ media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+def database_pools() -> dict[str, object]:
+    """Connection pools by role; the read pools are omitted when shared."""
+    pools = {
+        "write": database.engine.pool,
+        "read": database.read_engine.pool,
+        "async_write": database.async_engine.sync_engine.pool,
+        "async_read": database.async_read_engine.sync_engine.pool,
+    }
+    seen = set()
+    unique = {}
+    for name, pool in pools.items():
+        if id(pool) not in seen:
+            seen.add(id(pool))
+            unique[name] = pool
+    return unique
+
+
+def write_pool_metrics(writer: metrics.MetricsWriter) -> None:
+    pools = database_pools()
+    gauges = (
+        ("db_pool_size", "Configured pool size", "size"),
+        ("db_pool_checked_out", "Connections currently checked out", "checkedout"),
+        ("db_pool_overflow", "Connections opened beyond the pool size", "overflow"),
+    )
+    for name, help_text, method in gauges:
+        writer.family(name, "gauge", help_text)
+        for role, pool in pools.items():
+            if hasattr(pool, method):
+                # QueuePool.overflow() counts up from -pool_size
+                writer.sample(name, max(getattr(pool, method)(), 0), pool=role)
+
+    counters = (
+        ("db_pool_checkouts_total", "Connection checkouts", "checkouts"),
+        ("db_pool_checkout_timeouts_total", "Checkouts that timed out", "checkout_timeouts"),
+        ("db_pool_checkout_wait_seconds_total", "Time spent waiting for a connection", "checkout_wait_seconds"),
+    )
+    for name, help_text, attribute in counters:
+        writer.family(name, "counter", help_text)
+        for role, pool in pools.items():
+            if hasattr(pool, attribute):
+                writer.sample(name, getattr(pool, attribute), pool=role)
+
+
+def write_threadpool_metrics(writer: metrics.MetricsWriter) -> None:
+    limiter = to_thread.current_default_thread_limiter()
+    writer.metric(
+        "threadpool_threads_busy", "gauge", "Threadpool tokens in use",
+        limiter.borrowed_tokens,
+    )
+    writer.metric(
+        "threadpool_threads_total", "gauge", "Threadpool capacity",
+        limiter.total_tokens,
+    )
+    writer.metric(
+        "threadpool_tasks_waiting", "gauge", "Tasks waiting for a threadpool thread",
+        limiter.statistics().tasks_waiting,
+    )
+
+
+def require_metrics_access(token: Annotated[str | None, Depends(admin_token_scheme)]) -> None:
+    """Metrics describe the deployment's internals: admins only unless METRICS_PUBLIC."""
+    if not settings.METRICS_PUBLIC:
+        require_admin(token)
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_access)],
+)
+async def get_metrics():
+    """Prometheus metrics."""
+    writer = metrics.MetricsWriter()
+    metrics.write_http_metrics(writer)
+    write_threadpool_metrics(writer)
+    write_pool_metrics(writer)
+
+    writer.family("argon2_duration_seconds", "histogram", "Argon2 hash/verify time on a worker")
+    writer.histogram("argon2_duration_seconds", metrics.argon2_seconds)
+    writer.family("argon2_wait_seconds", "histogram", "Time Argon2 operations waited for a worker")
+    writer.histogram("argon2_wait_seconds", metrics.argon2_wait_seconds)
+    writer.stats("argon2_pool", password_hasher.stats(), "Argon2 worker pool", counters=("completed", "rejected"))
+
+    writer.family("fernet_duration_seconds", "histogram", "Fernet operation time")
+    writer.histogram("fernet_duration_seconds", metrics.fernet_encrypt_seconds, operation="encrypt")
+    writer.histogram("fernet_duration_seconds", metrics.fernet_decrypt_seconds, operation="decrypt")
+
+    writer.stats("principal_cache", principal_cache.stats(), "Principal cache", counters=("hits", "misses"))
+    writer.stats(
+        "decrypt_cache", decrypt_cache.stats(), "Decrypted value cache",
+        counters=("hits", "misses", "evictions"),
+    )
+    writer.stats(
+        "response_cache", response_cache.stats(), "Serialized list response cache",
+        counters=("hits", "misses", "coalesced", "evictions"),
+    )
+
+    writer.stats(
+        "live", hub.stats(), "Live update hub",
+        counters=("published", "delivered", "evicted"),
+    )
+    writer.stats("export", export_stats.stats(), "NDJSON exports", counters=("exports", "rows", "seconds"))
+
+    writer.family("rate_limit_requests_total", "counter", "Rate-limited requests by scope and outcome")
+    for limit in (login_rate_limit, forgot_password_rate_limit, otp_rate_limit):
+        for outcome, count in limit.stats().items():
+            writer.sample("rate_limit_requests_total", count, scope=limit.scope, outcome=outcome)
+
+    writer.stats(
+        "outbox", dispatcher.stats(), "Notification outbox",
+        counters=("sent", "retried", "failed", "batches"),
+    )
+
+    return PlainTextResponse(writer.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,156 @@
+import base64
+import binascii
+import json
+from typing import Any, Optional
+from sqlalchemy import select
+from fastapi import APIRouter, HTTPException, Query, status
+
+from app.config import settings
+from app.utils.dependencies import DatabaseDep, CurrentUserDep
+from app.utils.decryption import decrypt_many
+from app.models.user import User
+from app.models.health_profile import HealthProfile
+from app.models.medication import Medication
+from app.models.allergy import Allergy
+from app.models.chronic_disease import ChronicDisease
+from app.models.lab_scan_test import LabScanTest
+from app.models.family_member import FamilyMember
+from app.models.change_log import ChangeLogEntry
+from app.routers.family_members import build_family_member_response, select_members_with_linked_users
+from app.schemas.user import UserRead
+from app.schemas.health_profile import HealthProfileRead
+from app.schemas.medication import MedicationRead
+from app.schemas.allergy import AllergyRead
+from app.schemas.chronic_disease import ChronicDiseaseRead
+from app.schemas.lab_scan_test import LabScanTestRead
+from app.schemas.family_member import FamilyMemberRead
+from app.schemas.sync import SyncChange, SyncPage
+
+router = APIRouter(prefix="/sync", tags=["Sync"])
+
+# Table name -> (change type, model, read schema)
+SYNCED_RESOURCES = {
+    User.__tablename__: ("user", User, UserRead),
+    HealthProfile.__tablename__: ("health_profile", HealthProfile, HealthProfileRead),
+    Medication.__tablename__: ("medication", Medication, MedicationRead),
+    Allergy.__tablename__: ("allergy", Allergy, AllergyRead),
+    ChronicDisease.__tablename__: ("disease", ChronicDisease, ChronicDiseaseRead),
+    LabScanTest.__tablename__: ("test", LabScanTest, LabScanTestRead),
+    FamilyMember.__tablename__: ("family_member", FamilyMember, FamilyMemberRead),
+}
+
+
+def encode_sync_cursor(seq: int) -> str:
+    """Encode a change log position as an opaque cursor token."""
+    raw = json.dumps([seq], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> int:
+    """Decode a sync cursor, raising 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        (seq,) = json.loads(base64.urlsafe_b64decode(padded))
+        return int(seq)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync cursor"
+        )
+
+
+async def load_records(db, user_id: str, resource: str, record_ids: list[str]) -> dict[str, Any]:
+    """Current state of the user's records of one resource, keyed by id."""
+    _, model, schema = SYNCED_RESOURCES[resource]
+    primary_key = model.__mapper__.primary_key[0]
+
+    if model is FamilyMember:
+        result = await db.execute(
+            select_members_with_linked_users().where(
+                FamilyMember.family_id.in_(record_ids),
+                FamilyMember.user_id == user_id
+            )
+        )
+        return {
+            member.family_id: schema.model_validate(build_family_member_response(member, linked_user))
+            for member, linked_user in result.all()
+        }
+
+    result = await db.execute(
+        select(model).where(primary_key.in_(record_ids), model.user_id == user_id)
+    )
+    records = result.scalars().all()
+    if model is ChronicDisease:
+        names, _ = await decrypt_many(disease.name_encrypted for disease in records)
+        for disease, name in zip(records, names):
+            disease.name = name
+    return {
+        getattr(record, primary_key.key): schema.model_validate(record)
+        for record in records
+    }
+
+
+@router.get("", response_model=SyncPage)
+async def sync_changes(
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+    since: Optional[str] = Query(
+        None,
+        description="Cursor from the previous response's next_cursor; omit for a full sync",
+    ),
+    limit: int = Query(
+        settings.SYNC_PAGE_DEFAULT_LIMIT,
+        ge=1,
+        le=settings.SYNC_PAGE_MAX_LIMIT,
+        description="Maximum number of change log entries to read",
+    ),
+):
+    """Return the records changed since a cursor, across all resource types.
+
+    Each change carries the record's current state, or ``deleted: true``
+    for a tombstone. Keep calling with ``since=next_cursor`` while
+    ``has_more`` is true; store the last ``next_cursor`` for the next sync.
+    """
+    after = decode_sync_cursor(since) if since else 0
+    result = await db.execute(
+        select(ChangeLogEntry)
+        .where(ChangeLogEntry.user_id == current_user.user_id, ChangeLogEntry.seq > after)
+        .order_by(ChangeLogEntry.seq)
+        .limit(limit + 1)
+    )
+    entries = result.scalars().all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # Only the newest entry of each record in the page matters
+    latest: dict[tuple[str, str], ChangeLogEntry] = {}
+    for entry in entries:
+        latest.pop((entry.resource, entry.record_id), None)
+        latest[(entry.resource, entry.record_id)] = entry
+
+    wanted: dict[str, list[str]] = {}
+    for entry in latest.values():
+        if not entry.deleted:
+            wanted.setdefault(entry.resource, []).append(entry.record_id)
+    records = {
+        resource: await load_records(db, current_user.user_id, resource, record_ids)
+        for resource, record_ids in wanted.items()
+    }
+
+    changes = []
+    for entry in latest.values():
+        # Deleted since this entry was written: its tombstone is further on
+        data = records.get(entry.resource, {}).get(entry.record_id)
+        changes.append(SyncChange(
+            type=SYNCED_RESOURCES[entry.resource][0],
+            id=entry.record_id,
+            deleted=data is None,
+            changed_at=entry.changed_at,
+            data=data,
+        ))
+
+    return SyncPage(
+        changes=changes,
+        next_cursor=encode_sync_cursor(entries[-1].seq if entries else after),
+        has_more=has_more,
+    )
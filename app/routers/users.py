@@ -1,20 +1,118 @@
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
-from app.utils.dependencies import DatabaseDep, CurrentUserDep
+from app.utils.dependencies import DatabaseDep, CurrentUserDep, invalidate_principal
+from app.utils.decryption import decrypt_cached, decrypt_many
+from app.utils.export import NDJSON_MEDIA_TYPE, export_response
 from app.models.user import User
+from app.models.family_member import FamilyMember
+from app.routers.family_members import build_family_member_response, bump_linking_family_lists
 from app.schemas.user import UserRead, UserUpdate
+from app.schemas.record import UserRecordRead
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
+# include= section name -> User relationship eager-loaded for it
+RECORD_SECTIONS = {
+    "health_profile": selectinload(User.health_profile),
+    "medications": selectinload(User.medications),
+    "allergies": selectinload(User.allergies),
+    "diseases": selectinload(User.chronic_diseases),
+    "tests": selectinload(User.lab_scan_tests),
+    "family_members": selectinload(User.family_members).joinedload(FamilyMember.linked_user),
+}
+
 
 @router.get("/me", response_model=UserRead)
-def get_current_user_profile(current_user: CurrentUserDep):
+async def get_current_user_profile(current_user: CurrentUserDep):
     """Get the current authenticated user's profile."""
     return current_user
 
 
+@router.get("/me/record", response_model=UserRecordRead, response_model_exclude_unset=True)
+async def get_current_user_record(
+    current_user: CurrentUserDep,
+    db: DatabaseDep,
+    include: Optional[str] = Query(
+        None,
+        description="Comma-separated sections to return "
+        "(health_profile, medications, allergies, diseases, tests, family_members). "
+        "Defaults to all.",
+    ),
+):
+    """Get the current user's profile and health record in one response.
+
+    Each requested section is eager-loaded with one extra query, so the whole
+    record costs at most one query per section plus the user lookup.
+    """
+    if include:
+        sections = {section.strip() for section in include.split(",") if section.strip()}
+        unknown = sections - RECORD_SECTIONS.keys()
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown record sections: {', '.join(sorted(unknown))}"
+            )
+    else:
+        sections = set(RECORD_SECTIONS)
+
+    result = await db.execute(
+        select(User)
+        .where(User.user_id == current_user.user_id)
+        .options(*(RECORD_SECTIONS[section] for section in sections))
+        .execution_options(populate_existing=True)
+    )
+    user = result.scalars().one()
+
+    record = {"user": user}
+    if "health_profile" in sections:
+        record["health_profile"] = user.health_profile
+    if "medications" in sections:
+        record["medications"] = user.medications
+    if "allergies" in sections:
+        record["allergies"] = user.allergies
+    if "diseases" in sections:
+        names, _ = await decrypt_many(
+            disease.name_encrypted for disease in user.chronic_diseases
+        )
+        for disease, name in zip(user.chronic_diseases, names):
+            disease.name = name
+        record["diseases"] = user.chronic_diseases
+    if "tests" in sections:
+        record["tests"] = sorted(
+            user.lab_scan_tests, key=lambda test: test.created_at, reverse=True
+        )
+    if "family_members" in sections:
+        record["family_members"] = [
+            build_family_member_response(member, member.linked_user)
+            for member in user.family_members
+        ]
+
+    return record
+
+
+@router.get(
+    "/me/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def export_current_user(current_user: CurrentUserDep, request: Request):
+    """Download the current user's whole record as NDJSON.
+
+    One line per record (profile, health profile, medications, allergies,
+    diseases, tests, family links) and a final summary line; gzip-encoded
+    when the client sends ``Accept-Encoding: gzip``.
+    """
+    return export_response(
+        request, current_user.user_id, decrypt_cached, f"record-{current_user.code_number}.ndjson"
+    )
+
+
 @router.put("/me", response_model=UserRead)
-def update_current_user(
+async def update_current_user(
     user_data: UserUpdate,
     current_user: CurrentUserDep,
     db: DatabaseDep,
@@ -25,16 +123,22 @@ def update_current_user(
     for field, value in update_data.items():
         setattr(current_user, field, value)
     
-    db.commit()
-    db.refresh(current_user)
+    # Family lists of other users show this user's name
+    if update_data.keys() & {"first_name", "last_name"}:
+        await bump_linking_family_lists(db, current_user.user_id)
+    await db.commit()
+    await db.refresh(current_user)
+    invalidate_principal(current_user.user_id)
     
     return current_user
 
 
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
-def delete_current_user(current_user: CurrentUserDep, db: DatabaseDep):
+async def delete_current_user(current_user: CurrentUserDep, db: DatabaseDep):
     """Delete the current authenticated user's account."""
-    db.delete(current_user)
-    db.commit()
+    await bump_linking_family_lists(db, current_user.user_id)
+    await db.delete(current_user)
+    await db.commit()
+    invalidate_principal(current_user.user_id)
     
     return None
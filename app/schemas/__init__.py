@@ -32,7 +32,10 @@ from app.schemas.medication import (
     MedicationCreate,
     MedicationRead,
     MedicationUpdate,
+    MedicationBulkUpdate,
 )
+from app.schemas.record import UserRecordRead
+from app.schemas.bulk import BulkItemResult, BulkResult
 
 __all__ = [
     "UserCreate",
@@ -56,4 +59,8 @@ __all__ = [
     "MedicationCreate",
     "MedicationRead",
     "MedicationUpdate",
+    "MedicationBulkUpdate",
+    "UserRecordRead",
+    "BulkItemResult",
+    "BulkResult",
 ]
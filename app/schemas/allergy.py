@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel, Field
 
 
@@ -15,6 +16,7 @@ class AllergyRead(AllergyBase):
     """Schema for reading allergy data."""
     allergy_id: str
     user_id: str
+    updated_at: datetime
     
     class Config:
         from_attributes = True
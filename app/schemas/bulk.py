@@ -0,0 +1,19 @@
+from typing import Any, Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+ItemT = TypeVar("ItemT")
+
+
+class BulkItemResult(BaseModel, Generic[ItemT]):
+    """Outcome of a single item in a bulk request."""
+    index: int = Field(..., description="Position of the item in the request body")
+    status: str = Field(..., description="created, updated or error")
+    item: Optional[ItemT] = None
+    error: Optional[Any] = None
+
+
+class BulkResult(BaseModel, Generic[ItemT]):
+    """Schema for bulk create/update responses."""
+    succeeded: int
+    failed: int
+    results: List[BulkItemResult[ItemT]]
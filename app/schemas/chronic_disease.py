@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
 from pydantic import BaseModel, Field
 
@@ -18,6 +18,7 @@ class ChronicDiseaseRead(ChronicDiseaseBase):
     """Schema for reading chronic disease data."""
     disease_id: str
     user_id: str
+    updated_at: datetime
     
     class Config:
         from_attributes = True
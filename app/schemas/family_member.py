@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field
 
@@ -21,8 +22,10 @@ class FamilyMemberRead(BaseModel):
     user_id: str
     name: str  # Retrieved from linked user's first_name + last_name
     relation: str
-    linked_user_id: str
-    linked_user_code_number: str
+    # None once the linked user has deleted their account
+    linked_user_id: Optional[str] = None
+    linked_user_code_number: Optional[str] = None
+    updated_at: datetime
     
     class Config:
         from_attributes = True
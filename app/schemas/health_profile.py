@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from pydantic import BaseModel, Field
 
@@ -21,6 +22,7 @@ class HealthProfileRead(HealthProfileBase):
     """Schema for reading health profile data."""
     profile_id: str
     user_id: str
+    updated_at: datetime
     
     class Config:
         from_attributes = True
@@ -21,6 +21,10 @@ class LabScanTestRead(LabScanTestBase):
     test_id: str
     user_id: str
     created_at: datetime
+    updated_at: datetime
+    file_sha256: Optional[str] = None
+    file_size: Optional[int] = None
+    file_content_type: Optional[str] = None
     
     class Config:
         from_attributes = True
@@ -1,6 +1,6 @@
-from datetime import date
+from datetime import date, datetime
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 
 
 class MedicationBase(BaseModel):
@@ -20,6 +20,7 @@ class MedicationRead(MedicationBase):
     """Schema for reading medication data."""
     med_id: str
     user_id: str
+    updated_at: datetime
     
     class Config:
         from_attributes = True
@@ -31,3 +32,16 @@ class MedicationUpdate(BaseModel):
     dose: Optional[str] = Field(None, max_length=50)
     frequency: Optional[str] = Field(None, max_length=100)
     duration_end: Optional[date] = None
+
+    @field_validator("med_name")
+    @classmethod
+    def med_name_not_null(cls, value: Optional[str]) -> str:
+        # Optional so it can be omitted, but the column is NOT NULL
+        if value is None:
+            raise ValueError("med_name cannot be null")
+        return value
+
+
+class MedicationBulkUpdate(MedicationUpdate):
+    """Schema for one entry of a bulk medication update."""
+    med_id: str
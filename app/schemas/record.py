@@ -0,0 +1,24 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+from app.schemas.user import UserRead
+from app.schemas.health_profile import HealthProfileRead
+from app.schemas.medication import MedicationRead
+from app.schemas.allergy import AllergyRead
+from app.schemas.chronic_disease import ChronicDiseaseRead
+from app.schemas.lab_scan_test import LabScanTestRead
+from app.schemas.family_member import FamilyMemberRead
+
+
+class UserRecordRead(BaseModel):
+    """Schema for the aggregated patient record.
+
+    Sections not requested through ``include`` are omitted.
+    """
+    user: UserRead
+    health_profile: Optional[HealthProfileRead] = None
+    medications: Optional[List[MedicationRead]] = None
+    allergies: Optional[List[AllergyRead]] = None
+    diseases: Optional[List[ChronicDiseaseRead]] = None
+    tests: Optional[List[LabScanTestRead]] = None
+    family_members: Optional[List[FamilyMemberRead]] = None
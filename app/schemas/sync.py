@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import List, Optional, Union
+from pydantic import BaseModel, Field
+
+from app.schemas.user import UserRead
+from app.schemas.health_profile import HealthProfileRead
+from app.schemas.medication import MedicationRead
+from app.schemas.allergy import AllergyRead
+from app.schemas.chronic_disease import ChronicDiseaseRead
+from app.schemas.lab_scan_test import LabScanTestRead
+from app.schemas.family_member import FamilyMemberRead
+
+
+class SyncChange(BaseModel):
+    """One changed record: its current state, or a tombstone."""
+    type: str = Field(
+        ...,
+        description="user, health_profile, medication, allergy, disease, test or family_member",
+    )
+    id: str
+    deleted: bool
+    changed_at: datetime
+    data: Optional[
+        Union[
+            UserRead,
+            HealthProfileRead,
+            MedicationRead,
+            AllergyRead,
+            ChronicDiseaseRead,
+            LabScanTestRead,
+            FamilyMemberRead,
+        ]
+    ] = None
+
+
+class SyncPage(BaseModel):
+    """Schema for a page of delta sync results."""
+    changes: List[SyncChange]
+    next_cursor: str = Field(..., description="Pass as `since` in the next request")
+    has_more: bool
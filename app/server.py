@@ -0,0 +1,143 @@
+"""Pre-fork multi-process server.
+
+The parent process builds the app once -- loading keys and checking the
+schema, so misconfiguration fails before anything is forked -- binds the
+listening socket, and forks ``--workers`` children that each run uvicorn
+on the inherited socket. Workers share the imported code copy-on-write
+and start instantly; each runs the lifespan (background tasks, pools) for
+itself. The parent replaces workers that die and stops them all on
+SIGINT/SIGTERM.
+
+Usage::
+
+    python -m app.server --workers 4 --host 0.0.0.0 --port 8000
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+import uvicorn
+
+from app.config import settings
+from app.database import engine
+from app.main import create_app
+from app.migrations import check_schema
+from app.utils.dependencies import principal_cache
+
+logger = logging.getLogger("uvicorn.error")
+
+# A worker exiting this soon after it started is treated as a startup failure
+MIN_WORKER_UPTIME_SECONDS = 5.0
+
+
+def run_worker(config: uvicorn.Config, sock: socket.socket) -> None:
+    """Child process body: serve until told to stop, then exit."""
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, signal.SIG_DFL)
+    exit_code = 1
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+        exit_code = 0
+    except BaseException:
+        logger.exception("Worker %d crashed", os.getpid())
+    finally:
+        os._exit(exit_code)
+
+
+class Supervisor:
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, workers: int):
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        # pid -> start time
+        self.children: dict[int, float] = {}
+        self.stopping = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            run_worker(self.config, self.sock)
+        self.children[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+
+    def stop(self, sig: int, frame=None) -> None:
+        self.stopping = True
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        exit_code = 0
+        while self.children:
+            pid, status = os.wait()
+            started_at = self.children.pop(pid, None)
+            if started_at is None or self.stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if time.monotonic() - started_at < MIN_WORKER_UPTIME_SECONDS:
+                logger.error("Worker %d failed during startup (exit %d); shutting down", pid, code)
+                exit_code = 1
+                self.stop(signal.SIGTERM)
+                continue
+            logger.warning("Worker %d exited (%d); starting a replacement", pid, code)
+            self.spawn()
+        return exit_code
+
+
+def check_shared_state(workers: int) -> None:
+    """Refuse per-process stores that workers would each keep separately."""
+    if workers <= 1:
+        return
+    per_process = []
+    if settings.OTP_BACKEND == "memory":
+        per_process.append("OTP_BACKEND=memory")  # codes only verify in the issuing worker
+    if settings.RATE_LIMIT_ENABLED and settings.RATE_LIMIT_BACKEND == "memory":
+        per_process.append("RATE_LIMIT_BACKEND=memory")  # every worker gets the full budget
+    if per_process:
+        raise RuntimeError(
+            f"{' and '.join(per_process)} keep state per process; use the sqlite "
+            f"backend to run {workers} workers, or --workers 1"
+        )
+
+
+def serve(host: str, port: int, workers: int) -> int:
+    check_shared_state(workers)
+    if workers > 1:
+        # invalidate_principal() only reaches the worker that made the change
+        principal_cache.ttl = min(principal_cache.ttl, settings.PRINCIPAL_CACHE_MULTI_WORKER_TTL_SECONDS)
+    app = create_app()
+    check_schema(engine)
+    engine.dispose()
+
+    config = uvicorn.Config(app, host=host, port=port, lifespan="on")
+    sock = config.bind_socket()
+    logger.info("Pre-forking %d workers", workers)
+    return Supervisor(config, sock, workers).run()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve the API with pre-forked workers.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=settings.WEB_CONCURRENCY or os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    try:
+        sys.exit(serve(args.host, args.port, args.workers))
+    except RuntimeError as exc:  # missing keys, pending migrations, per-process stores
+        sys.exit(f"Startup failed: {exc}")
+
+
+if __name__ == "__main__":
+    main()
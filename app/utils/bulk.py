@@ -0,0 +1,166 @@
+import uuid
+from datetime import datetime
+from typing import Annotated, Any, Callable
+
+from fastapi import Body, HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, inspect, select
+from sqlalchemy.exc import DBAPIError
+
+from app.config import settings
+from app.utils.changelog import log_changes
+from app.utils.versioning import bump_version
+
+# Raw items are validated one by one so a bad entry fails alone
+BulkItemsBody = Annotated[list[Any], Body(..., min_length=1)]
+
+
+def check_batch_size(items: list[Any]) -> None:
+    if len(items) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BULK_MAX_ITEMS} items per bulk request"
+        )
+
+
+def validate_bulk_items(
+    items: list[Any],
+    schema: type[BaseModel],
+) -> tuple[list[tuple[int, BaseModel]], dict[int, dict[str, Any]]]:
+    """Validate each raw item against schema.
+
+    Returns the valid (index, model) pairs and error results keyed by index.
+    """
+    check_batch_size(items)
+    valid = []
+    results = {}
+    for index, raw in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(raw)))
+        except ValidationError as exc:
+            results[index] = error_result(index, [
+                {"loc": error["loc"], "msg": error["msg"], "type": error["type"]}
+                for error in exc.errors()
+            ])
+    return valid, results
+
+
+def error_result(index: int, error: Any) -> dict[str, Any]:
+    return {"index": index, "status": "error", "item": None, "error": error}
+
+
+def build_bulk_result(results: dict[int, dict[str, Any]]) -> dict[str, Any]:
+    ordered = [results[index] for index in sorted(results)]
+    failed = sum(1 for result in ordered if result["status"] == "error")
+    return {"succeeded": len(ordered) - failed, "failed": failed, "results": ordered}
+
+
+async def bulk_insert(db, model: type, rows: list[tuple[int, dict[str, Any]]]) -> dict[int, str]:
+    """Insert rows with a single executemany inside the current transaction.
+
+    If the database rejects the batch, rows are retried one per savepoint so
+    only the offending rows fail. Returns error messages keyed by index.
+    """
+    failures = {}
+    if not rows:
+        return failures
+
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(model), [row for _, row in rows])
+    except DBAPIError:
+        for index, row in rows:
+            try:
+                async with db.begin_nested():
+                    await db.execute(insert(model), [row])
+            except DBAPIError as exc:
+                failures[index] = str(exc.orig)
+    return failures
+
+
+def apply_changes(instance: Any, changes: dict[str, Any]) -> None:
+    for field, value in changes.items():
+        setattr(instance, field, value)
+
+
+async def bulk_update(db, model: type, updates: list[tuple[int, Any, dict[str, Any]]]) -> dict[int, str]:
+    """Apply (index, instance, changes) updates and flush them.
+
+    The batch is flushed in one savepoint, so the unit of work sends
+    same-shaped UPDATEs as one executemany. If the database rejects it, the
+    instances are reloaded and each update is retried in its own savepoint
+    so only the offending items fail. Returns error messages keyed by index.
+    """
+    failures = {}
+    if not updates:
+        return failures
+
+    try:
+        async with db.begin_nested():
+            for _, instance, changes in updates:
+                apply_changes(instance, changes)
+            await db.flush()
+    except DBAPIError:
+        # The rollback expired the instances; reload them from the stored rows
+        primary_key = model.__mapper__.primary_key[0]
+        await db.execute(
+            select(model)
+            .where(primary_key.in_([inspect(instance).identity[0] for _, instance, _ in updates]))
+            .execution_options(populate_existing=True)
+        )
+        for index, instance, changes in updates:
+            try:
+                async with db.begin_nested():
+                    apply_changes(instance, changes)
+                    await db.flush()
+            except DBAPIError as exc:
+                failures[index] = str(exc.orig)
+    return failures
+
+
+async def bulk_create(
+    db,
+    items: list[Any],
+    model: type,
+    schema: type[BaseModel],
+    build_row: Callable[[BaseModel], dict[str, Any]],
+    build_item: Callable[[dict[str, Any], BaseModel], Any],
+) -> dict[str, Any]:
+    """Validate, insert and report a bulk create request in one transaction.
+
+    build_row maps a validated item to column values (id and timestamps are
+    filled in here); build_item maps the inserted row to its response item.
+    """
+    valid, results = validate_bulk_items(items, schema)
+
+    primary_key = model.__mapper__.primary_key[0].key
+    created_at = datetime.utcnow()
+    rows = [
+        (index, {
+            primary_key: str(uuid.uuid4()),
+            "created_at": created_at,
+            "updated_at": created_at,
+            **build_row(data),
+        })
+        for index, data in valid
+    ]
+
+    failures = await bulk_insert(db, model, rows)
+    inserted = [row for index, row in rows if index not in failures]
+    # Core inserts bypass the session's change logging
+    await log_changes(db, model.__tablename__, ((row["user_id"], row[primary_key]) for row in inserted))
+    for user_id in {row["user_id"] for row in inserted}:
+        await bump_version(db, user_id, model.__tablename__)
+    await db.commit()
+
+    for (index, row), (_, data) in zip(rows, valid):
+        if index in failures:
+            results[index] = error_result(index, failures[index])
+        else:
+            results[index] = {
+                "index": index,
+                "status": "created",
+                "item": build_item(row, data),
+                "error": None,
+            }
+    return build_bulk_result(results)
@@ -0,0 +1,151 @@
+"""Append-only change log for delta sync.
+
+Every flush that inserts, updates or deletes a synced record appends one
+``change_log`` row per record in the same transaction, through a session
+event, so the routers need no extra calls. Writes that bypass the unit of
+work (Core bulk inserts, rows changed by ``ON DELETE SET NULL``) call
+``log_changes`` themselves.
+
+``GET /sync`` reads a user's entries after a cursor (``seq``). Entries
+superseded by a newer one for the same record are compacted away in the
+background; that never hides a change from any cursor, since the newest
+entry of every record is kept, tombstones included.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Iterable
+
+from sqlalchemy import Engine, delete, event, exists, insert, inspect
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.allergy import Allergy
+from app.models.change_log import ChangeLogEntry
+from app.models.chronic_disease import ChronicDisease
+from app.models.family_member import FamilyMember
+from app.models.health_profile import HealthProfile
+from app.models.lab_scan_test import LabScanTest
+from app.models.medication import Medication
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# Session.info flag: this transaction wrote change log entries
+CHANGES_LOGGED = "changes_logged"
+
+# Callbacks run after a transaction that logged changes commits
+_commit_hooks: list[Callable[[], None]] = []
+
+# Synced model -> attributes whose changes are not visible to clients
+SYNCED_MODELS: dict[type, frozenset[str]] = {
+    User: frozenset({"password_hash", "otp_code", "otp_expiry", "updated_at"}),
+    HealthProfile: frozenset({"updated_at"}),
+    Medication: frozenset({"updated_at"}),
+    Allergy: frozenset({"updated_at"}),
+    ChronicDisease: frozenset({"updated_at"}),
+    LabScanTest: frozenset({"updated_at"}),
+    FamilyMember: frozenset({"updated_at"}),
+}
+
+
+def on_changes_committed(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a callback to run after changes are committed (in any thread)."""
+    _commit_hooks.append(hook)
+    return hook
+
+
+def record_id(instance) -> str:
+    return getattr(instance, type(instance).__mapper__.primary_key[0].key)
+
+
+def is_visibly_modified(instance) -> bool:
+    hidden = SYNCED_MODELS[type(instance)]
+    return any(
+        attribute.key not in hidden and attribute.history.has_changes()
+        for attribute in inspect(instance).attrs
+    )
+
+
+def change_row(user_id: str, resource: str, record: str, deleted: bool, changed_at: datetime) -> dict:
+    return {
+        "user_id": user_id,
+        "resource": resource,
+        "record_id": record,
+        "deleted": deleted,
+        "changed_at": changed_at,
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _log_flushed_changes(session: Session, flush_context) -> None:
+    # new/dirty/deleted and attribute history still show the pre-flush state
+    new, dirty, removed = session.new, session.dirty, session.deleted
+    deleted_users = {user.user_id for user in removed if isinstance(user, User)}
+    now = datetime.utcnow()
+    rows = []
+    for instances, deleted in ((new, False), (dirty, False), (removed, True)):
+        for instance in instances:
+            if type(instance) not in SYNCED_MODELS or instance.user_id in deleted_users:
+                continue
+            if instances is dirty and not is_visibly_modified(instance):
+                continue
+            rows.append(change_row(
+                instance.user_id, type(instance).__tablename__, record_id(instance), deleted, now
+            ))
+    if rows:
+        session.connection().execute(insert(ChangeLogEntry.__table__), rows)
+        session.info[CHANGES_LOGGED] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _run_commit_hooks(session: Session) -> None:
+    if session.info.pop(CHANGES_LOGGED, False):
+        for hook in _commit_hooks:
+            hook()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_logged_flag(session: Session) -> None:
+    session.info.pop(CHANGES_LOGGED, None)
+
+
+async def log_changes(db, resource: str, records: Iterable[tuple[str, str]], deleted: bool = False) -> None:
+    """Log (user_id, record_id) changes made outside the unit of work."""
+    now = datetime.utcnow()
+    rows = [change_row(user_id, resource, record, deleted, now) for user_id, record in records]
+    if rows:
+        await db.execute(insert(ChangeLogEntry.__table__), rows)
+        db.sync_session.info[CHANGES_LOGGED] = True
+
+
+def compact_change_log(bind: Engine) -> int:
+    """Delete entries superseded by a newer entry for the same record."""
+    table = ChangeLogEntry.__table__
+    newer = table.alias()
+    with bind.begin() as conn:
+        result = conn.execute(
+            delete(table).where(
+                exists().where(
+                    newer.c.resource == table.c.resource,
+                    newer.c.record_id == table.c.record_id,
+                    newer.c.seq > table.c.seq,
+                )
+            )
+        )
+    return result.rowcount
+
+
+async def run_compactor(bind: Engine, interval: float | None = None) -> None:
+    """Compact the change log every ``interval`` seconds until cancelled."""
+    interval = interval or settings.CHANGE_LOG_COMPACT_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await run_in_threadpool(compact_change_log, bind)
+        except Exception:
+            logger.exception("Change log compaction failed")
+        else:
+            if removed:
+                logger.debug("Compacted %d superseded change log entries", removed)
@@ -0,0 +1,123 @@
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable
+
+from app.config import settings
+from app.utils import security
+from app.utils.cache import SizedLRUCache
+
+# Plaintexts keyed by SHA-256 of the ciphertext; memory only, never persisted
+decrypt_cache = SizedLRUCache(
+    max_bytes=settings.DECRYPT_CACHE_MAX_BYTES,
+    max_entries=settings.DECRYPT_CACHE_MAX_ENTRIES,
+    sizeof=lambda plaintext: len(plaintext.encode()),
+)
+security.on_key_rotation(decrypt_cache.clear)
+
+_executor: ThreadPoolExecutor | None = None
+
+
+@dataclass
+class DecryptStats:
+    """Per-call cache and timing figures for a decryption batch."""
+    hits: int = 0
+    misses: int = 0
+    seconds: float = 0.0
+    batched: bool = field(default=False)
+
+    def server_timing(self) -> str:
+        """Render as a Server-Timing metric."""
+        return (
+            f'decrypt;dur={self.seconds * 1000:.2f};'
+            f'desc="hits={self.hits} misses={self.misses}"'
+        )
+
+
+def _cache_key(ciphertext: str) -> bytes:
+    return hashlib.sha256(ciphertext.encode()).digest()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.DECRYPT_WORKERS,
+            thread_name_prefix="decrypt",
+        )
+    return _executor
+
+
+def _decrypt_chunk(ciphertexts: list[str]) -> list[str]:
+    return [security.decrypt_text(ciphertext) for ciphertext in ciphertexts]
+
+
+def decrypt_cached(ciphertext: str) -> str:
+    """Decrypt a single value through the plaintext cache."""
+    key = _cache_key(ciphertext)
+    plaintext = decrypt_cache.get(key)
+    if plaintext is None:
+        plaintext = security.decrypt_text(ciphertext)
+        decrypt_cache.set(key, plaintext)
+    return plaintext
+
+
+async def decrypt_many(ciphertexts: Iterable[str]) -> tuple[list[str], DecryptStats]:
+    """Decrypt a result set, serving repeats from the cache.
+
+    When at least DECRYPT_BATCH_THRESHOLD values miss the cache they are
+    decrypted in chunks on the worker pool instead of on the event loop.
+    """
+    started_at = time.perf_counter()
+    stats = DecryptStats()
+    ciphertexts = list(ciphertexts)
+    plaintexts: list[str | None] = [None] * len(ciphertexts)
+    pending: dict[bytes, list[int]] = {}
+    pending_ciphertexts: list[str] = []
+
+    for position, ciphertext in enumerate(ciphertexts):
+        key = _cache_key(ciphertext)
+        plaintext = decrypt_cache.get(key)
+        if plaintext is not None:
+            stats.hits += 1
+            plaintexts[position] = plaintext
+            continue
+
+        stats.misses += 1
+        if key not in pending:
+            pending[key] = []
+            pending_ciphertexts.append(ciphertext)
+        pending[key].append(position)
+
+    if len(pending_ciphertexts) >= settings.DECRYPT_BATCH_THRESHOLD:
+        stats.batched = True
+        size = settings.DECRYPT_BATCH_CHUNK_SIZE
+        chunks = [
+            pending_ciphertexts[start:start + size]
+            for start in range(0, len(pending_ciphertexts), size)
+        ]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(_get_executor(), _decrypt_chunk, chunk)
+            for chunk in chunks
+        ))
+        decrypted = [plaintext for chunk in results for plaintext in chunk]
+    else:
+        decrypted = _decrypt_chunk(pending_ciphertexts)
+
+    for (key, positions), plaintext in zip(pending.items(), decrypted):
+        decrypt_cache.set(key, plaintext)
+        for position in positions:
+            plaintexts[position] = plaintext
+
+    stats.seconds = time.perf_counter() - started_at
+    return plaintexts, stats
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -1,20 +1,41 @@
+import hmac
 from typing import Annotated
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from fastapi.security import APIKeyHeader, OAuth2PasswordBearer
 from jose import JWTError, jwt
 
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.config import settings
 from app.models.user import User
+from app.utils.cache import TTLCache
 
 # Database dependency type alias
-DatabaseDep = Annotated[Session, Depends(get_db)]
+DatabaseDep = Annotated[AsyncSession, Depends(get_db)]
+# Read-only session for POST handlers that never write (keeps the writer pool free)
+ReadDatabaseDep = Annotated[AsyncSession, Depends(get_read_db)]
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# Shared-secret header for the /admin endpoints
+admin_token_scheme = APIKeyHeader(name="X-Admin-Token", auto_error=False)
+# Detached User snapshots keyed by the JWT "sub" claim
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
 
 
-def get_current_user(
+def invalidate_principal(user_id: str) -> None:
+    """Drop a cached principal after its users row changed.
+
+    Only this process's cache is cleared; other workers keep their copy
+    until it expires, which is why app.server caps the TTL.
+    """
+    principal_cache.pop(user_id)
+
+
+async def get_current_user(
     token: Annotated[str, Depends(oauth2_scheme)],
     db: DatabaseDep,
 ) -> User:
@@ -35,12 +56,35 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if user is None:
-        raise credentials_exception
+    cached = principal_cache.get(user_id)
+    if cached is None:
+        result = await db.execute(select(User).where(User.user_id == user_id))
+        user = result.scalars().first()
+        if user is None:
+            raise credentials_exception
+
+        # Cache a detached snapshot so request-level changes never leak into it
+        db.expunge(user)
+        principal_cache.set(user_id, user)
+        cached = user
 
-    return user
+    # Attach a per-request copy without re-selecting the row
+    return await db.merge(cached, load=False)
 
 
 # Current user dependency type alias
 CurrentUserDep = Annotated[User, Depends(get_current_user)]
+
+
+def require_admin(token: Annotated[str | None, Depends(admin_token_scheme)]) -> None:
+    """Check the X-Admin-Token header against ADMIN_API_TOKEN."""
+    expected = settings.ADMIN_API_TOKEN
+    if not expected or not token or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access denied",
+        )
+
+
+# Admin dependency type alias
+AdminDep = Annotated[None, Depends(require_admin)]
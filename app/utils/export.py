@@ -0,0 +1,256 @@
+"""Streaming NDJSON exports of health records.
+
+One JSON object per line, ``{"type": ..., "data": ...}``, in the same
+shapes as the REST API, followed by a ``{"type": "summary", ...}`` line so
+consumers can tell a complete export from a truncated one. Each table is
+read with one server-side cursor (``yield_per``) in index order, so memory
+stays constant however many users are exported, and the output is
+gzip-compressed incrementally as it is produced.
+
+Generators are synchronous and run on their own read session: Starlette
+iterates them in the threadpool, and request-scoped sessions are already
+closed while the body streams.
+"""
+import logging
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
+from app.database import ReadSessionLocal
+from app.models.allergy import Allergy
+from app.models.chronic_disease import ChronicDisease
+from app.models.family_member import FamilyMember
+from app.models.health_profile import HealthProfile
+from app.models.lab_scan_test import LabScanTest
+from app.models.medication import Medication
+from app.models.user import User
+from app.schemas.allergy import AllergyRead
+from app.schemas.chronic_disease import ChronicDiseaseRead
+from app.schemas.health_profile import HealthProfileRead
+from app.schemas.lab_scan_test import LabScanTestRead
+from app.schemas.medication import MedicationRead
+from app.schemas.user import UserRead
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# Compressed output is handed to the server in chunks of about this size
+GZIP_CHUNK_BYTES = 64 * 1024
+
+
+@dataclass
+class ExportStats:
+    exports: int = 0
+    rows: int = 0
+    seconds: float = 0.0
+    last_rows_per_second: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, rows: int, seconds: float) -> None:
+        with self._lock:
+            self._record(rows, seconds)
+
+    def _record(self, rows: int, seconds: float) -> None:
+        self.exports += 1
+        self.rows += rows
+        self.seconds += seconds
+        self.last_rows_per_second = rows / seconds if seconds else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "exports": self.exports,
+            "rows": self.rows,
+            "seconds": self.seconds,
+            "rows_per_second": self.rows / self.seconds if self.seconds else 0.0,
+            "last_rows_per_second": self.last_rows_per_second,
+        }
+
+
+export_stats = ExportStats()
+
+
+def _model_section(record_type: str, model: type, schema: type[BaseModel], order: tuple):
+    adapter = TypeAdapter(schema)
+
+    def rows(user_id: Optional[str]) -> Select:
+        statement = select(model.__table__)
+        if user_id is not None:
+            statement = statement.where(model.__table__.c.user_id == user_id)
+        return statement.order_by(*order)
+
+    def encode(row: dict[str, Any], decrypt: Callable[[str], str]) -> bytes:
+        return adapter.dump_json(adapter.validate_python(dict(row)))
+
+    return record_type, rows, encode
+
+
+def _disease_section():
+    record_type, rows, _ = _model_section(
+        "disease", ChronicDisease, ChronicDiseaseRead,
+        (ChronicDisease.user_id, ChronicDisease.created_at, ChronicDisease.disease_id),
+    )
+    adapter = TypeAdapter(ChronicDiseaseRead)
+
+    def encode(row: dict[str, Any], decrypt: Callable[[str], str]) -> bytes:
+        # The "name" column holds the ciphertext
+        return adapter.dump_json(adapter.validate_python({**row, "name": decrypt(row["name"])}))
+
+    return record_type, rows, encode
+
+
+def _family_section():
+    adapter = TypeAdapter(dict[str, Any])
+    linked_user = aliased(User)
+
+    def rows(user_id: Optional[str]) -> Select:
+        statement = select(
+            FamilyMember.__table__,
+            linked_user.first_name.label("linked_first_name"),
+            linked_user.last_name.label("linked_last_name"),
+            linked_user.code_number.label("linked_code_number"),
+        ).outerjoin(linked_user, FamilyMember.linked_user_id == linked_user.user_id)
+        if user_id is not None:
+            statement = statement.where(FamilyMember.user_id == user_id)
+        return statement.order_by(FamilyMember.user_id, FamilyMember.created_at, FamilyMember.family_id)
+
+    def encode(row: dict[str, Any], decrypt: Callable[[str], str]) -> bytes:
+        linked = row["linked_code_number"] is not None
+        # Same shape as build_family_member_response()
+        return adapter.dump_json({
+            "family_id": row["family_id"],
+            "user_id": row["user_id"],
+            "name": f"{row['linked_first_name']} {row['linked_last_name']}" if linked else row["name"],
+            "relation": row["relation"],
+            "linked_user_id": row["linked_user_id"],
+            "linked_user_code_number": row["linked_code_number"],
+            "updated_at": row["updated_at"],
+        })
+
+    return "family_member", rows, encode
+
+
+SECTIONS = [
+    _model_section("user", User, UserRead, (User.user_id,)),
+    _model_section("health_profile", HealthProfile, HealthProfileRead, (HealthProfile.user_id,)),
+    _model_section(
+        "medication", Medication, MedicationRead,
+        (Medication.user_id, Medication.created_at, Medication.med_id),
+    ),
+    _model_section(
+        "allergy", Allergy, AllergyRead,
+        (Allergy.user_id, Allergy.created_at, Allergy.allergy_id),
+    ),
+    _disease_section(),
+    _model_section(
+        "test", LabScanTest, LabScanTestRead,
+        (LabScanTest.user_id, LabScanTest.created_at, LabScanTest.test_id),
+    ),
+    _family_section(),
+]
+
+
+def iter_records(
+    session: Session,
+    user_id: Optional[str],
+    decrypt: Callable[[str], str],
+    counts: dict[str, int],
+) -> Iterator[bytes]:
+    """NDJSON lines for one user (or everyone when user_id is None)."""
+    for record_type, rows, encode in SECTIONS:
+        prefix = b'{"type":"' + record_type.encode() + b'","data":'
+        result = session.execute(
+            rows(user_id), execution_options={"yield_per": settings.EXPORT_YIELD_PER}
+        )
+        count = 0
+        for row in result.mappings():
+            yield prefix + encode(row, decrypt) + b"}\n"
+            count += 1
+        counts[record_type] = count
+
+
+def gzip_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    pending = []
+    pending_bytes = 0
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            pending.append(compressed)
+            pending_bytes += len(compressed)
+            if pending_bytes >= GZIP_CHUNK_BYTES:
+                yield b"".join(pending)
+                pending.clear()
+                pending_bytes = 0
+    pending.append(compressor.flush())
+    yield b"".join(pending)
+
+
+def batch_stream(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """Group small lines so each threadpool hop sends a sizeable chunk."""
+    pending = []
+    pending_bytes = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_bytes += len(chunk)
+        if pending_bytes >= GZIP_CHUNK_BYTES:
+            yield b"".join(pending)
+            pending.clear()
+            pending_bytes = 0
+    if pending:
+        yield b"".join(pending)
+
+
+def export_ndjson(user_id: Optional[str], decrypt: Callable[[str], str]) -> Iterator[bytes]:
+    """Export lines plus the summary line; records throughput in export_stats."""
+    counts: dict[str, int] = {}
+    started_at = time.perf_counter()
+    with ReadSessionLocal() as session:
+        yield from iter_records(session, user_id, decrypt, counts)
+
+    seconds = time.perf_counter() - started_at
+    rows = sum(counts.values())
+    export_stats.record(rows, seconds)
+    logger.info(
+        "Exported %d rows in %.2fs (%.0f rows/s)%s",
+        rows, seconds, rows / seconds if seconds else 0.0,
+        f" for user {user_id}" if user_id else "",
+    )
+    summary = TypeAdapter(dict[str, Any]).dump_json({
+        "rows": rows,
+        "counts": counts,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(rows / seconds if seconds else 0.0, 1),
+    })
+    yield b'{"type":"summary","data":' + summary + b"}\n"
+
+
+def accepts_gzip(request: Request) -> bool:
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def export_response(
+    request: Request,
+    user_id: Optional[str],
+    decrypt: Callable[[str], str],
+    filename: str,
+) -> StreamingResponse:
+    """Stream an export, gzip-encoded when the client accepts it."""
+    lines = export_ndjson(user_id, decrypt)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "Cache-Control": "no-store",
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request):
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(gzip_stream(lines), media_type=NDJSON_MEDIA_TYPE, headers=headers)
+    return StreamingResponse(batch_stream(lines), media_type=NDJSON_MEDIA_TYPE, headers=headers)
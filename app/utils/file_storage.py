@@ -0,0 +1,274 @@
+"""Content-addressed storage for uploaded lab/scan files.
+
+Blobs are stored once per distinct content under
+``FILE_STORAGE_DIR/<sha[:2]>/<sha[2:4]>/<sha256>``. Uploads are streamed
+from the multipart request body straight into a temporary file in the
+same directory tree while being hashed, then moved into place, so the
+whole file never sits in worker memory and identical uploads are
+deduplicated.
+
+Blobs are deleted when the last test referencing them goes away, unless
+they are still within ``FILE_GC_GRACE_SECONDS``; ``run_blob_gc`` sweeps
+those, and temp files of abandoned uploads, once they are old enough.
+"""
+import asyncio
+import hashlib
+import itertools
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from fastapi import HTTPException, Request, status
+from multipart.multipart import MultipartParser, parse_options_header
+from sqlalchemy import Engine, select
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.models.lab_scan_test import LabScanTest
+
+logger = logging.getLogger(__name__)
+
+# Blobs checked against the database per query by the sweep
+GC_BATCH_SIZE = 500
+
+
+@dataclass(frozen=True)
+class StoredBlob:
+    sha256: str
+    size: int
+    content_type: Optional[str]
+    filename: Optional[str]
+
+
+class ContentAddressedStorage:
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+
+    def path_for(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / sha256
+
+    def exists(self, sha256: str) -> bool:
+        return self.path_for(sha256).is_file()
+
+    def open_writer(self) -> "BlobWriter":
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.tmp_dir, prefix="upload-")
+        return BlobWriter(self, os.fdopen(fd, "wb"), Path(tmp_path))
+
+    def remove(self, sha256: str) -> bool:
+        """Delete a blob unless it was (re)written within the GC grace period.
+
+        The grace period covers an upload of the same content that has moved
+        its blob into place but not yet committed the row referencing it.
+        Skipped blobs are left to the periodic sweep. Returns True if deleted.
+        """
+        path = self.path_for(sha256)
+        try:
+            if time.time() - path.stat().st_mtime < settings.FILE_GC_GRACE_SECONDS:
+                return False
+            path.unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def iter_blobs(self, older_than: float) -> Iterator[str]:
+        """Digests of stored blobs last written before ``older_than``."""
+        for path in self.root.glob("??/??/*"):
+            try:
+                if path.stat().st_mtime < older_than:
+                    yield path.name
+            except FileNotFoundError:
+                pass
+
+    def remove_stale_temp_files(self, older_than: float) -> int:
+        """Delete temp files of uploads that stopped being written to."""
+        removed = 0
+        for path in self.tmp_dir.glob("upload-*"):
+            try:
+                if path.stat().st_mtime < older_than:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+
+class BlobWriter:
+    """Hashes and writes an upload to a temp file, then stores it by digest."""
+
+    def __init__(self, storage: ContentAddressedStorage, file: BinaryIO, tmp_path: Path):
+        self.storage = storage
+        self.file = file
+        self.tmp_path = tmp_path
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def _write(self, data: bytes) -> None:
+        self._hash.update(data)
+        self.file.write(data)
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > settings.FILE_MAX_UPLOAD_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Uploaded file is too large"
+            )
+        await run_in_threadpool(self._write, data)
+
+    def _commit(self) -> str:
+        self.file.close()
+        sha256 = self._hash.hexdigest()
+        path = self.storage.path_for(sha256)
+        if path.is_file():
+            # Identical content is already stored; refresh it for GC grace
+            self.tmp_path.unlink()
+            os.utime(path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.tmp_path, path)
+        return sha256
+
+    async def commit(self) -> str:
+        return await run_in_threadpool(self._commit)
+
+    def abort(self) -> None:
+        self.file.close()
+        self.tmp_path.unlink(missing_ok=True)
+
+
+class _MultipartFileSink:
+    """python-multipart callbacks that collect the data of one file field."""
+
+    def __init__(self, field_name: str):
+        self.field_name = field_name.encode()
+        self.pending: list[bytes] = []
+        self.found = False
+        self.filename: Optional[str] = None
+        self.content_type: Optional[str] = None
+        self._in_target = False
+        self._headers: dict[bytes, bytes] = {}
+        self._field = b""
+        self._value = b""
+
+    def on_part_begin(self) -> None:
+        self._headers = {}
+
+    def on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def on_header_end(self) -> None:
+        self._headers[self._field.lower()] = self._value
+        self._field = b""
+        self._value = b""
+
+    def on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._headers.get(b"content-disposition", b""))
+        filename = options.get(b"filename")
+        self._in_target = (
+            not self.found
+            and options.get(b"name") == self.field_name
+            and filename is not None
+        )
+        if self._in_target:
+            self.filename = filename.decode("latin-1")
+            content_type = self._headers.get(b"content-type")
+            self.content_type = content_type.decode("latin-1") if content_type else None
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_target:
+            self.pending.append(data[start:end])
+
+    def on_part_end(self) -> None:
+        if self._in_target:
+            self._in_target = False
+            self.found = True
+
+    def callbacks(self) -> dict:
+        return {
+            "on_part_begin": self.on_part_begin,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+        }
+
+
+async def save_upload(request: Request, field_name: str = "file") -> StoredBlob:
+    """Stream the multipart field ``field_name`` of the request into storage."""
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a multipart/form-data upload"
+        )
+
+    sink = _MultipartFileSink(field_name)
+    parser = MultipartParser(boundary, sink.callbacks())
+    writer = file_storage.open_writer()
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            if sink.pending:
+                await writer.write(b"".join(sink.pending))
+                sink.pending.clear()
+        parser.finalize()
+
+        if not sink.found:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Missing file field '{field_name}'"
+            )
+        sha256 = await writer.commit()
+    except BaseException:
+        writer.abort()
+        raise
+
+    return StoredBlob(
+        sha256=sha256,
+        size=writer.size,
+        content_type=sink.content_type,
+        filename=sink.filename,
+    )
+
+
+file_storage = ContentAddressedStorage(settings.FILE_STORAGE_DIR)
+
+
+def sweep_unreferenced_blobs(bind: Engine) -> int:
+    """Delete blobs past the grace period that no test references."""
+    older_than = time.time() - settings.FILE_GC_GRACE_SECONDS
+    removed = file_storage.remove_stale_temp_files(older_than)
+    blobs = file_storage.iter_blobs(older_than)
+    while batch := list(itertools.islice(blobs, GC_BATCH_SIZE)):
+        with bind.connect() as conn:
+            referenced = set(conn.scalars(
+                select(LabScanTest.file_sha256).where(LabScanTest.file_sha256.in_(batch))
+            ))
+        removed += sum(file_storage.remove(sha256) for sha256 in batch if sha256 not in referenced)
+    return removed
+
+
+async def run_blob_gc(bind: Engine, interval: float | None = None) -> None:
+    """Sweep unreferenced blobs every ``interval`` seconds until cancelled."""
+    interval = interval or settings.FILE_GC_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await run_in_threadpool(sweep_unreferenced_blobs, bind)
+        except Exception:
+            logger.exception("File storage sweep failed")
+        else:
+            if removed:
+                logger.debug("Removed %d unreferenced files from storage", removed)
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.utils.metrics import argon2_seconds, argon2_wait_seconds
+from app.utils.security import hash_password, verify_password
+
+
+class PasswordHasherPool:
+    """Runs Argon2 work in a dedicated process pool with admission control.
+
+    At most ``max_concurrency`` operations run at once and at most
+    ``queue_size`` more may wait for a worker. Anything beyond that is
+    rejected immediately with 503 so a login burst cannot pile up work
+    that would finish long after the client gave up.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        queue_size: int,
+        retry_after: int,
+        use_processes: bool = True,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.queue_size = max(0, queue_size)
+        self.retry_after = retry_after
+        self.use_processes = use_processes
+        self._executor: ProcessPoolExecutor | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+
+        self.in_flight = 0
+        self.rejected = 0
+        self.completed = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_wait_seconds = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Operations admitted but still waiting for a worker."""
+        return max(0, self.in_flight - self.max_concurrency)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) on the pool, or raise 503 if the queue is full."""
+        if self.in_flight >= self.max_concurrency + self.queue_size:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self.in_flight += 1
+        queued_at = time.perf_counter()
+        try:
+            async with self._get_semaphore():
+                started_at = time.perf_counter()
+                if self.use_processes:
+                    loop = asyncio.get_running_loop()
+                    result = await loop.run_in_executor(self._get_executor(), func, *args)
+                else:
+                    result = await run_in_threadpool(func, *args)
+        finally:
+            self.in_flight -= 1
+
+        finished_at = time.perf_counter()
+        elapsed = finished_at - queued_at
+        self.completed += 1
+        self.total_seconds += elapsed
+        self.total_wait_seconds += started_at - queued_at
+        self.max_seconds = max(self.max_seconds, elapsed)
+        argon2_seconds.observe(finished_at - started_at)
+        argon2_wait_seconds.observe(started_at - queued_at)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict[str, Any]:
+        """Return queue depth and latency figures for sizing the pool."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_seconds": self.total_seconds / self.completed if self.completed else 0.0,
+            "avg_wait_seconds": self.total_wait_seconds / self.completed if self.completed else 0.0,
+            "max_seconds": self.max_seconds,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+    use_processes=settings.PASSWORD_HASH_USE_PROCESSES,
+)
@@ -0,0 +1,125 @@
+"""File-based keystore shared by every worker process.
+
+Keys live in ``KEYSTORE_DIR`` so that all workers (and all hosts mounting
+the same directory) encrypt and sign with the same material:
+
+* ``fernet.keys`` -- Fernet keys, one per line, newest first. The first key
+  encrypts; every key can decrypt, so rotating means prepending a new key.
+* ``secret_key`` -- JWT/OTP signing secret, required unless ``SECRET_KEY``
+  is set to something other than its placeholder default.
+
+``FERNET_KEY`` in the environment still takes precedence over the file.
+Nothing is ever generated implicitly: a missing or invalid key raises
+``KeyStoreError`` at startup. Create the files once with::
+
+    python -m app.utils.keystore init
+"""
+import argparse
+import os
+import secrets
+import sys
+from pathlib import Path
+
+from cryptography.fernet import Fernet
+
+from app.config import Settings, settings
+
+FERNET_KEYS_FILE = "fernet.keys"
+SECRET_KEY_FILE = "secret_key"
+
+
+class KeyStoreError(RuntimeError):
+    """A required key is missing or unreadable."""
+
+
+def keystore_path(name: str) -> Path:
+    return Path(settings.KEYSTORE_DIR) / name
+
+
+def read_keys(path: Path) -> list[str]:
+    """Non-empty, non-comment lines of a key file ([] if it does not exist)."""
+    try:
+        lines = path.read_text().splitlines()
+    except FileNotFoundError:
+        return []
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def load_fernet_keys() -> list[str]:
+    """Fernet keys, primary first, validated."""
+    path = keystore_path(FERNET_KEYS_FILE)
+    env_key = os.getenv("FERNET_KEY")
+    keys = [env_key] if env_key else read_keys(path)
+    if not keys:
+        raise KeyStoreError(
+            f"No Fernet key configured: set FERNET_KEY or create {path} "
+            "(python -m app.utils.keystore init)"
+        )
+    for key in keys:
+        try:
+            Fernet(key)
+        except (ValueError, TypeError):
+            source = "FERNET_KEY" if env_key else str(path)
+            raise KeyStoreError(f"Invalid Fernet key in {source}") from None
+    return keys
+
+
+def load_secret_key() -> str:
+    """The signing secret: SECRET_KEY if set explicitly, else the keystore file."""
+    if settings.SECRET_KEY != Settings.model_fields["SECRET_KEY"].default:
+        return settings.SECRET_KEY
+    path = keystore_path(SECRET_KEY_FILE)
+    keys = read_keys(path)
+    if not keys:
+        raise KeyStoreError(
+            f"No signing secret configured: set SECRET_KEY or create {path} "
+            "(python -m app.utils.keystore init)"
+        )
+    return keys[0]
+
+
+def write_key(path: Path, key: str) -> None:
+    # O_EXCL: never overwrite a key another process may already be using
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w") as file:
+        file.write(key + "\n")
+
+
+def init_keystore() -> list[Path]:
+    """Create any missing key files and return the ones created."""
+    directory = Path(settings.KEYSTORE_DIR)
+    directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    created = []
+    for name, make_key in (
+        (FERNET_KEYS_FILE, lambda: Fernet.generate_key().decode()),
+        (SECRET_KEY_FILE, lambda: secrets.token_urlsafe(48)),
+    ):
+        path = directory / name
+        if path.exists():
+            continue
+        write_key(path, make_key())
+        created.append(path)
+    return created
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage the key files in KEYSTORE_DIR.")
+    parser.add_argument("command", choices=["init", "check"])
+    args = parser.parse_args()
+
+    if args.command == "init":
+        for path in init_keystore():
+            print(f"Created {path}")
+
+    try:
+        keys = load_fernet_keys()
+        secret_key = load_secret_key()
+    except KeyStoreError as exc:
+        sys.exit(str(exc))
+    print(f"Fernet keys: {len(keys)} (primary + {len(keys) - 1} previous)")
+    source = "SECRET_KEY" if secret_key == settings.SECRET_KEY else keystore_path(SECRET_KEY_FILE)
+    print(f"Signing secret: from {source}")
+
+
+if __name__ == "__main__":
+    main()
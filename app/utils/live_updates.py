@@ -0,0 +1,310 @@
+"""Server-push change notifications for caregivers.
+
+Each open ``GET /live/events`` stream is a ``Subscription`` in the
+in-process ``hub``, registered under the users its owner has linked as
+family members. ``ChangeFeed`` tails the change log, so changes committed
+by any worker process are seen, and publishes one pre-encoded server-sent
+event per entry to the watchers of that entry's user. Commits made in this
+process wake the feed immediately. Commits in other workers are picked up
+within ``LIVE_POLL_INTERVAL_SECONDS``.
+
+Every subscriber has a bounded queue and publishing never waits. A
+subscriber whose queue is full is evicted: its stream ends with an
+``evicted`` event and the client reconnects with ``Last-Event-ID``. One
+slow client therefore cannot hold back the others or grow memory.
+"""
+import asyncio
+import json
+import logging
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import Engine, func, select
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import ReadSessionLocal
+from app.models.allergy import Allergy
+from app.models.change_log import ChangeLogEntry
+from app.models.chronic_disease import ChronicDisease
+from app.models.family_member import FamilyMember
+from app.models.health_profile import HealthProfile
+from app.models.lab_scan_test import LabScanTest
+from app.models.medication import Medication
+from app.utils.changelog import on_changes_committed
+
+logger = logging.getLogger(__name__)
+
+# Table name -> event type for the resources pushed to watchers
+LIVE_RESOURCES = {
+    HealthProfile.__tablename__: "health_profile",
+    Medication.__tablename__: "medication",
+    Allergy.__tablename__: "allergy",
+    ChronicDisease.__tablename__: "disease",
+    LabScanTest.__tablename__: "test",
+}
+
+
+class LiveEvent(NamedTuple):
+    seq: int
+    frame: bytes  # encoded server-sent event
+
+
+# Control items: the owner's family links changed / the subscriber was evicted
+REFRESH = LiveEvent(0, b"")
+EVICTED = LiveEvent(0, b'event: evicted\ndata: {"reason":"slow consumer"}\n\n')
+
+
+def encode_event(entry: Any) -> LiveEvent:
+    data = json.dumps({
+        "user_id": entry.user_id,
+        "type": LIVE_RESOURCES[entry.resource],
+        "id": entry.record_id,
+        "deleted": entry.deleted,
+        "changed_at": entry.changed_at.isoformat(),
+    }, separators=(",", ":"))
+    return LiveEvent(entry.seq, f"id: {entry.seq}\nevent: change\ndata: {data}\n\n".encode())
+
+
+class Subscription:
+    def __init__(self, user_id: str, maxsize: int):
+        self.user_id = user_id
+        self.topics: set[tuple[str, str]] = set()
+        self.queue: asyncio.Queue[LiveEvent] = asyncio.Queue(maxsize)
+        self.active = True
+        # Events up to this seq were already sent (Last-Event-ID replay)
+        self.sent_seq = 0
+
+    @property
+    def watched_user_ids(self) -> set[str]:
+        return {user_id for kind, user_id in self.topics if kind == "user"}
+
+
+class LiveHub:
+    """Topic -> subscribers index; must be used from the event loop thread."""
+
+    def __init__(self, max_subscribers: int, queue_size: int):
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self._topics: dict[tuple[str, str], set[Subscription]] = {}
+        self.subscribers = 0
+        self.published = 0
+        self.delivered = 0
+        self.evicted = 0
+
+    def __contains__(self, topic: tuple[str, str]) -> bool:
+        return topic in self._topics
+
+    @property
+    def full(self) -> bool:
+        return self.subscribers >= self.max_subscribers
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(user_id, self.queue_size)
+        self.subscribers += 1
+        self._add(subscription, ("links", user_id))
+        return subscription
+
+    def watch(self, subscription: Subscription, watched_user_ids: set[str]) -> None:
+        """Replace the users whose changes the subscription receives."""
+        if not subscription.active:
+            return
+        topics = {("links", subscription.user_id)} | {("user", user_id) for user_id in watched_user_ids}
+        for topic in subscription.topics - topics:
+            self._remove(subscription, topic)
+        for topic in topics - subscription.topics:
+            self._add(subscription, topic)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if not subscription.active:
+            return
+        subscription.active = False
+        for topic in list(subscription.topics):
+            self._remove(subscription, topic)
+        self.subscribers -= 1
+
+    def publish(self, topic: tuple[str, str], event: LiveEvent) -> int:
+        """Queue event for the topic's subscribers without waiting."""
+        subscribers = self._topics.get(topic)
+        if not subscribers:
+            return 0
+        self.published += 1
+        delivered = 0
+        for subscription in list(subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+                delivered += 1
+            except asyncio.QueueFull:
+                self.evict(subscription)
+        self.delivered += delivered
+        return delivered
+
+    def evict(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        self.evicted += 1
+        # Pending events are dropped; the client catches up via Last-Event-ID
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(EVICTED)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "subscribers": self.subscribers,
+            "max_subscribers": self.max_subscribers,
+            "topics": len(self._topics),
+            "published": self.published,
+            "delivered": self.delivered,
+            "evicted": self.evicted,
+        }
+
+    def _add(self, subscription: Subscription, topic: tuple[str, str]) -> None:
+        self._topics.setdefault(topic, set()).add(subscription)
+        subscription.topics.add(topic)
+
+    def _remove(self, subscription: Subscription, topic: tuple[str, str]) -> None:
+        subscribers = self._topics.get(topic)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._topics[topic]
+        subscription.topics.discard(topic)
+
+
+hub = LiveHub(
+    max_subscribers=settings.LIVE_MAX_SUBSCRIBERS,
+    queue_size=settings.LIVE_QUEUE_SIZE,
+)
+
+
+def read_changes(bind: Engine, after: Optional[int]) -> tuple[list[Any], int]:
+    """Change log entries after ``after`` (none when None) and the new position."""
+    table = ChangeLogEntry.__table__
+    with bind.connect() as conn:
+        if after is None:
+            return [], conn.execute(select(func.max(table.c.seq))).scalar() or 0
+        entries = conn.execute(
+            select(table).where(table.c.seq > after).order_by(table.c.seq).limit(settings.LIVE_FEED_BATCH_SIZE)
+        ).all()
+    return entries, entries[-1].seq if entries else after
+
+
+def dispatch(entries: list[Any]) -> None:
+    for entry in entries:
+        if entry.resource == FamilyMember.__tablename__:
+            hub.publish(("links", entry.user_id), REFRESH)
+        elif entry.resource in LIVE_RESOURCES and ("user", entry.user_id) in hub:
+            hub.publish(("user", entry.user_id), encode_event(entry))
+
+
+class ChangeFeed:
+    def __init__(self):
+        self.last_seq: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def wake(self) -> None:
+        """Poll now; safe to call from any thread."""
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:  # loop closed
+                pass
+
+    async def run(self, bind: Engine, interval: float | None = None) -> None:
+        """Tail the change log and publish to the hub until cancelled."""
+        interval = interval or settings.LIVE_POLL_INTERVAL_SECONDS
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.poll(bind)
+        finally:
+            self._loop = None
+
+    async def poll(self, bind: Engine) -> None:
+        # Without subscribers only the position is kept up to date
+        after = self.last_seq if hub.subscribers else None
+        try:
+            entries, self.last_seq = await run_in_threadpool(read_changes, bind, after)
+        except Exception:
+            logger.exception("Change feed poll failed")
+            return
+        dispatch(entries)
+        if len(entries) == settings.LIVE_FEED_BATCH_SIZE:
+            self._wakeup.set()
+
+
+change_feed = ChangeFeed()
+on_changes_committed(change_feed.wake)
+
+
+def load_watched_users(user_id: str) -> set[str]:
+    """Users the given user has linked as family members."""
+    with ReadSessionLocal() as session:
+        return set(session.scalars(
+            select(FamilyMember.linked_user_id).where(
+                FamilyMember.user_id == user_id,
+                FamilyMember.linked_user_id.is_not(None),
+            )
+        ))
+
+
+def load_missed_events(watched_user_ids: set[str], after: int) -> Optional[list[LiveEvent]]:
+    """Events after a Last-Event-ID, or None if too many were missed."""
+    if not watched_user_ids:
+        return []
+    with ReadSessionLocal() as session:
+        entries = session.execute(
+            select(ChangeLogEntry.__table__)
+            .where(
+                ChangeLogEntry.user_id.in_(watched_user_ids),
+                ChangeLogEntry.resource.in_(LIVE_RESOURCES),
+                ChangeLogEntry.seq > after,
+            )
+            .order_by(ChangeLogEntry.seq)
+            .limit(settings.LIVE_REPLAY_LIMIT + 1)
+        ).all()
+    if len(entries) > settings.LIVE_REPLAY_LIMIT:
+        return None
+    return [encode_event(entry) for entry in entries]
+
+
+async def stream_events(user_id: str, last_event_id: Optional[int]):
+    """Server-sent events for one subscriber, until it disconnects or is evicted."""
+    subscription = hub.subscribe(user_id)
+    try:
+        hub.watch(subscription, await run_in_threadpool(load_watched_users, user_id))
+        yield f"retry: {settings.LIVE_RETRY_MS}\n\n".encode()
+
+        if last_event_id is not None:
+            missed = await run_in_threadpool(
+                load_missed_events, subscription.watched_user_ids, last_event_id
+            )
+            if missed is None:
+                # Too far behind: the client should resync (GET /sync)
+                yield b"event: reset\ndata: {}\n\n"
+            else:
+                for event in missed:
+                    yield event.frame
+                    subscription.sent_seq = event.seq
+
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), settings.LIVE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            if event is EVICTED:
+                yield event.frame
+                return
+            if event is REFRESH:
+                hub.watch(subscription, await run_in_threadpool(load_watched_users, user_id))
+                continue
+            if event.seq > subscription.sent_seq:
+                yield event.frame
+    finally:
+        hub.unsubscribe(subscription)
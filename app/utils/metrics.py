@@ -0,0 +1,182 @@
+"""Low-overhead request and operation metrics in Prometheus text format.
+
+Counters are plain attributes and histograms use buckets allocated once,
+so recording is a few integer increments with no locks: request metrics
+are updated from the event loop thread only, and the odd lost increment
+from worker threads (Fernet, Argon2 timings) is acceptable for monitoring.
+Per-route series are created the first time a route is hit; after that the
+hot path only looks them up.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Fernet work is measured in microseconds
+FAST_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+)
+
+STATUS_CLASSES = ("1xx", "2xx", "3xx", "4xx", "5xx")
+
+
+class Histogram:
+    """Cumulative-on-read histogram over fixed bucket upper bounds."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RouteMetrics:
+    __slots__ = ("statuses", "latency")
+
+    def __init__(self):
+        self.statuses = [0] * len(STATUS_CLASSES)
+        self.latency = Histogram()
+
+
+class HTTPMetrics:
+    def __init__(self):
+        self.in_flight = 0
+        # route path -> method -> metrics
+        self.routes: dict[str, dict[str, RouteMetrics]] = {}
+
+    def route(self, path: str, method: str) -> RouteMetrics:
+        methods = self.routes.get(path)
+        if methods is None:
+            methods = self.routes[path] = {}
+        metrics = methods.get(method)
+        if metrics is None:
+            metrics = methods[method] = RouteMetrics()
+        return metrics
+
+
+http_metrics = HTTPMetrics()
+argon2_seconds = Histogram()
+argon2_wait_seconds = Histogram()
+fernet_encrypt_seconds = Histogram(FAST_BUCKETS)
+fernet_decrypt_seconds = Histogram(FAST_BUCKETS)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route counts and latency."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_metrics.in_flight += 1
+        started_at = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            http_metrics.in_flight -= 1
+            # Routing stores the matched route on the shared scope
+            route = scope.get("route")
+            metrics = http_metrics.route(
+                route.path if route is not None else UNMATCHED_ROUTE, scope["method"]
+            )
+            metrics.statuses[min(max(status_code // 100, 1), 5) - 1] += 1
+            metrics.latency.observe(elapsed)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsWriter:
+    """Accumulates metric families in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def family(self, name: str, kind: str, help_text: str) -> None:
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+
+    def sample(self, name: str, value: float, **labels: Any) -> None:
+        self.lines.append(f"{name}{_labels(labels)} {float(value)!r}")
+
+    def metric(self, name: str, kind: str, help_text: str, value: float, **labels: Any) -> None:
+        self.family(name, kind, help_text)
+        self.sample(name, value, **labels)
+
+    def histogram(self, name: str, histogram: Histogram, **labels: Any) -> None:
+        cumulative = 0
+        for bound, count in zip(histogram.bounds, histogram.counts):
+            cumulative += count
+            self.sample(f"{name}_bucket", cumulative, **labels, le=repr(bound))
+        self.sample(f"{name}_bucket", histogram.count, **labels, le="+Inf")
+        self.sample(f"{name}_sum", histogram.sum, **labels)
+        self.sample(f"{name}_count", histogram.count, **labels)
+
+    def stats(self, prefix: str, stats: dict[str, Any], help_text: str, counters: Iterable[str] = ()) -> None:
+        """Expose a component's stats() dict, one gauge (or counter) per numeric key."""
+        counters = set(counters)
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            kind = "counter" if key in counters else "gauge"
+            name = f"{prefix}_{key}_total" if kind == "counter" else f"{prefix}_{key}"
+            self.metric(name, kind, f"{help_text}: {key}", value)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def write_http_metrics(writer: MetricsWriter) -> None:
+    routes = [
+        (path, method, metrics)
+        for path, methods in sorted(http_metrics.routes.items())
+        for method, metrics in sorted(methods.items())
+    ]
+
+    writer.metric(
+        "http_requests_in_flight", "gauge", "Requests currently being served",
+        http_metrics.in_flight,
+    )
+
+    writer.family("http_requests_total", "counter", "Requests by route, method and status class")
+    for path, method, metrics in routes:
+        for status_class, count in zip(STATUS_CLASSES, metrics.statuses):
+            if count:
+                writer.sample("http_requests_total", count, route=path, method=method, status=status_class)
+
+    writer.family("http_request_duration_seconds", "histogram", "Request latency by route and method")
+    for path, method, metrics in routes:
+        writer.histogram("http_request_duration_seconds", metrics.latency, route=path, method=method)
@@ -0,0 +1,277 @@
+"""Transactional outbox for SMS and other notifications.
+
+Request handlers only append an ``OutboxMessage`` row in their own
+transaction (``enqueue_sms``) and wake the dispatcher; they never wait on a
+gateway. ``OutboxDispatcher`` runs as a background task: it claims due
+messages, groups them per provider, hands each group to that provider's
+transport in one call, and records delivery latency or reschedules failed
+messages with exponential backoff.
+
+Transports are looked up by provider name in ``transports``; a JSON-lines
+``FileTransport`` and an in-memory ``StubTransport`` are built in.
+"""
+import asyncio
+import json
+import logging
+import random
+import uuid
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Protocol
+
+from sqlalchemy import select, update
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.outbox_message import OutboxMessage, OutboxStatusEnum
+from app.utils.security import decrypt_text, encrypt_text
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OutgoingMessage:
+    message_id: str
+    provider: str
+    recipient: str
+    body: str
+    attempts: int
+    created_at: datetime
+
+
+class Transport(Protocol):
+    async def send_batch(self, messages: list[OutgoingMessage]) -> list[Optional[str]]:
+        """Deliver messages; return an error string (or None) per message."""
+        ...
+
+
+class FileTransport:
+    """Appends messages as JSON lines to a local file (development/tests)."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _write(self, messages: list[OutgoingMessage]) -> None:
+        with open(self.path, "a", encoding="utf-8") as file:
+            for message in messages:
+                file.write(json.dumps({
+                    "message_id": message.message_id,
+                    "recipient": message.recipient,
+                    "body": message.body,
+                    "sent_at": datetime.utcnow().isoformat(),
+                }) + "\n")
+
+    async def send_batch(self, messages: list[OutgoingMessage]) -> list[Optional[str]]:
+        await run_in_threadpool(self._write, messages)
+        return [None] * len(messages)
+
+
+class StubTransport:
+    """Keeps delivered messages in memory; can fail the next N sends."""
+
+    def __init__(self, fail_next: int = 0):
+        self.sent: list[OutgoingMessage] = []
+        self.batches = 0
+        self.fail_next = fail_next
+
+    async def send_batch(self, messages: list[OutgoingMessage]) -> list[Optional[str]]:
+        self.batches += 1
+        results: list[Optional[str]] = []
+        for message in messages:
+            if self.fail_next > 0:
+                self.fail_next -= 1
+                results.append("stub failure")
+            else:
+                self.sent.append(message)
+                results.append(None)
+        return results
+
+
+transports: dict[str, Transport] = {
+    "file": FileTransport(settings.OUTBOX_FILE_PATH),
+    "stub": StubTransport(),
+}
+
+
+def register_transport(provider: str, transport: Transport) -> None:
+    transports[provider] = transport
+
+
+def enqueue_sms(db, recipient: str, body: str, provider: str | None = None) -> OutboxMessage:
+    """Add an SMS to the outbox; it is sent once the caller's transaction commits."""
+    message = OutboxMessage(
+        provider=provider or settings.SMS_PROVIDER,
+        recipient=recipient,
+        body_encrypted=encrypt_text(body),
+    )
+    db.add(message)
+    return message
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the given attempt count."""
+    delay = min(
+        settings.OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.OUTBOX_RETRY_MAX_SECONDS,
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+class OutboxDispatcher:
+    """Background sender for pending outbox messages."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self.session_factory = session_factory
+        self._wakeup: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self._latencies_ms: deque[float] = deque(maxlen=1000)
+
+    def wake(self) -> None:
+        """Dispatch now instead of at the next poll. Safe to call from any thread."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _claim(self) -> list[OutgoingMessage]:
+        """Lease a batch of due messages so other workers skip them."""
+        now = datetime.utcnow()
+        token = str(uuid.uuid4())
+        due = (
+            select(OutboxMessage.message_id)
+            .where(
+                OutboxMessage.status == OutboxStatusEnum.PENDING,
+                OutboxMessage.next_attempt_at <= now,
+            )
+            .order_by(OutboxMessage.next_attempt_at)
+            .limit(settings.OUTBOX_BATCH_SIZE)
+        )
+        with self.session_factory() as db:
+            db.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.message_id.in_(due.scalar_subquery()))
+                .values(
+                    claim_token=token,
+                    next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            rows = db.execute(
+                select(OutboxMessage).where(OutboxMessage.claim_token == token)
+            ).scalars().all()
+            return [
+                OutgoingMessage(
+                    message_id=row.message_id,
+                    provider=row.provider,
+                    recipient=row.recipient,
+                    body=decrypt_text(row.body_encrypted),
+                    attempts=row.attempts,
+                    created_at=row.created_at,
+                )
+                for row in rows
+            ]
+
+    def _record(self, messages: list[OutgoingMessage], errors: list[Optional[str]]) -> None:
+        now = datetime.utcnow()
+        updates = []
+        for message, error in zip(messages, errors):
+            attempts = message.attempts + 1
+            values = {"message_id": message.message_id, "attempts": attempts, "claim_token": None}
+            if error is None:
+                latency_ms = (now - message.created_at).total_seconds() * 1000
+                self._latencies_ms.append(latency_ms)
+                self.sent += 1
+                values.update(
+                    status=OutboxStatusEnum.SENT,
+                    sent_at=now,
+                    latency_ms=latency_ms,
+                    last_error=None,
+                )
+            elif attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                self.failed += 1
+                logger.warning("Outbox message %s failed permanently: %s", message.message_id, error)
+                values.update(status=OutboxStatusEnum.FAILED, last_error=error)
+            else:
+                self.retried += 1
+                values.update(
+                    next_attempt_at=now + timedelta(seconds=retry_delay(attempts)),
+                    last_error=error,
+                )
+            updates.append(values)
+
+        with self.session_factory() as db:
+            db.execute(update(OutboxMessage), updates)
+            db.commit()
+
+    async def _send(self, provider: str, messages: list[OutgoingMessage]) -> list[Optional[str]]:
+        transport = transports.get(provider)
+        if transport is None:
+            return [f"No transport registered for provider {provider!r}"] * len(messages)
+        try:
+            return await transport.send_batch(messages)
+        except Exception as exc:
+            logger.exception("Transport %r failed", provider)
+            return [f"{type(exc).__name__}: {exc}"] * len(messages)
+
+    async def dispatch_once(self) -> int:
+        """Send one claimed batch; returns the number of messages handled."""
+        messages = await run_in_threadpool(self._claim)
+        if not messages:
+            return 0
+
+        by_provider: dict[str, list[OutgoingMessage]] = defaultdict(list)
+        for message in messages:
+            by_provider[message.provider].append(message)
+
+        groups = list(by_provider.items())
+        results = await asyncio.gather(*(self._send(provider, group) for provider, group in groups))
+        self.batches += len(groups)
+
+        handled = [message for _, group in groups for message in group]
+        errors = [error for group_errors in results for error in group_errors]
+        await run_in_threadpool(self._record, handled, errors)
+        return len(handled)
+
+    async def run(self) -> None:
+        """Dispatch until cancelled, waking on enqueue or every poll interval."""
+        # Created here so the event belongs to the serving event loop
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        while True:
+            try:
+                while await self.dispatch_once() >= settings.OUTBOX_BATCH_SIZE:
+                    pass
+            except Exception:
+                logger.exception("Outbox dispatch failed")
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=settings.OUTBOX_POLL_INTERVAL_SECONDS
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def stats(self) -> dict[str, float]:
+        latencies = sorted(self._latencies_ms)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+        return {
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "batches": self.batches,
+            "latency_p50_ms": percentile(0.50),
+            "latency_p95_ms": percentile(0.95),
+        }
+
+
+dispatcher = OutboxDispatcher()
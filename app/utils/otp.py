@@ -0,0 +1,202 @@
+"""One-time password store for the password reset flow.
+
+Codes are kept out of the ``users`` table: only an HMAC of each code is
+stored, keyed by a hash of the phone number, with an expiry time and a
+failed-attempt counter. A code is locked out after ``OTP_MAX_ATTEMPTS``
+wrong guesses and consumed by a successful password change.
+
+Backends:
+
+* ``InMemoryOTPStore`` -- per process; verification never touches a database.
+* ``SQLiteOTPStore`` -- a small SQLite file shared by every uvicorn worker on
+  the host, with an index on ``expires_at`` for sweeping.
+
+``run_sweeper`` purges expired codes periodically.
+"""
+import asyncio
+import enum
+import hashlib
+import heapq
+import hmac
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class OTPStatus(str, enum.Enum):
+    VALID = "valid"
+    INVALID = "invalid"
+    EXPIRED = "expired"
+    MISSING = "missing"
+    LOCKED = "locked"
+
+
+def otp_key(phone_number: str) -> str:
+    return hashlib.sha256(phone_number.encode()).hexdigest()
+
+
+def hash_code(key: str, code: str) -> str:
+    return hmac.new(
+        settings.SECRET_KEY.encode(), f"{key}:{code}".encode(), hashlib.sha256
+    ).hexdigest()
+
+
+@dataclass
+class OTPEntry:
+    code_hash: str
+    expires_at: float
+    attempts: int = 0
+
+
+def check_entry(entry: OTPEntry | None, key: str, code: str, now: float) -> OTPStatus:
+    """Compare a code against a stored entry, counting a failed attempt."""
+    if entry is None:
+        return OTPStatus.MISSING
+    if entry.expires_at <= now:
+        return OTPStatus.EXPIRED
+    if hmac.compare_digest(entry.code_hash, hash_code(key, code)):
+        return OTPStatus.VALID
+    entry.attempts += 1
+    if entry.attempts >= settings.OTP_MAX_ATTEMPTS:
+        return OTPStatus.LOCKED
+    return OTPStatus.INVALID
+
+
+class InMemoryOTPStore:
+    """Per-process store; a heap of expiry times makes sweeping cheap."""
+
+    def __init__(self):
+        self._entries: dict[str, OTPEntry] = {}
+        self._expiry_heap: list[tuple[float, str]] = []
+
+    async def issue(self, phone_number: str, code: str, ttl: float) -> None:
+        key = otp_key(phone_number)
+        entry = OTPEntry(hash_code(key, code), time.time() + ttl)
+        self._entries[key] = entry
+        heapq.heappush(self._expiry_heap, (entry.expires_at, key))
+
+    async def verify(self, phone_number: str, code: str, consume: bool = False) -> OTPStatus:
+        key = otp_key(phone_number)
+        result = check_entry(self._entries.get(key), key, code, time.time())
+        if result in (OTPStatus.EXPIRED, OTPStatus.LOCKED) or (consume and result == OTPStatus.VALID):
+            self._entries.pop(key, None)
+        return result
+
+    async def sweep(self) -> int:
+        now = time.time()
+        removed = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            # Skip heap items for codes that were reissued since
+            if entry is not None and entry.expires_at == expires_at:
+                del self._entries[key]
+                removed += 1
+        return removed
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteOTPStore:
+    """Codes in a SQLite file shared by all worker processes on one host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # Connections must not be shared with forked worker processes
+        os.register_at_fork(after_in_child=self._reset_connections)
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS otp_codes ("
+            "key TEXT PRIMARY KEY, code_hash TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_otp_codes_expires_at ON otp_codes (expires_at)")
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _issue(self, key: str, code_hash: str, expires_at: float) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO otp_codes (key, code_hash, expires_at, attempts) "
+            "VALUES (?, ?, ?, 0)",
+            (key, code_hash, expires_at),
+        )
+
+    async def issue(self, phone_number: str, code: str, ttl: float) -> None:
+        key = otp_key(phone_number)
+        await run_in_threadpool(self._issue, key, hash_code(key, code), time.time() + ttl)
+
+    def _verify(self, key: str, code: str, consume: bool) -> OTPStatus:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT code_hash, expires_at, attempts FROM otp_codes WHERE key = ?", (key,)
+            ).fetchone()
+            entry = OTPEntry(*row) if row else None
+            result = check_entry(entry, key, code, time.time())
+            if result in (OTPStatus.EXPIRED, OTPStatus.LOCKED) or (consume and result == OTPStatus.VALID):
+                conn.execute("DELETE FROM otp_codes WHERE key = ?", (key,))
+            elif result == OTPStatus.INVALID:
+                conn.execute(
+                    "UPDATE otp_codes SET attempts = ? WHERE key = ?", (entry.attempts, key)
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+    async def verify(self, phone_number: str, code: str, consume: bool = False) -> OTPStatus:
+        return await run_in_threadpool(self._verify, otp_key(phone_number), code, consume)
+
+    def _sweep(self) -> int:
+        cursor = self._connect().execute(
+            "DELETE FROM otp_codes WHERE expires_at <= ?", (time.time(),)
+        )
+        return cursor.rowcount
+
+    async def sweep(self) -> int:
+        return await run_in_threadpool(self._sweep)
+
+
+def create_store():
+    if settings.OTP_BACKEND == "sqlite":
+        return SQLiteOTPStore(settings.OTP_SQLITE_PATH)
+    return InMemoryOTPStore()
+
+
+otp_store = create_store()
+
+
+async def run_sweeper(interval: float | None = None) -> None:
+    """Purge expired codes every ``interval`` seconds until cancelled."""
+    interval = interval or settings.OTP_SWEEP_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            removed = await otp_store.sweep()
+        except Exception:
+            logger.exception("OTP sweep failed")
+        else:
+            if removed:
+                logger.debug("Swept %d expired OTP codes", removed)
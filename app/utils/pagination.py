@@ -0,0 +1,99 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Annotated, Any, Optional
+
+from fastapi import Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.config import settings
+
+
+class PageParams:
+    """Query parameters for keyset-paginated list endpoints."""
+
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.PAGE_DEFAULT_LIMIT,
+            ge=1,
+            le=settings.PAGE_MAX_LIMIT,
+            description="Maximum number of items to return",
+        ),
+        cursor: Optional[str] = Query(
+            None,
+            description="Opaque cursor from the X-Next-Cursor header of the previous page",
+        ),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+
+
+PageDep = Annotated[PageParams, Depends()]
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Encode a (created_at, id) position as an opaque cursor token."""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """Decode a cursor token, raising 400 if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+async def paginate(
+    db,
+    query: Select,
+    created_at: InstrumentedAttribute,
+    row_id: InstrumentedAttribute,
+    page: PageParams,
+    request: Request,
+    response: Response,
+    descending: bool = False,
+) -> list[Any]:
+    """Fetch one page of query ordered by (created_at, id).
+
+    The filter on the composite (user_id, created_at, id) index turns every
+    page into an index range scan. When more rows remain, the next cursor is
+    returned in the X-Next-Cursor header and as a Link rel="next".
+    """
+    key = tuple_(created_at, row_id)
+    if page.cursor:
+        position = decode_cursor(page.cursor)
+        query = query.where(key < position if descending else key > position)
+
+    if descending:
+        query = query.order_by(created_at.desc(), row_id.desc())
+    else:
+        query = query.order_by(created_at, row_id)
+
+    result = await db.execute(query.limit(page.limit + 1))
+    if len(query.column_descriptions) == 1:
+        items = list(result.scalars().all())
+    else:
+        items = list(result.all())
+
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        last = items[-1]
+        entity = last if len(query.column_descriptions) == 1 else last[0]
+        next_cursor = encode_cursor(
+            getattr(entity, created_at.key), getattr(entity, row_id.key)
+        )
+        next_url = request.url.include_query_params(cursor=next_cursor)
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+    return items
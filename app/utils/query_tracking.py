@@ -0,0 +1,130 @@
+"""Per-request SQL statement tracking.
+
+``QueryTrackingMiddleware`` opens a ``RequestQueries`` record in a context
+variable for every HTTP request; SQLAlchemy cursor events on all of the
+app's engines add each statement's count and duration to it. Context
+variables follow the request into SQLAlchemy's async greenlets and into
+threadpool calls, so both DATABASE_ASYNC modes are attributed correctly.
+
+The totals are reported as a ``Server-Timing: db;...`` header. Statements
+slower than ``SQL_SLOW_QUERY_MS`` are logged with their parameters
+redacted, and with ``SQL_MAX_REPEATED_STATEMENTS`` set (strict mode for
+tests) a request that runs the same statement more often than that fails
+with ``RepeatedQueryError`` -- the signature of an N+1 query.
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+logger = logging.getLogger("app.sql")
+
+_START_TIMES_KEY = "query_tracking_start_times"
+
+
+class RepeatedQueryError(RuntimeError):
+    """A request repeated one statement more than SQL_MAX_REPEATED_STATEMENTS times."""
+
+
+class RequestQueries:
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        # SQL text (with placeholders) -> executions
+        self.statements: Counter[str] = Counter()
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.2f};desc="{self.count} queries"'
+
+
+current_queries: ContextVar[Optional[RequestQueries]] = ContextVar("current_queries", default=None)
+
+
+def redact_parameters(parameters: Any, executemany: bool = False) -> str:
+    """Describe bound parameters by type only, never by value."""
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}: <{type(value).__name__}>" for key, value in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(f"<{type(value).__name__}>" for value in parameters) + ")"
+    return "<redacted>"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    queries = current_queries.get()
+    if queries is not None:
+        queries.statements[statement] += 1
+        limit = settings.SQL_MAX_REPEATED_STATEMENTS
+        if limit and queries.statements[statement] > limit:
+            raise RepeatedQueryError(
+                f"Statement executed {queries.statements[statement]} times in one request "
+                f"(limit {limit}), likely an N+1 query: {statement}"
+            )
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info[_START_TIMES_KEY].pop()
+
+    queries = current_queries.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += elapsed
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(
+            "Slow query (%.1f ms): %s parameters=%s",
+            elapsed * 1000,
+            statement,
+            redact_parameters(parameters, executemany),
+        )
+
+
+def _on_error(exception_context) -> None:
+    # after_cursor_execute does not run for failed statements
+    start_times = exception_context.connection.info.get(_START_TIMES_KEY) if exception_context.connection else None
+    if start_times:
+        start_times.pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _on_error)
+
+
+class QueryTrackingMiddleware:
+    """Collects the statements of each request and adds a Server-Timing entry."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = current_queries.set(queries)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and queries.count:
+                MutableHeaders(scope=message).append("Server-Timing", queries.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_queries.reset(token)
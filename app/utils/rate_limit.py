@@ -0,0 +1,303 @@
+"""Request rate limiting for the unauthenticated auth endpoints.
+
+Limits are enforced by ``RateLimit`` dependencies attached to routes. Route
+dependencies are solved before the endpoint's own parameters, so a rejected
+request never opens a database session or reaches Argon2.
+
+Two algorithms are available:
+
+* ``SlidingWindow`` -- sliding window counter; the previous fixed window is
+  weighted by how much of it still overlaps the sliding window.
+* ``TokenBucket`` -- allows bursts up to the limit, refilling steadily.
+
+Counters live in a backend: ``InMemoryBackend`` (per process, sharded
+locks) or ``SQLiteBackend`` (a small SQLite file shared by every uvicorn
+worker on the host).
+"""
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+# (a, b, c) floats whose meaning depends on the algorithm
+State = tuple[float, float, float]
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class Rate:
+    """A number of requests allowed per period (in seconds)."""
+    limit: int
+    period: float
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Parse strings such as "5/minute" or "100/10 seconds"."""
+        match = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)?\s*(second|minute|hour|day)s?\s*", value)
+        if not match:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        count, multiplier, unit = match.groups()
+        return cls(int(count), int(multiplier or 1) * PERIODS[unit])
+
+
+@dataclass(frozen=True)
+class Decision:
+    allowed: bool
+    state: State
+    retry_after: float
+    expires_at: float
+
+
+class SlidingWindow:
+    """Sliding window counter. State: (window_start, current, previous)."""
+
+    def __init__(self, rate: Rate):
+        self.rate = rate
+
+    def apply(self, state: Optional[State], now: float) -> Decision:
+        period = self.rate.period
+        window_start = math.floor(now / period) * period
+        start, current, previous = state or (window_start, 0.0, 0.0)
+
+        if window_start != start:
+            previous = current if window_start - start == period else 0.0
+            current = 0.0
+            start = window_start
+
+        elapsed = now - start
+        estimated = previous * (1 - elapsed / period) + current
+        expires_at = start + 2 * period
+
+        if estimated + 1 > self.rate.limit:
+            if previous and current + 1 <= self.rate.limit:
+                # Wait until enough of the previous window has slid out
+                weight = (self.rate.limit - current - 1) / previous
+                retry_after = (1 - weight) * period - elapsed
+            else:
+                retry_after = period - elapsed
+            return Decision(False, (start, current, previous), max(retry_after, 0.0), expires_at)
+
+        return Decision(True, (start, current + 1, previous), 0.0, expires_at)
+
+
+class TokenBucket:
+    """Token bucket with capacity ``limit``. State: (tokens, last_refill, 0)."""
+
+    def __init__(self, rate: Rate):
+        self.rate = rate
+        self.refill_per_second = rate.limit / rate.period
+
+    def apply(self, state: Optional[State], now: float) -> Decision:
+        capacity = self.rate.limit
+        tokens, last_refill, _ = state or (float(capacity), now, 0.0)
+        tokens = min(capacity, tokens + (now - last_refill) * self.refill_per_second)
+
+        if tokens >= 1:
+            tokens -= 1
+            allowed, retry_after = True, 0.0
+        else:
+            allowed, retry_after = False, (1 - tokens) / self.refill_per_second
+
+        expires_at = now + (capacity - tokens) / self.refill_per_second
+        return Decision(allowed, (tokens, now, 0.0), retry_after, expires_at)
+
+
+class InMemoryBackend:
+    """Per-process counters, sharded so unrelated keys never share a lock."""
+
+    def __init__(self, shards: int = 64, max_keys_per_shard: int = 10000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self._locks = [threading.Lock() for _ in range(shards)]
+        self._shards: list[dict[str, tuple[State, float]]] = [{} for _ in range(shards)]
+
+    def _shard(self, key: str) -> int:
+        return hash(key) % len(self._shards)
+
+    async def hit(self, key: str, algorithm, now: float) -> Decision:
+        index = self._shard(key)
+        shard = self._shards[index]
+        with self._locks[index]:
+            entry = shard.get(key)
+            state = entry[0] if entry and entry[1] > now else None
+            decision = algorithm.apply(state, now)
+            shard[key] = (decision.state, decision.expires_at)
+            if len(shard) > self.max_keys_per_shard:
+                for stale in [k for k, (_, expires) in shard.items() if expires <= now]:
+                    del shard[stale]
+        return decision
+
+    def clear(self) -> None:
+        for lock, shard in zip(self._locks, self._shards):
+            with lock:
+                shard.clear()
+
+
+class SQLiteBackend:
+    """Counters in a SQLite file shared by all worker processes on one host.
+
+    Each hit is a short BEGIN IMMEDIATE read-modify-write, run in the
+    threadpool with one connection per thread.
+    """
+
+    PURGE_EVERY = 1000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        # Connections must not be shared with forked worker processes
+        os.register_at_fork(after_in_child=self._reset_connections)
+        self._hits = 0
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limits ("
+                "key TEXT PRIMARY KEY, a REAL, b REAL, c REAL, expires_at REAL)"
+            )
+
+    def _reset_connections(self) -> None:
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Counters are disposable; don't fsync for them
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def _hit(self, key: str, algorithm, now: float) -> Decision:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT a, b, c FROM rate_limits WHERE key = ? AND expires_at > ?",
+                (key, now),
+            ).fetchone()
+            decision = algorithm.apply(tuple(row) if row else None, now)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limits (key, a, b, c, expires_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, *decision.state, decision.expires_at),
+            )
+            self._hits += 1
+            if self._hits % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM rate_limits WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    async def hit(self, key: str, algorithm, now: float) -> Decision:
+        return await run_in_threadpool(self._hit, key, algorithm, now)
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM rate_limits")
+
+
+def create_backend():
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    return InMemoryBackend()
+
+
+backend = create_backend()
+
+
+# Key functions: return None to skip a rule for this request
+
+async def client_ip(request: Request) -> Optional[str]:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else None
+
+
+async def phone_number(request: Request) -> Optional[str]:
+    """Phone number from the JSON body or the login form's username.
+
+    FastAPI has already parsed and cached the body by the time route
+    dependencies run, so this does not re-read the stream.
+    """
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+            value = (await request.form()).get("username")
+        else:
+            body = await request.json()
+            value = body.get("phone_number") if isinstance(body, dict) else None
+    except ValueError:
+        return None
+    if not isinstance(value, str) or not value:
+        return None
+    # Keep raw phone numbers out of the shared counter store
+    return hashlib.sha256(value.encode()).hexdigest()[:32]
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    algorithm: SlidingWindow | TokenBucket
+    key_func: Callable[[Request], Awaitable[Optional[str]]]
+
+
+class RateLimit:
+    """Route dependency that enforces every rule and raises 429 on the first breach."""
+
+    def __init__(self, scope: str, rules: list[Rule]):
+        self.scope = scope
+        self.rules = rules
+        self.allowed = 0
+        self.rejected = 0
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+
+        now = time.time()
+        for rule in self.rules:
+            value = await rule.key_func(request)
+            if value is None:
+                continue
+            decision = await backend.hit(f"{self.scope}:{rule.name}:{value}", rule.algorithm, now)
+            if not decision.allowed:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests, please try again later",
+                    headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))},
+                )
+        self.allowed += 1
+
+    def stats(self) -> dict[str, int]:
+        return {"allowed": self.allowed, "rejected": self.rejected}
+
+
+login_rate_limit = RateLimit("login", [
+    Rule("ip", SlidingWindow(Rate.parse(settings.RATE_LIMIT_LOGIN_PER_IP)), client_ip),
+    Rule("phone", TokenBucket(Rate.parse(settings.RATE_LIMIT_LOGIN_PER_PHONE)), phone_number),
+])
+
+forgot_password_rate_limit = RateLimit("forgot-password", [
+    Rule("ip", SlidingWindow(Rate.parse(settings.RATE_LIMIT_FORGOT_PASSWORD_PER_IP)), client_ip),
+    Rule("phone", TokenBucket(Rate.parse(settings.RATE_LIMIT_FORGOT_PASSWORD_PER_PHONE)), phone_number),
+])
+
+# Shared by /verify-otp and /change-password so OTP guesses count once
+otp_rate_limit = RateLimit("otp", [
+    Rule("ip", SlidingWindow(Rate.parse(settings.RATE_LIMIT_OTP_PER_IP)), client_ip),
+    Rule("phone", TokenBucket(Rate.parse(settings.RATE_LIMIT_OTP_PER_PHONE)), phone_number),
+])
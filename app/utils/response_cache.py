@@ -0,0 +1,177 @@
+"""Serialized response cache for per-user list endpoints.
+
+Caregivers' devices fetch the same lists over and over, so the encoded
+JSON body of each list page is kept in memory, keyed by user, collection,
+collection version, path and query string. Including the version (read
+from ``resource_versions`` with the ETag) keeps every worker process
+correct without cross-process messages: after a write, the next request
+sees a new version and misses. In addition, ``bump_version`` drops the
+local entries of a collection right away so their memory is freed.
+
+Entries are grouped per (user, collection) in a ``SizedLRUCache`` bounded
+by total bytes. Concurrent misses for the same key are coalesced: one
+request loads and serializes, the others wait for its result.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.config import settings
+from app.utils.cache import SizedLRUCache
+from app.utils.serialization import list_response, serialize_list
+from app.utils.versioning import (
+    cache_headers,
+    get_version,
+    make_etag,
+    not_modified_response,
+    on_version_bump,
+)
+
+# Per-request timing headers describe the request that built the entry
+UNCACHED_HEADERS = frozenset({b"server-timing", b"content-length", b"content-type"})
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    headers: list[tuple[bytes, bytes]]
+
+
+def group_size(group: dict[Any, CachedBody]) -> int:
+    return sum(
+        len(entry.body) + sum(len(name) + len(value) for name, value in entry.headers)
+        for entry in group.values()
+    )
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int, max_entries: int):
+        # (user_id, resource) -> {(version, path, query): CachedBody}
+        self._groups = SizedLRUCache(max_bytes, max_entries, sizeof=group_size)
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, user_id: str, resource: str, variant: tuple) -> Optional[CachedBody]:
+        group = self._groups.get((user_id, resource))
+        return group.get(variant) if group else None
+
+    def put(self, user_id: str, resource: str, variant: tuple, entry: CachedBody) -> None:
+        key = (user_id, resource)
+        version = variant[0]
+        # Groups are replaced, never mutated, so their accounted size stays exact
+        group = {
+            other: cached
+            for other, cached in (self._groups.get(key) or {}).items()
+            if other[0] == version
+        }
+        group[variant] = entry
+        self._groups.set(key, group)
+
+    def invalidate(self, user_id: str, resource: str) -> None:
+        self._groups.pop((user_id, resource))
+
+    async def get_or_build(
+        self,
+        user_id: str,
+        resource: str,
+        variant: tuple,
+        build: Callable[[], Awaitable[CachedBody]],
+    ) -> tuple[CachedBody, str]:
+        """Return (entry, outcome) where outcome is hit, miss or coalesced."""
+        entry = self.get(user_id, resource, variant)
+        if entry is not None:
+            self.hits += 1
+            return entry, "hit"
+        self.misses += 1
+
+        key = (user_id, resource, variant)
+        while (inflight := self._inflight.get(key)) is not None:
+            entry = await asyncio.shield(inflight)
+            if entry is not None:
+                self.coalesced += 1
+                return entry, "coalesced"
+            # The leading request failed; one of the waiters takes over
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        entry = None
+        try:
+            entry = await build()
+            self.put(user_id, resource, variant, entry)
+            return entry, "miss"
+        finally:
+            del self._inflight[key]
+            future.set_result(entry)
+
+    def clear(self) -> None:
+        self._groups.clear()
+
+    def stats(self) -> dict[str, Any]:
+        groups = self._groups.stats()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "evictions": groups["evictions"],
+            "groups": groups["size"],
+            "bytes": groups["bytes"],
+            "max_bytes": groups["max_bytes"],
+        }
+
+
+response_cache = ResponseCache(
+    max_bytes=settings.RESPONSE_CACHE_MAX_BYTES,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+)
+on_version_bump(response_cache.invalidate)
+
+
+async def cached_list_response(
+    db,
+    request: Request,
+    response: Response,
+    user_id: str,
+    resource: str,
+    schema: type[BaseModel],
+    load: Callable[[], Awaitable[list[Any]]],
+) -> Any:
+    """Conditional, cached response for a per-user ``List[schema]`` endpoint.
+
+    ``load`` fetches the page (it may set headers such as the pagination
+    cursor on ``response``); it only runs when neither a 304 nor a cached
+    body can answer the request.
+    """
+    version = await get_version(db, user_id, resource)
+    etag = make_etag(version, user_id, request)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    response.headers.update(cache_headers(etag))
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return list_response(schema, await load(), response)
+
+    async def build() -> CachedBody:
+        body = serialize_list(schema, await load())
+        return CachedBody(
+            body,
+            [(name, value) for name, value in response.headers.raw if name not in UNCACHED_HEADERS],
+        )
+
+    entry, outcome = await response_cache.get_or_build(
+        user_id, resource, (version, request.url.path, request.url.query), build
+    )
+    cached_response = Response(entry.body, media_type="application/json")
+    if outcome == "miss":
+        cached_response.headers.raw.extend(
+            (name, value) for name, value in response.headers.raw if name != b"content-length"
+        )
+    else:
+        cached_response.headers.raw.extend(entry.headers)
+    cached_response.headers.append("Server-Timing", f'response-cache;desc="{outcome}"')
+    return cached_response
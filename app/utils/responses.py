@@ -0,0 +1,117 @@
+import os
+import re
+from typing import Mapping, Optional
+
+import anyio
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """Parse a single-range Range header into an inclusive (start, end).
+
+    Returns None when the whole file should be sent (no header, or a
+    multi-range request, which RFC 9110 lets us ignore). Raises ValueError
+    for an unsatisfiable range.
+    """
+    if not header or "," in header:
+        return None
+    match = RANGE_RE.fullmatch(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+class RangeFileResponse(Response):
+    """File response with single-range (206) support.
+
+    The body is streamed in fixed-size chunks read in a worker thread, so
+    memory use is constant regardless of file size.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        range_header: Optional[str] = None,
+        media_type: Optional[str] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        method: str = "GET",
+    ):
+        self.path = path
+        self.media_type = media_type or "application/octet-stream"
+        self.send_body = method != "HEAD"
+        self.background = None
+        self.body = b""
+
+        size = os.stat(path).st_size
+        self.start, self.end = 0, size - 1
+        status_code = 200
+        try:
+            requested = parse_range(range_header, size)
+        except ValueError:
+            requested = None
+            status_code = 416
+
+        self.status_code = status_code
+        self.init_headers(headers)
+        self.headers["accept-ranges"] = "bytes"
+        if status_code == 416:
+            self.headers["content-range"] = f"bytes */{size}"
+            self.headers["content-length"] = "0"
+            self.send_body = False
+        elif requested is not None:
+            self.status_code = 206
+            self.start, self.end = requested
+            self.headers["content-range"] = f"bytes {self.start}-{self.end}/{size}"
+            self.headers["content-length"] = str(self.end - self.start + 1)
+        else:
+            self.headers["content-length"] = str(size)
+        self.headers.setdefault("content-type", self.media_type)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+
+        count = self.end - self.start + 1
+        if not self.send_body or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            remaining = count
+            while remaining:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+        if remaining:
+            # File shrank underneath us; terminate the body
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
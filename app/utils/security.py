@@ -1,14 +1,18 @@
 import random
 import string
 from datetime import datetime, timedelta, timezone
-from typing import Any
-import os
+from functools import lru_cache
+from typing import Any, Callable
+import threading
+import time
 
 from jose import jwt
 from passlib.context import CryptContext
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
 
 from app.config import settings
+from app.utils.keystore import load_fernet_keys, load_secret_key
+from app.utils.metrics import fernet_decrypt_seconds, fernet_encrypt_seconds
 
 
 def create_access_token(
@@ -35,20 +39,23 @@ def create_access_token(
     return encoded_jwt
 
 
-pwd_context = CryptContext(
-    schemes=["argon2"],
-    deprecated="auto"
-)
+@lru_cache(maxsize=None)
+def get_pwd_context() -> CryptContext:
+    """Build the password context on first use (not at import)."""
+    return CryptContext(
+        schemes=["argon2"],
+        deprecated="auto"
+    )
 
 
 def hash_password(password: str) -> str:
     """Hash a password using Argon2."""
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its Argon2 hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 
 def generate_otp(length: int = 6) -> str:
@@ -83,19 +90,68 @@ def generate_code_number() -> str:
 
 
 
-FERNET_KEY = os.getenv("FERNET_KEY")
+# Built by load_keys() (or on first use); replaced by rotate_fernet_key()
+_fernet: Fernet | MultiFernet | None = None
+_fernet_lock = threading.Lock()
+
+
+def build_fernet(keys: list[str]) -> Fernet | MultiFernet:
+    """First key encrypts; older keys stay usable for decryption."""
+    if len(keys) == 1:
+        return Fernet(keys[0])
+    return MultiFernet([Fernet(key) for key in keys])
+
+
+def load_keys() -> None:
+    """Load every key from the environment/keystore; raises KeyStoreError.
+
+    Called by create_app() so a misconfigured process fails before serving
+    (and, when preloading, before any worker is forked).
+    """
+    global _fernet
+    fernet = build_fernet(load_fernet_keys())
+    with _fernet_lock:
+        _fernet = fernet
+    settings.SECRET_KEY = load_secret_key()
+
+
+def get_fernet() -> Fernet | MultiFernet:
+    global _fernet
+    if _fernet is None:
+        with _fernet_lock:
+            if _fernet is None:
+                _fernet = build_fernet(load_fernet_keys())
+    return _fernet
+
+# Callbacks run after the encryption key changes (e.g. to drop plaintext caches)
+_key_rotation_hooks: list[Callable[[], None]] = []
+
+
+def on_key_rotation(hook: Callable[[], None]) -> Callable[[], None]:
+    """Register a callback to run whenever the Fernet key is rotated."""
+    _key_rotation_hooks.append(hook)
+    return hook
 
-if not FERNET_KEY:
-    FERNET_KEY = Fernet.generate_key()
 
-fernet = Fernet(FERNET_KEY)
+def rotate_fernet_key(new_key: str | bytes, *previous_keys: str | bytes) -> None:
+    """Encrypt with new_key from now on; previous keys can still decrypt."""
+    global _fernet
+    _fernet = MultiFernet([Fernet(new_key), *(Fernet(key) for key in previous_keys)])
+    for hook in _key_rotation_hooks:
+        hook()
 
 
 def encrypt_text(value: str) -> str:
     """Encrypt sensitive text data."""
-    return fernet.encrypt(value.encode()).decode()
+    started_at = time.perf_counter()
+    token = get_fernet().encrypt(value.encode()).decode()
+    fernet_encrypt_seconds.observe(time.perf_counter() - started_at)
+    return token
 
 
 def decrypt_text(value: str) -> str:
     """Decrypt sensitive text data."""
-    return fernet.decrypt(value.encode()).decode()
+    started_at = time.perf_counter()
+    plaintext = get_fernet().decrypt(value.encode()).decode()
+    fernet_decrypt_seconds.observe(time.perf_counter() - started_at)
+    return plaintext
@@ -0,0 +1,52 @@
+"""Opt-in fast JSON path for list endpoints.
+
+By default FastAPI validates a returned list against ``response_model``,
+dumps it to Python objects, runs ``jsonable_encoder`` over the result and
+finally encodes it with the stdlib ``json`` module. With ``FAST_JSON``
+enabled, list endpoints instead validate the ORM rows once through a
+cached ``TypeAdapter(list[Schema])`` and serialize straight to bytes in
+pydantic-core, and every other endpoint encodes with orjson.
+"""
+from functools import lru_cache
+from typing import Any, Iterable
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.config import settings
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter for ``list[schema]``, built once per schema."""
+    return TypeAdapter(list[schema])
+
+
+def serialize_list(schema: type[BaseModel], items: Iterable[Any]) -> bytes:
+    """Validate ORM objects (or dicts) as ``list[schema]`` and encode to JSON."""
+    adapter = list_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(list(items), from_attributes=True))
+
+
+def list_response(schema: type[BaseModel], items: list[Any], response: Response) -> Any:
+    """Return value for a ``List[schema]`` endpoint.
+
+    Without FAST_JSON the items are returned unchanged for FastAPI to
+    serialize. Otherwise a pre-encoded response is returned, carrying over
+    headers and status set on the injected ``response``.
+    """
+    if not settings.FAST_JSON:
+        return items
+
+    fast_response = Response(
+        serialize_list(schema, items),
+        status_code=response.status_code or 200,
+        media_type="application/json",
+    )
+    fast_response.headers.raw.extend(response.headers.raw)
+    return fast_response
+
+
+def default_response_class() -> type[JSONResponse]:
+    return ORJSONResponse if settings.FAST_JSON else JSONResponse
@@ -0,0 +1,111 @@
+"""Per-user collection versions for conditional GETs.
+
+Every write to a versioned collection bumps a counter in
+``resource_versions`` inside the same transaction (``bump_version``). The
+GET endpoints send that counter as a weak ETag; when a client's
+``If-None-Match`` still matches, ``conditional_get`` answers 304 after a
+single primary-key lookup, before any rows are loaded, decrypted or
+serialized.
+"""
+import hashlib
+from typing import Callable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import is_sqlite
+from app.models.resource_version import ResourceVersion
+
+if is_sqlite(settings.DATABASE_URL):
+    from sqlalchemy.dialects.sqlite import insert
+else:
+    from sqlalchemy.dialects.postgresql import insert
+
+# Clients must revalidate, and shared caches must not store the response
+CACHE_CONTROL = "private, no-cache"
+
+# Callbacks run with (user_id, resource) when a collection changes
+_bump_hooks: list[Callable[[str, str], None]] = []
+
+
+def on_version_bump(hook: Callable[[str, str], None]) -> Callable[[str, str], None]:
+    """Register a callback to run whenever a collection version is bumped."""
+    _bump_hooks.append(hook)
+    return hook
+
+
+async def bump_version(db, user_id: str, resource: str) -> None:
+    """Increment a collection's version in the current transaction."""
+    statement = insert(ResourceVersion).values(user_id=user_id, resource=resource, version=1)
+    await db.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ResourceVersion.user_id, ResourceVersion.resource],
+            set_={"version": ResourceVersion.version + 1},
+        )
+    )
+    for hook in _bump_hooks:
+        hook(user_id, resource)
+
+
+async def get_version(db, user_id: str, resource: str) -> int:
+    version = await db.scalar(
+        select(ResourceVersion.version).where(
+            ResourceVersion.user_id == user_id,
+            ResourceVersion.resource == resource,
+        )
+    )
+    return version or 0
+
+
+def make_etag(version: int, user_id: str, request: Request) -> str:
+    """Weak ETag for one user's view of a collection at a version.
+
+    The user, path and query (page cursor, limit) are folded in so a tag is
+    never valid for a different account or a different page.
+    """
+    scope = f"{user_id}\0{request.url.path}\0{request.url.query}\0{settings.APP_VERSION}"
+    digest = hashlib.blake2b(scope.encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
+def cache_headers(etag: str) -> dict[str, str]:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+async def conditional_get(
+    db,
+    request: Request,
+    response: Response,
+    user_id: str,
+    resource: str,
+) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current.
+
+    Otherwise set the ETag on ``response`` and return None so the endpoint
+    builds the full response as usual.
+    """
+    etag = make_etag(await get_version(db, user_id, resource), user_id, request)
+    not_modified = not_modified_response(request, etag)
+    if not_modified is None:
+        response.headers.update(cache_headers(etag))
+    return not_modified
+
+
+def not_modified_response(request: Request, etag: str) -> Optional[Response]:
+    """304 response if the request's If-None-Match matches etag, else None."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag))
+    return None
@@ -0,0 +1,424 @@
+"""In-process HTTP benchmark for every router.
+
+Drives ``app.main.create_app()`` through its ASGI interface (httpx ``ASGITransport``,
+no sockets) against a seeded SQLite file and reports, per endpoint,
+throughput, p50/p95/p99 latency, status codes and SQL statements per
+request. Results can be written to JSON and compared against a previous
+run to catch regressions.
+
+Usage::
+
+    python -m benchmarks.endpoints --concurrency 10 --requests 200 --output run.json
+    python -m benchmarks.endpoints --baseline run.json --max-regression 0.25
+
+``--db`` reuses a SQLite file between runs; it is seeded on first use.
+Rate limiting is disabled and the background sweeper/dispatcher are not
+started, so SQL counts only cover the request path.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+USER_PASSWORD = "benchmark-password"
+PHONE_PREFIX = "9"
+
+# (method, url, request kwargs) for the i-th request made as ``user``
+RequestFactory = Callable[["BenchUser", int], tuple[str, str, dict[str, Any]]]
+
+
+@dataclass
+class BenchUser:
+    phone_number: str
+    headers: dict[str, str]
+    ids: dict[str, str]
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    name: str
+    router: str
+    build: RequestFactory
+    expected: tuple[int, ...] = (200,)
+
+
+def phone(index: int) -> str:
+    return f"{PHONE_PREFIX}{index:09d}"
+
+
+run_id = str(int(time.time()))
+
+ENDPOINTS = [
+    Endpoint("POST /auth/register", "auth", lambda u, i: ("POST", "/auth/register", {"json": {
+        "first_name": "Bench", "last_name": "User", "passport_id": f"R{run_id}{i}",
+        "gender": "Other", "phone_number": f"8{run_id[-6:]}{i:06d}", "password": USER_PASSWORD,
+    }}), (201,)),
+    Endpoint("POST /auth/login", "auth", lambda u, i: ("POST", "/auth/login", {
+        "data": {"username": u.phone_number, "password": USER_PASSWORD},
+    })),
+    Endpoint("POST /auth/forgot-password", "auth", lambda u, i: (
+        "POST", "/auth/forgot-password", {"json": {"phone_number": u.phone_number}},
+    )),
+    Endpoint("POST /auth/verify-otp", "auth", lambda u, i: (
+        "POST", "/auth/verify-otp", {"json": {"phone_number": u.phone_number, "otp_code": "0000"}},
+    ), (400,)),
+    Endpoint("GET /users/me", "users", lambda u, i: ("GET", "/users/me", {"headers": u.headers})),
+    Endpoint("GET /users/me/record", "users", lambda u, i: (
+        "GET", "/users/me/record", {"headers": u.headers},
+    )),
+    Endpoint("PUT /users/me", "users", lambda u, i: (
+        "PUT", "/users/me", {"headers": u.headers, "json": {"marital_status": f"m{i % 3}"}},
+    )),
+    Endpoint("GET /family-members", "family-members", lambda u, i: (
+        "GET", "/family-members", {"headers": u.headers},
+    )),
+    Endpoint("GET /family-members/{id}", "family-members", lambda u, i: (
+        "GET", f"/family-members/{u.ids['family_member']}", {"headers": u.headers},
+    )),
+    Endpoint("GET /allergies", "allergies", lambda u, i: ("GET", "/allergies", {"headers": u.headers})),
+    Endpoint("GET /allergies/{id}", "allergies", lambda u, i: (
+        "GET", f"/allergies/{u.ids['allergy']}", {"headers": u.headers},
+    )),
+    Endpoint("POST /allergies", "allergies", lambda u, i: (
+        "POST", "/allergies", {"headers": u.headers, "json": {"allergy_name": f"Allergen {i}"}},
+    ), (201,)),
+    Endpoint("GET /diseases", "diseases", lambda u, i: ("GET", "/diseases", {"headers": u.headers})),
+    Endpoint("GET /diseases/{id}", "diseases", lambda u, i: (
+        "GET", f"/diseases/{u.ids['disease']}", {"headers": u.headers},
+    )),
+    Endpoint("POST /diseases", "diseases", lambda u, i: (
+        "POST", "/diseases", {"headers": u.headers, "json": {"name": f"Disease {i}"}},
+    ), (201,)),
+    Endpoint("GET /tests", "tests", lambda u, i: ("GET", "/tests", {"headers": u.headers})),
+    Endpoint("GET /tests/{id}", "tests", lambda u, i: (
+        "GET", f"/tests/{u.ids['test']}", {"headers": u.headers},
+    )),
+    Endpoint("GET /health-profile", "health-profile", lambda u, i: (
+        "GET", "/health-profile", {"headers": u.headers},
+    )),
+    Endpoint("PUT /health-profile", "health-profile", lambda u, i: (
+        "PUT", "/health-profile", {"headers": u.headers, "json": {"activity_level": f"level {i % 5}"}},
+    )),
+    Endpoint("GET /medications", "medications", lambda u, i: (
+        "GET", "/medications", {"headers": u.headers},
+    )),
+    Endpoint("GET /medications/{id}", "medications", lambda u, i: (
+        "GET", f"/medications/{u.ids['medication']}", {"headers": u.headers},
+    )),
+    Endpoint("POST /medications", "medications", lambda u, i: (
+        "POST", "/medications", {"headers": u.headers, "json": {"med_name": f"Medication {i}"}},
+    ), (201,)),
+    Endpoint("PUT /medications/{id}", "medications", lambda u, i: (
+        "PUT", f"/medications/{u.ids['medication']}", {"headers": u.headers, "json": {"dose": f"{i % 9}0mg"}},
+    )),
+    Endpoint("GET /sync", "sync", lambda u, i: ("GET", "/sync", {"headers": u.headers})),
+]
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Point the app at the benchmark database; must run before importing app."""
+    workdir = os.path.dirname(os.path.abspath(args.db))
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    # A single in-process app: let its startup create/migrate the schema
+    os.environ.setdefault("DATABASE_AUTO_MIGRATE", "true")
+    os.environ.setdefault("OUTBOX_FILE_PATH", os.path.join(workdir, "outbox.jsonl"))
+    os.environ.setdefault("FILE_STORAGE_DIR", os.path.join(workdir, "storage"))
+    if not os.environ.get("FERNET_KEY"):
+        # Encrypted fields must stay readable when --db is reused
+        key_path = os.path.join(workdir, "fernet.key")
+        if not os.path.exists(key_path):
+            from cryptography.fernet import Fernet
+            with open(key_path, "wb") as file:
+                file.write(Fernet.generate_key())
+        with open(key_path) as file:
+            os.environ["FERNET_KEY"] = file.read().strip()
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+
+class StatementCounter:
+    """Counts SQL statements executed on the app's engines."""
+
+    def __init__(self):
+        from sqlalchemy import event
+        from app import database
+
+        self.count = 0
+        engines = {
+            database.engine,
+            database.read_engine,
+            database.async_engine.sync_engine,
+            database.async_read_engine.sync_engine,
+        }
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args) -> None:
+        self.count += 1
+
+
+async def seed(client, users: int, records: int) -> None:
+    """Register users through the API and give each a full medical record."""
+    from sqlalchemy import func, select
+    from app.database import SessionLocal
+    from app.models.user import User
+
+    with SessionLocal() as db:
+        existing = db.scalar(
+            select(func.count()).select_from(User).where(User.phone_number.like(f"{PHONE_PREFIX}%"))
+        )
+    if existing >= users:
+        return
+
+    print(f"Seeding {users - existing} users with {records} records each...", file=sys.stderr)
+    for index in range(existing, users):
+        response = await client.post("/auth/register", json={
+            "first_name": "Seed", "last_name": f"User{index}", "passport_id": f"P{index:09d}",
+            "gender": "Other", "phone_number": phone(index), "password": USER_PASSWORD,
+        })
+        response.raise_for_status()
+
+    for index in range(existing, users):
+        user = await login(client, index)
+        headers = user.headers
+        for path, item in (
+            ("/medications/bulk", lambda n: {"med_name": f"Medication {n}", "dose": "500mg"}),
+            ("/allergies/bulk", lambda n: {"allergy_name": f"Allergen {n}"}),
+            ("/diseases/bulk", lambda n: {"name": f"Disease {n}"}),
+            ("/tests/bulk", lambda n: {"test_type": "Lab" if n % 2 else "Scan"}),
+        ):
+            response = await client.post(path, headers=headers, json=[item(n) for n in range(records)])
+            response.raise_for_status()
+        await client.post("/health-profile", headers=headers, json={"activity_level": "moderate"})
+
+        linked = await client.post("/auth/login", data={
+            "username": phone((index + 1) % users), "password": USER_PASSWORD,
+        })
+        linked_headers = {"Authorization": f"Bearer {linked.json()['access_token']}"}
+        code_number = (await client.get("/users/me", headers=linked_headers)).json()["code_number"]
+        await client.post("/family-members", headers=headers, json={
+            "linked_user_code_number": code_number, "relation": "Sibling",
+        })
+
+
+async def login(client, index: int) -> BenchUser:
+    response = await client.post("/auth/login", data={
+        "username": phone(index), "password": USER_PASSWORD,
+    })
+    response.raise_for_status()
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return BenchUser(phone(index), headers, {})
+
+
+async def load_user(client, index: int) -> BenchUser:
+    """Log in and remember one record id of each type for the detail endpoints."""
+    user = await login(client, index)
+    for key, path, id_field in (
+        ("medication", "/medications", "med_id"),
+        ("allergy", "/allergies", "allergy_id"),
+        ("disease", "/diseases", "disease_id"),
+        ("test", "/tests", "test_id"),
+        ("family_member", "/family-members", "family_id"),
+    ):
+        items = (await client.get(path, headers=user.headers, params={"limit": 1})).json()
+        user.ids[key] = items[0][id_field] if items else "missing"
+    return user
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def run_endpoint(
+    client,
+    endpoint: Endpoint,
+    users: list[BenchUser],
+    counter: StatementCounter,
+    args: argparse.Namespace,
+) -> dict[str, Any]:
+    sequence = itertools.count()
+
+    async def send() -> tuple[float, int]:
+        i = next(sequence)
+        method, url, kwargs = endpoint.build(users[i % len(users)], i)
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        return time.perf_counter() - start, response.status_code
+
+    # Serial pass: SQL statements per request without concurrent noise
+    before = counter.count
+    for _ in range(args.sql_samples):
+        await send()
+    sql_per_request = (counter.count - before) / max(args.sql_samples, 1)
+
+    latencies: list[float] = []
+    statuses: dict[str, int] = {}
+    remaining = itertools.count()
+
+    async def worker() -> None:
+        while next(remaining) < args.requests:
+            latency, status_code = await send()
+            latencies.append(latency)
+            statuses[str(status_code)] = statuses.get(str(status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    errors = sum(
+        count for status_code, count in statuses.items() if int(status_code) not in endpoint.expected
+    )
+    return {
+        "router": endpoint.router,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p50": percentile(latencies, 0.50) * 1000,
+            "p95": percentile(latencies, 0.95) * 1000,
+            "p99": percentile(latencies, 0.99) * 1000,
+        },
+        "sql_per_request": sql_per_request,
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    import httpx
+    from app.config import settings
+    from app.main import create_app
+
+    app = create_app()
+    counter = StatementCounter()
+    selected = [
+        endpoint for endpoint in ENDPOINTS
+        if not args.only or any(pattern in endpoint.name for pattern in args.only)
+    ]
+
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://bench") as client,
+    ):
+        await seed(client, args.users, args.records)
+        users = [await load_user(client, index) for index in range(args.users)]
+
+        results = {}
+        for endpoint in selected:
+            results[endpoint.name] = await run_endpoint(client, endpoint, users, counter, args)
+            print_result(endpoint.name, results[endpoint.name])
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "users": args.users,
+            "records": args.records,
+            "database_async": settings.DATABASE_ASYNC,
+            "fast_json": settings.FAST_JSON,
+            "engine_profile": settings.DATABASE_ENGINE_PROFILE,
+        },
+        "endpoints": results,
+    }
+
+
+def print_header() -> None:
+    print(
+        f"{'endpoint':<30} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+        f"{'sql/req':>7} {'errors':>6}"
+    )
+
+
+def print_result(name: str, result: dict[str, Any]) -> None:
+    latency = result["latency_ms"]
+    print(
+        f"{name:<30} {result['throughput_rps']:>8.1f} {latency['p50']:>8.2f} "
+        f"{latency['p95']:>8.2f} {latency['p99']:>8.2f} {result['sql_per_request']:>7.1f} "
+        f"{result['errors']:>6}"
+    )
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any], max_regression: float) -> bool:
+    """Print p95/SQL changes against a baseline run; False if anything regressed."""
+    ok = True
+    print(f"\n{'endpoint':<30} {'p95 base':>9} {'p95 now':>9} {'change':>8} {'sql base':>8} {'sql now':>8}")
+    for name, result in current["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        before, after = previous["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (after - before) / before if before else 0.0
+        regressed = (
+            change > max_regression
+            or result["sql_per_request"] > previous["sql_per_request"]
+            or result["errors"] > previous["errors"]
+        )
+        ok = ok and not regressed
+        print(
+            f"{name:<30} {before:>9.2f} {after:>9.2f} {change:>+7.0%} "
+            f"{previous['sql_per_request']:>8.1f} {result['sql_per_request']:>8.1f}"
+            f"{'  REGRESSED' if regressed else ''}"
+        )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="SQLite file to seed/reuse (default: a temp file)")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--records", type=int, default=50, help="Records of each type per user")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--sql-samples", type=int, default=5)
+    parser.add_argument("--only", nargs="+", help="Only endpoints whose name contains one of these")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous JSON result")
+    parser.add_argument("--max-regression", type=float, default=0.25,
+                        help="Allowed relative p95 increase before failing the comparison")
+    args = parser.parse_args()
+
+    if not args.db:
+        args.db = os.path.join(tempfile.mkdtemp(prefix="bench-"), "bench.db")
+    configure_environment(args)
+
+    print_header()
+    results = asyncio.run(run(args))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        if not compare(results, baseline, args.max_regression):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
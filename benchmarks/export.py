@@ -0,0 +1,69 @@
+"""NDJSON export throughput benchmark.
+
+Runs the admin export generator (``app.utils.export``) over a populated
+SQLite file, plain and gzip-compressed, and reports rows/sec, output size
+and peak resident memory. Memory should stay flat as ``--users`` grows;
+``--yield-per`` changes the server-side cursor batch size.
+
+Usage::
+
+    FERNET_KEY=... python -m benchmarks.populate --db population.db --users 100000
+    FERNET_KEY=... python -m benchmarks.export --db population.db --yield-per 1000
+"""
+import argparse
+import json
+import os
+import resource
+import time
+
+
+def run(gzip: bool) -> dict[str, float]:
+    from app.utils import security
+    from app.utils.export import batch_stream, export_ndjson, export_stats, gzip_stream
+
+    rows_before = export_stats.rows
+    lines = export_ndjson(None, security.decrypt_text)
+    started_at = time.perf_counter()
+    size = sum(len(chunk) for chunk in (gzip_stream(lines) if gzip else batch_stream(lines)))
+    seconds = time.perf_counter() - started_at
+    return {"rows": export_stats.rows - rows_before, "seconds": seconds, "bytes": size}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", required=True, help="Populated SQLite file (see benchmarks.populate)")
+    parser.add_argument("--yield-per", type=int, default=1000)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+    os.environ["EXPORT_YIELD_PER"] = str(args.yield_per)
+    os.environ.setdefault("SQL_INSTRUMENTATION_ENABLED", "false")
+    # Keep SQLite's mmap and page cache out of the RSS figure
+    os.environ.setdefault("SQLITE_MMAP_SIZE", "0")
+    os.environ.setdefault("SQLITE_CACHE_SIZE", "-2000")
+    from app.utils.security import get_fernet
+    get_fernet()
+
+    results = {}
+    for mode in ("plain", "gzip"):
+        results[mode] = run(gzip=mode == "gzip")
+    # ru_maxrss is in KiB on Linux
+    results["peak_rss_mib"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+    print(f"{'mode':<6} {'rows':>10} {'seconds':>9} {'rows/s':>10} {'MiB':>9}")
+    for mode in ("plain", "gzip"):
+        result = results[mode]
+        print(
+            f"{mode:<6} {result['rows']:>10} {result['seconds']:>9.2f} "
+            f"{result['rows'] / result['seconds']:>10.0f} {result['bytes'] / 2**20:>9.1f}"
+        )
+    print(f"peak RSS {results['peak_rss_mib']:.0f} MiB (yield_per={args.yield_per})")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Live update fan-out benchmark.
+
+Opens ``--caregivers`` in-process event streams (``stream_events``, the
+body of ``GET /live/events``; no sockets), each watching ``--links``
+random relatives out of ``--relatives``. It then commits ``--events``
+medication changes for random relatives at ``--rate`` per second through
+the normal session path. For each delivered event it reports the latency
+from commit to the subscriber receiving the frame (change log write, feed
+wake-up, hub fan-out and SSE encoding), plus the time until the last
+watcher has it. ``--slow`` subscribers never read, so once
+``LIVE_QUEUE_SIZE`` (``--queue-size``) events back up they must be evicted
+without delaying the others.
+
+Usage::
+
+    python -m benchmarks.live --caregivers 5000 --relatives 500 --links 3 --events 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+
+
+def configure_environment(workdir: str, args: argparse.Namespace) -> None:
+    """Point the app at a scratch database; must run before importing app."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'live.db')}"
+    os.environ["DATABASE_AUTO_MIGRATE"] = "true"
+    os.environ.setdefault("SQL_INSTRUMENTATION_ENABLED", "false")
+    os.environ["LIVE_MAX_SUBSCRIBERS"] = str(max(args.caregivers, 1))
+    if args.queue_size:
+        os.environ["LIVE_QUEUE_SIZE"] = str(args.queue_size)
+    if not os.environ.get("FERNET_KEY"):
+        from cryptography.fernet import Fernet
+        os.environ["FERNET_KEY"] = Fernet.generate_key().decode()
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+
+def seed(engine, caregivers: int, relatives: int, links: int, rng: random.Random):
+    """Insert users and family links; returns (caregiver ids, relative ids)."""
+    from sqlalchemy import insert
+
+    from app.models.family_member import FamilyMember
+    from app.models.user import GenderEnum, User
+
+    def user(index: int) -> dict:
+        return {
+            "user_id": str(uuid.uuid4()),
+            "code_number": f"USR-B{index:07d}",
+            "first_name": "Bench",
+            "last_name": str(index),
+            "passport_id": f"B{index:09d}",
+            "gender": list(GenderEnum)[0],
+            "phone_number": f"8{index:09d}",
+            "password_hash": "-",
+        }
+
+    relative_rows = [user(index) for index in range(relatives)]
+    caregiver_rows = [user(relatives + index) for index in range(caregivers)]
+    relative_ids = [row["user_id"] for row in relative_rows]
+    member_rows = [
+        {
+            "family_id": str(uuid.uuid4()),
+            "user_id": caregiver["user_id"],
+            "name": "-",
+            "relation": "Parent",
+            "linked_user_id": linked,
+        }
+        for caregiver in caregiver_rows
+        for linked in rng.sample(relative_ids, min(links, relatives))
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(User), relative_rows + caregiver_rows)
+        conn.execute(insert(FamilyMember), member_rows)
+    return [row["user_id"] for row in caregiver_rows], relative_ids
+
+
+def write_medication(user_id: str, med_id: str) -> None:
+    from app.database import SessionLocal
+    from app.models.medication import Medication
+
+    with SessionLocal() as session:
+        session.add(Medication(med_id=med_id, user_id=user_id, med_name="Benchmark"))
+        session.commit()
+
+
+async def consume(user_id: str, ready: asyncio.Event, received: dict, slow: bool) -> None:
+    from app.utils.live_updates import stream_events
+
+    async for frame in stream_events(user_id, None):
+        if not ready.is_set():
+            ready.set()  # first frame: subscribed and watching
+            if slow:
+                await asyncio.Event().wait()
+            continue
+        if frame.startswith(b"id: "):
+            data = json.loads(frame.rsplit(b"data: ", 1)[1])
+            received.setdefault(data["id"], []).append(time.perf_counter())
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+async def run(args: argparse.Namespace) -> dict:
+    from app import database
+    from app.migrations import migrate
+    from app.utils.live_updates import change_feed, hub
+    from app.utils.security import load_keys
+
+    load_keys()
+    migrate(database.engine)
+    rng = random.Random(args.seed)
+    caregiver_ids, relative_ids = seed(database.engine, args.caregivers, args.relatives, args.links, rng)
+    slow_ids = set(rng.sample(caregiver_ids, args.slow))
+
+    feed = asyncio.create_task(change_feed.run(database.read_engine))
+    received: dict[str, list[float]] = {}
+    started = time.perf_counter()
+    readiness = [asyncio.Event() for _ in caregiver_ids]
+    consumers = [
+        asyncio.create_task(consume(user_id, ready, received, user_id in slow_ids))
+        for user_id, ready in zip(caregiver_ids, readiness)
+    ]
+    for ready in readiness:
+        await ready.wait()
+    connect_seconds = time.perf_counter() - started
+
+    committed: dict[str, float] = {}
+    loop = asyncio.get_running_loop()
+    for _ in range(args.events):
+        relative = rng.choice(relative_ids)
+        med_id = str(uuid.uuid4())
+        committed_at = time.perf_counter()
+        await loop.run_in_executor(None, write_medication, relative, med_id)
+        committed[med_id] = committed_at
+        await asyncio.sleep(1 / args.rate)
+    await asyncio.sleep(1.0)
+
+    for task in consumers + [feed]:
+        task.cancel()
+    await asyncio.gather(*consumers, feed, return_exceptions=True)
+
+    latencies = []
+    completions = []
+    for med_id, committed_at in committed.items():
+        times = received.get(med_id, [])
+        latencies.extend((t - committed_at) * 1000 for t in times)
+        if times:
+            completions.append((max(times) - committed_at) * 1000)
+    stats = hub.stats()
+    return {
+        "subscribers": args.caregivers,
+        "connect_seconds": connect_seconds,
+        "events": args.events,
+        "deliveries": len(latencies),
+        "mean_fanout": len(latencies) / args.events if args.events else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.50) if latencies else 0.0,
+            "p95": percentile(latencies, 0.95) if latencies else 0.0,
+            "p99": percentile(latencies, 0.99) if latencies else 0.0,
+            "max": max(latencies, default=0.0),
+        },
+        "fanout_complete_ms_p95": percentile(completions, 0.95) if completions else 0.0,
+        "fanout_complete_ms_median": statistics.median(completions) if completions else 0.0,
+        "evicted": stats["evicted"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--caregivers", type=int, default=5000, help="Open event streams")
+    parser.add_argument("--relatives", type=int, default=500)
+    parser.add_argument("--links", type=int, default=3, help="Relatives watched per caregiver")
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=50.0, help="Commits per second")
+    parser.add_argument("--slow", type=int, default=0, help="Subscribers that never read")
+    parser.add_argument("--queue-size", type=int, help="Override LIVE_QUEUE_SIZE")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    configure_environment(tempfile.mkdtemp(prefix="live-"), args)
+    result = asyncio.run(run(args))
+
+    latency = result["latency_ms"]
+    print(f"{result['subscribers']} streams connected in {result['connect_seconds']:.2f}s")
+    print(f"{result['events']} events, {result['deliveries']} deliveries "
+          f"(mean fan-out {result['mean_fanout']:.1f}), {result['evicted']} evicted")
+    print(f"commit -> delivery ms  p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+          f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    print(f"commit -> last watcher ms  median {result['fanout_complete_ms_median']:.1f}  "
+          f"p95 {result['fanout_complete_ms_p95']:.1f}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(result, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
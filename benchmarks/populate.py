@@ -0,0 +1,349 @@
+"""Synthetic patient population generator for scale testing.
+
+Fills the schema in ``app/models`` with N users and realistic per-user
+distributions of medications, allergies, encrypted chronic diseases,
+lab/scan tests, health profiles and family-member links, plus their change
+log entries for delta sync. Rows are written
+with Core ``insert()`` executemany batches, one transaction per chunk of
+users, and every user shares one pre-computed Argon2 hash so hashing never
+dominates generation time. Each user's records come from an RNG seeded
+with ``--seed`` and the user's index, and timestamps are relative to
+``--base-time`` rather than the clock, so the same arguments produce the
+same users and records however the load is split into ``--offset`` runs
+and chunks (the password hash and ciphertexts differ, since Argon2 salts
+and Fernet IVs are random).
+
+Users get the phone numbers and password used by ``benchmarks.endpoints``,
+so a generated file can be passed to it with ``--db``.
+
+Usage::
+
+    FERNET_KEY=... python -m benchmarks.populate --db population.db --users 1000000 --seed 42
+    FERNET_KEY=... python -m benchmarks.populate --db population.db --users 1000000 --offset 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+USER_PASSWORD = "benchmark-password"
+
+FIRST_NAMES = [
+    "Ahmed", "Mohamed", "Sara", "Mariam", "Omar", "Youssef", "Nour", "Laila", "Karim", "Hana",
+    "Ali", "Fatma", "Mostafa", "Salma", "Hassan", "Aya", "Mahmoud", "Yasmin", "Tarek", "Dina",
+]
+LAST_NAMES = [
+    "Hassan", "Ibrahim", "Mahmoud", "Ali", "Mostafa", "Eisa", "Kamal", "Saleh", "Fathy", "Nabil",
+    "Abdelrahman", "Farouk", "Zaki", "Soliman", "Gamal", "Adel", "Samir", "Hamdy", "Fouad", "Ragab",
+]
+NATIONALITIES = ["Egyptian"] * 8 + ["Saudi", "Sudanese", "Jordanian", "Syrian"]
+MARITAL_STATUSES = ["Single", "Married", "Married", "Divorced", "Widowed"]
+MEDICATIONS = [
+    ("Metformin", "500mg"), ("Lisinopril", "10mg"), ("Atorvastatin", "20mg"), ("Amlodipine", "5mg"),
+    ("Omeprazole", "20mg"), ("Levothyroxine", "50mcg"), ("Aspirin", "81mg"), ("Insulin glargine", "20IU"),
+    ("Salbutamol", "100mcg"), ("Paracetamol", "500mg"), ("Ibuprofen", "400mg"), ("Amoxicillin", "500mg"),
+    ("Losartan", "50mg"), ("Bisoprolol", "5mg"), ("Warfarin", "5mg"), ("Vitamin D3", "1000IU"),
+]
+FREQUENCIES = ["Once daily", "Twice daily", "3 times per day", "Every 8 hours", "As needed", "Weekly"]
+ALLERGIES = [
+    "Penicillin", "Sulfa drugs", "Aspirin", "Peanuts", "Shellfish", "Eggs", "Milk", "Latex",
+    "Pollen", "Dust mites", "Cat dander", "Bee stings",
+]
+DISEASES = [
+    "Type 2 diabetes", "Hypertension", "Asthma", "Hypothyroidism", "Coronary artery disease",
+    "Chronic kidney disease", "COPD", "Rheumatoid arthritis", "Epilepsy", "Sickle cell trait",
+    "Thalassemia minor", "Hepatitis C", "Migraine", "Osteoarthritis",
+]
+RELATIONS = ["Spouse", "Child", "Parent", "Sibling", "Grandparent"]
+ACTIVITY_LEVELS = ["Sedentary", "Light", "Moderate", "Active", "Very active"]
+SLEEP_PATTERNS = ["6-7 hours", "7-8 hours", "Less than 6 hours", "Irregular", "More than 8 hours"]
+
+# Mean number of rows per user for each child table (~20 per user in total)
+MEANS = {
+    "medications": 7.0,
+    "allergies": 1.5,
+    "chronic_diseases": 1.2,
+    "lab_scan_tests": 7.0,
+    "family_members": 1.5,
+}
+HEALTH_PROFILE_RATE = 0.7
+
+# Default --base-time: a fixed epoch so output does not depend on the clock
+BASE_TIME = datetime(2025, 1, 1)
+
+
+def phone(index: int) -> str:
+    # Same scheme as benchmarks.endpoints
+    return f"9{index:09d}"
+
+
+def code_number(index: int) -> str:
+    digits = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    out = []
+    for _ in range(8):
+        index, remainder = divmod(index, 36)
+        out.append(digits[remainder])
+    return "USR-" + "".join(reversed(out))
+
+
+class Generator:
+    """Builds row dicts for a chunk of users, each from its own seeded RNG."""
+
+    def __init__(self, seed: int, password_hash: str, now: datetime):
+        from app.models.health_profile import HealthStatusEnum
+        from app.models.lab_scan_test import TestTypeEnum
+        from app.models.user import GenderEnum
+        from app.migrations import SYNCED_TABLES
+
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.password_hash = password_hash
+        self.now = now
+        # Low 48 bits left free so user ids can be derived from the index
+        self.user_id_base = self.rng.getrandbits(128) & ~((1 << 48) - 1)
+        self.genders = list(GenderEnum)
+        self.health_statuses = list(HealthStatusEnum)
+        self.test_types = list(TestTypeEnum)
+        self.synced_tables = SYNCED_TABLES
+
+    def user_rng(self, index: int) -> random.Random:
+        # Depends only on (seed, index): appended runs never repeat row ids
+        return random.Random((self.seed << 48) + index)
+
+    def user_id(self, index: int) -> str:
+        return str(uuid.UUID(int=self.user_id_base + index, version=4))
+
+    def row_id(self) -> str:
+        # uuid4 layout without the cost of building UUID objects
+        h = f"{self.rng.getrandbits(128):032x}"
+        return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[int(h[16], 16) & 3]}{h[17:20]}-{h[20:]}"
+
+    def count(self, mean: float) -> int:
+        return min(int(self.rng.expovariate(1 / mean)), int(mean * 8))
+
+    def timestamp(self, days_back: int = 3 * 365) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(days_back * 86400))
+
+    def full_name(self, index: int) -> tuple[str, str]:
+        # Derived from the index so family links can name the linked user
+        return (
+            FIRST_NAMES[(index * 7919) % len(FIRST_NAMES)],
+            LAST_NAMES[(index * 104729) % len(LAST_NAMES)],
+        )
+
+    def chunk(self, start: int, stop: int, encrypt) -> dict[str, list[dict]]:
+        rows: dict[str, list[dict]] = {
+            "users": [], "health_profiles": [], "medications": [], "allergies": [],
+            "chronic_diseases": [], "lab_scan_tests": [], "family_members": [],
+        }
+        for index in range(start, stop):
+            rng = self.rng = self.user_rng(index)
+            user_id = self.user_id(index)
+            first_name, last_name = self.full_name(index)
+            created_at = self.timestamp()
+            rows["users"].append({
+                "user_id": user_id,
+                "code_number": code_number(index),
+                "first_name": first_name,
+                "last_name": last_name,
+                "passport_id": f"P{index:09d}",
+                "gender": rng.choice(self.genders),
+                "nationality": rng.choice(NATIONALITIES),
+                "marital_status": rng.choice(MARITAL_STATUSES),
+                "phone_number": phone(index),
+                "password_hash": self.password_hash,
+                "created_at": created_at,
+                "updated_at": created_at,
+            })
+
+            if rng.random() < HEALTH_PROFILE_RATE:
+                rows["health_profiles"].append({
+                    "profile_id": self.row_id(),
+                    "user_id": user_id,
+                    "health_status": rng.choice(self.health_statuses),
+                    "activity_level": rng.choice(ACTIVITY_LEVELS),
+                    "dietary_notes": None,
+                    "sleep_pattern": rng.choice(SLEEP_PATTERNS),
+                    "updated_at": self.timestamp(),
+                })
+
+            for _ in range(self.count(MEANS["medications"])):
+                med_name, dose = rng.choice(MEDICATIONS)
+                rows["medications"].append({
+                    "med_id": self.row_id(),
+                    "user_id": user_id,
+                    "med_name": med_name,
+                    "dose": dose,
+                    "frequency": rng.choice(FREQUENCIES),
+                    "duration_end": (
+                        self.now.date() + timedelta(days=rng.randrange(365))
+                        if rng.random() < 0.4 else None
+                    ),
+                    "created_at": self.timestamp(),
+                })
+
+            for _ in range(self.count(MEANS["allergies"])):
+                rows["allergies"].append({
+                    "allergy_id": self.row_id(),
+                    "user_id": user_id,
+                    "allergy_name": rng.choice(ALLERGIES),
+                    "created_at": self.timestamp(),
+                })
+
+            for _ in range(self.count(MEANS["chronic_diseases"])):
+                diagnosed_at = self.timestamp(20 * 365)
+                rows["chronic_diseases"].append({
+                    "disease_id": self.row_id(),
+                    "user_id": user_id,
+                    "name": encrypt(rng.choice(DISEASES)),
+                    "diagnosis_date": diagnosed_at.date() if rng.random() < 0.8 else None,
+                    "created_at": self.timestamp(),
+                })
+
+            for _ in range(self.count(MEANS["lab_scan_tests"])):
+                test_id = self.row_id()
+                rows["lab_scan_tests"].append({
+                    "test_id": test_id,
+                    "user_id": user_id,
+                    "test_type": rng.choice(self.test_types),
+                    "image_url": None,
+                    "created_at": self.timestamp(),
+                })
+
+            # Link to users generated earlier (by this run or the ones before
+            # an --offset), so links do not depend on how the load is split
+            for _ in range(self.count(MEANS["family_members"])):
+                if index == 0:
+                    break
+                linked = rng.randrange(index)
+                linked_first, linked_last = self.full_name(linked)
+                rows["family_members"].append({
+                    "family_id": self.row_id(),
+                    "user_id": user_id,
+                    "name": f"{linked_first} {linked_last}",
+                    "relation": rng.choice(RELATIONS),
+                    "linked_user_id": self.user_id(linked),
+                    "created_at": self.timestamp(),
+                })
+
+        for name, table_rows in rows.items():
+            if name not in ("users", "health_profiles"):
+                for row in table_rows:
+                    row["updated_at"] = row["created_at"]
+        # One entry per record, as the app's change logging would have written
+        rows["change_log"] = [
+            {
+                "user_id": row["user_id"],
+                "resource": name,
+                "record_id": row[primary_key],
+                "deleted": False,
+                "changed_at": row["updated_at"],
+            }
+            for name, primary_key in self.synced_tables.items()
+            for row in rows[name]
+        ]
+        return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--db", help="SQLite file to fill (default: DATABASE_URL)")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--offset", type=int, default=0,
+                        help="First user index, to append to a population of users 0..offset-1")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--base-time", type=datetime.fromisoformat, default=BASE_TIME,
+                        help="Generated timestamps fall before this ISO time (default: %(default)s)")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Users per transaction")
+    parser.add_argument("--keep-indexes", action="store_true",
+                        help="Maintain secondary indexes during the load instead of rebuilding them")
+    args = parser.parse_args()
+
+    if args.db:
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.db)}"
+
+    from sqlalchemy import create_engine, event, insert
+
+    import app.models  # noqa: F401 (registers every table)
+    from app.config import settings
+    from app.database import Base, is_sqlite
+    from app.migrations import migrate
+    from app.utils.keystore import KeyStoreError
+    from app.utils.security import encrypt_text, get_fernet, hash_password
+
+    # The app's keys, so the encrypted disease names stay readable
+    try:
+        get_fernet()
+    except KeyStoreError as exc:
+        sys.exit(str(exc))
+
+    engine = create_engine(settings.DATABASE_URL)
+    if is_sqlite(settings.DATABASE_URL):
+        @event.listens_for(engine, "connect")
+        def _bulk_load_pragmas(dbapi_connection, connection_record):
+            # Throwaway data: trade durability for load speed
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=OFF")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA cache_size=-262144")
+            cursor.close()
+
+    migrate(engine)
+
+    tables = Base.metadata.tables
+    order = [
+        "users", "health_profiles", "medications", "allergies",
+        "chronic_diseases", "lab_scan_tests", "family_members", "change_log",
+    ]
+    deferred = [] if args.keep_indexes else [
+        index for name in order[1:] for index in tables[name].indexes if not index.unique
+    ]
+    with engine.begin() as conn:
+        for index in deferred:
+            index.drop(conn, checkfirst=True)
+
+    generator = Generator(args.seed, hash_password(USER_PASSWORD), args.base_time)
+    totals = dict.fromkeys(order, 0)
+    started = time.perf_counter()
+    stop_at = args.offset + args.users
+
+    def write_chunk(stop: int, rows: dict[str, list[dict]]) -> None:
+        with engine.begin() as conn:
+            for name in order:
+                if rows[name]:
+                    conn.execute(insert(tables[name]), rows[name])
+                    totals[name] += len(rows[name])
+
+        elapsed = time.perf_counter() - started
+        written = sum(totals.values())
+        print(
+            f"users {stop - args.offset:>9}/{args.users}  rows {written:>11}  "
+            f"{written / elapsed:>9.0f} rows/s  {elapsed:>7.1f}s",
+            file=sys.stderr,
+        )
+
+    for start in range(args.offset, stop_at, args.chunk_size):
+        stop = min(start + args.chunk_size, stop_at)
+        write_chunk(stop, generator.chunk(start, stop, encrypt_text))
+
+    if deferred:
+        index_started = time.perf_counter()
+        with engine.begin() as conn:
+            for index in deferred:
+                index.create(conn, checkfirst=True)
+        print(f"rebuilt {len(deferred)} indexes in {time.perf_counter() - index_started:.1f}s",
+              file=sys.stderr)
+    engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    for name in order:
+        print(f"{name:<18} {totals[name]:>11}")
+    print(f"{'total':<18} {sum(totals.values()):>11}  in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Compare list-response serialization paths.
+
+Serializes N medication rows (transient ORM objects) as ``List[MedicationRead]``
+three ways and reports per-item cost and encoded bytes per second:
+
+* ``fastapi`` -- the default path: ``serialize_response`` + ``JSONResponse``
+* ``orjson`` -- the default path, rendered with ``ORJSONResponse``
+* ``fast`` -- ``app.utils.serialization.serialize_list`` (cached TypeAdapter)
+
+Usage::
+
+    python -m benchmarks.serialization [--rows 10 1000 10000] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import date, timedelta
+from typing import List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.models.medication import Medication
+from app.schemas.medication import MedicationRead
+from app.utils.serialization import serialize_list
+
+response_field = create_response_field(name="Response", type_=List[MedicationRead])
+loop = asyncio.new_event_loop()
+
+
+def make_rows(count: int) -> list[Medication]:
+    user_id = str(uuid.uuid4())
+    return [
+        Medication(
+            med_id=str(uuid.uuid4()),
+            user_id=user_id,
+            med_name=f"Medication {i}",
+            dose=f"{(i % 10 + 1) * 50}mg",
+            frequency="2 times per day",
+            duration_end=date(2030, 1, 1) + timedelta(days=i % 365),
+        )
+        for i in range(count)
+    ]
+
+
+async def default_path(rows, response_class) -> bytes:
+    content = await serialize_response(
+        field=response_field, response_content=rows, is_coroutine=True
+    )
+    return response_class(content).body
+
+
+def fastapi_json(rows) -> bytes:
+    return loop.run_until_complete(default_path(rows, JSONResponse))
+
+
+def fastapi_orjson(rows) -> bytes:
+    return loop.run_until_complete(default_path(rows, ORJSONResponse))
+
+
+def fast_path(rows) -> bytes:
+    return serialize_list(MedicationRead, rows)
+
+
+PATHS = {"fastapi": fastapi_json, "orjson": fastapi_orjson, "fast": fast_path}
+
+
+def measure(func, rows, min_seconds: float) -> dict[str, float]:
+    func(rows)  # warm up (and build cached adapters)
+    iterations = 0
+    total_bytes = 0
+    start = time.perf_counter()
+    while True:
+        total_bytes += len(func(rows))
+        iterations += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+    per_call = elapsed / iterations
+    return {
+        "iterations": iterations,
+        "ms_per_call": per_call * 1000,
+        "us_per_item": per_call / len(rows) * 1e6,
+        "mb_per_second": total_bytes / elapsed / 1e6,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--min-seconds", type=float, default=1.0)
+    parser.add_argument("--json", help="Write results to this file")
+    args = parser.parse_args()
+
+    # The fast path must produce the same document as the default one
+    sample = make_rows(3)
+    assert json.loads(fast_path(sample)) == json.loads(fastapi_json(sample))
+
+    results = []
+    print(f"{'rows':>7} {'path':>8} {'ms/call':>10} {'us/item':>9} {'MB/s':>8} {'speedup':>8}")
+    for count in args.rows:
+        rows = make_rows(count)
+        baseline = None
+        for name, func in PATHS.items():
+            result = {"rows": count, "path": name, **measure(func, rows, args.min_seconds)}
+            baseline = baseline or result["ms_per_call"]
+            result["speedup"] = baseline / result["ms_per_call"]
+            results.append(result)
+            print(
+                f"{count:>7} {name:>8} {result['ms_per_call']:>10.3f} "
+                f"{result['us_per_item']:>9.2f} {result['mb_per_second']:>8.1f} "
+                f"{result['speedup']:>7.2f}x"
+            )
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
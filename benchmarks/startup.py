@@ -0,0 +1,138 @@
+"""Cold-start benchmark.
+
+Starts the app in fresh interpreters and times each startup phase:
+
+* ``import`` -- ``import app.main``
+* ``create_app`` -- building the app (routers, middleware)
+* ``lifespan`` -- running startup (schema check, background tasks)
+* ``first_request`` / ``second_request`` -- ``GET /health`` through ASGI
+* ``openapi`` -- the first ``GET /openapi.json`` (schema generation)
+
+The database is migrated once beforehand, out-of-band, as in a deploy.
+
+Usage::
+
+    python -m benchmarks.startup [--runs 10] [--importtime 15] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PHASES = ("import", "create_app", "lifespan", "first_request", "second_request", "openapi")
+
+
+def child() -> None:
+    """Measure one cold start and print the phase timings as JSON."""
+    timings = {}
+    started = time.perf_counter()
+    import app.main
+    timings["import"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    application = app.main.create_app()
+    timings["create_app"] = time.perf_counter() - started
+
+    async def serve() -> None:
+        import httpx
+
+        transport = httpx.ASGITransport(app=application)
+        started = time.perf_counter()
+        async with application.router.lifespan_context(application):
+            timings["lifespan"] = time.perf_counter() - started
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for phase, path in (
+                    ("first_request", "/health"),
+                    ("second_request", "/health"),
+                    ("openapi", "/openapi.json"),
+                ):
+                    started = time.perf_counter()
+                    response = await client.get(path)
+                    timings[phase] = time.perf_counter() - started
+                    response.raise_for_status()
+
+    asyncio.run(serve())
+    print(json.dumps({phase: seconds * 1000 for phase, seconds in timings.items()}))
+
+
+def configure_environment(workdir: str) -> dict[str, str]:
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+    if not env.get("FERNET_KEY"):
+        from cryptography.fernet import Fernet
+        env["FERNET_KEY"] = Fernet.generate_key().decode()
+    env.setdefault("SECRET_KEY", "benchmark-secret-key")
+    env.setdefault("OUTBOX_FILE_PATH", os.path.join(workdir, "outbox.jsonl"))
+    env.setdefault("FILE_STORAGE_DIR", os.path.join(workdir, "storage"))
+    return env
+
+
+def run_child(env: dict[str, str], *python_options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *python_options, "-m", "benchmarks.startup", "--child"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def top_imports(stderr: str, count: int) -> list[tuple[float, str]]:
+    """Parse ``-X importtime`` output into the slowest (cumulative ms, module) pairs."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative) / 1000, module.rstrip()))
+    return sorted(rows, reverse=True)[:count]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--importtime", type=int, metavar="N", default=0,
+                        help="Also list the N slowest imports (python -X importtime)")
+    parser.add_argument("--json", help="Write per-run and summary timings to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child()
+        return
+
+    env = configure_environment(tempfile.mkdtemp(prefix="startup-"))
+    subprocess.run([sys.executable, "-m", "app.migrations"], env=env, check=True, capture_output=True)
+
+    runs = [json.loads(run_child(env).stdout.splitlines()[-1]) for _ in range(args.runs)]
+    summary = {
+        phase: {
+            "median_ms": statistics.median(run[phase] for run in runs),
+            "min_ms": min(run[phase] for run in runs),
+            "max_ms": max(run[phase] for run in runs),
+        }
+        for phase in PHASES
+    }
+    totals = [sum(run[phase] for phase in PHASES) for run in runs]
+    summary["total"] = {
+        "median_ms": statistics.median(totals), "min_ms": min(totals), "max_ms": max(totals),
+    }
+
+    print(f"{'phase':<16} {'median ms':>10} {'min ms':>10} {'max ms':>10}   ({args.runs} runs)")
+    for phase, stats in summary.items():
+        print(f"{phase:<16} {stats['median_ms']:>10.1f} {stats['min_ms']:>10.1f} {stats['max_ms']:>10.1f}")
+
+    if args.importtime:
+        print(f"\n{'cumulative ms':>13}  module")
+        for cumulative, module in top_imports(run_child(env, "-X", "importtime").stderr, args.importtime):
+            print(f"{cumulative:>13.1f}  {module}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"runs": runs, "summary": summary}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
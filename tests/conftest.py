@@ -0,0 +1,55 @@
+import os
+import tempfile
+import uuid
+
+# Settings are read at import time: point the app at a scratch directory first
+_workdir = tempfile.mkdtemp(prefix="doctor-assistant-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+os.environ["DATABASE_AUTO_MIGRATE"] = "true"
+os.environ["KEYSTORE_DIR"] = os.path.join(_workdir, "keys")
+os.environ["OUTBOX_FILE_PATH"] = os.path.join(_workdir, "outbox.jsonl")
+os.environ["FILE_STORAGE_DIR"] = os.path.join(_workdir, "storage")
+os.environ["RATE_LIMIT_ENABLED"] = "false"
+os.environ["PASSWORD_HASH_USE_PROCESSES"] = "false"
+os.environ["SQL_INSTRUMENTATION_ENABLED"] = "true"
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import create_app  # noqa: E402
+from app.utils.keystore import init_keystore  # noqa: E402
+
+init_keystore()
+
+
+@pytest.fixture(scope="session")
+def app():
+    return create_app()
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def register_user(client):
+    """Register and log in a new user; returns (user, auth headers)."""
+    def register():
+        number = str(uuid.uuid4().int)[:12]
+        response = client.post("/auth/register", json={
+            "first_name": "Test",
+            "last_name": "User",
+            "passport_id": f"P{number}",
+            "gender": "Female",
+            "phone_number": number,
+            "password": "secret123",
+        })
+        assert response.status_code == 201, response.text
+        login = client.post("/auth/login", data={"username": number, "password": "secret123"})
+        assert login.status_code == 200, login.text
+        return response.json(), {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    return register
+
@@ -0,0 +1,64 @@
+import asyncio
+
+from sqlalchemy import select
+
+from app.database import SessionLocal, ThreadedSession
+from app.models.medication import Medication
+from app.utils.bulk import bulk_update
+
+
+def create_medications(client, headers, count: int) -> list[dict]:
+    response = client.post("/medications/bulk", headers=headers, json=[
+        {"med_name": f"Medication {number}", "dose": "10mg"} for number in range(count)
+    ])
+    assert response.status_code == 200, response.text
+    return [result["item"] for result in response.json()["results"]]
+
+
+def test_bulk_update_rejects_null_med_name_per_item(client, register_user):
+    _, headers = register_user()
+    first, second = create_medications(client, headers, 2)
+
+    response = client.patch("/medications/bulk", headers=headers, json=[
+        {"med_id": first["med_id"], "med_name": None},
+        {"med_id": second["med_id"], "dose": "20mg"},
+    ])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["succeeded"], body["failed"]) == (1, 1)
+    assert body["results"][0]["status"] == "error"
+    assert body["results"][1]["item"]["dose"] == "20mg"
+
+    response = client.put(f"/medications/{first['med_id']}", headers=headers, json={"med_name": None})
+    assert response.status_code == 422
+
+
+def test_bulk_update_isolates_rows_the_database_rejects(client, register_user):
+    _, headers = register_user()
+    medications = create_medications(client, headers, 3)
+
+    async def update() -> dict[int, str]:
+        db = ThreadedSession(SessionLocal(expire_on_commit=False))
+        try:
+            result = await db.execute(
+                select(Medication).where(Medication.med_id.in_([m["med_id"] for m in medications]))
+            )
+            loaded = {medication.med_id: medication for medication in result.scalars().all()}
+            failures = await bulk_update(db, Medication, [
+                (index, loaded[medication["med_id"]], {"med_name": None if index == 1 else "Renamed"})
+                for index, medication in enumerate(medications)
+            ])
+            await db.commit()
+            return failures
+        finally:
+            await db.close()
+
+    failures = asyncio.run(update())
+    assert list(failures) == [1]
+    assert "NOT NULL" in failures[1]
+
+    response = client.get("/medications", headers=headers)
+    names = {medication["med_id"]: medication["med_name"] for medication in response.json()}
+    assert names[medications[0]["med_id"]] == "Renamed"
+    assert names[medications[1]["med_id"]] == "Medication 1"
+    assert names[medications[2]["med_id"]] == "Renamed"
@@ -0,0 +1,31 @@
+def statement_count(response) -> int:
+    """Statements the request ran, from its Server-Timing header."""
+    for metric in response.headers["server-timing"].split(","):
+        if metric.strip().startswith("db;"):
+            return int(metric.split('desc="', 1)[1].split(" ", 1)[0])
+    raise AssertionError("no db entry in Server-Timing")
+
+
+def create_household(client, register_user, size: int) -> dict[str, str]:
+    _, headers = register_user()
+    for _ in range(size):
+        relative, _ = register_user()
+        response = client.post("/family-members", headers=headers, json={
+            "linked_user_code_number": relative["code_number"],
+            "relation": "Sibling",
+        })
+        assert response.status_code == 201, response.text
+    return headers
+
+
+def test_list_family_members_query_count_is_constant(client, register_user):
+    counts = {}
+    for size in (1, 10):
+        headers = create_household(client, register_user, size)
+        response = client.get("/family-members", headers=headers)
+        assert response.status_code == 200
+        assert len(response.json()) == size
+        assert all(member["linked_user_code_number"] for member in response.json())
+        counts[size] = statement_count(response)
+
+    assert counts[1] == counts[10]
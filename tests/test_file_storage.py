@@ -0,0 +1,30 @@
+from app import database
+from app.config import settings
+from app.utils.file_storage import file_storage, sweep_unreferenced_blobs
+
+
+def upload(client, headers, test_id: str, content: bytes) -> str:
+    response = client.post(
+        f"/tests/{test_id}/file",
+        headers=headers,
+        files={"file": ("report.pdf", content, "application/pdf")},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["file_sha256"]
+
+
+def test_sweep_removes_blob_replaced_within_grace_period(client, register_user, monkeypatch):
+    _, headers = register_user()
+    test_id = client.post("/tests", headers=headers, json={"test_type": "Lab"}).json()["test_id"]
+
+    replaced = upload(client, headers, test_id, b"first version")
+    current = upload(client, headers, test_id, b"second version")
+    # Still within the grace period: replacing the file kept the old blob
+    assert file_storage.exists(replaced)
+
+    monkeypatch.setattr(settings, "FILE_GC_GRACE_SECONDS", 0)
+    sweep_unreferenced_blobs(database.read_engine)
+
+    assert not file_storage.exists(replaced)
+    assert file_storage.exists(current)
+    assert client.get(f"/tests/{test_id}/file", headers=headers).content == b"second version"
@@ -0,0 +1,17 @@
+from app.config import settings
+
+
+def test_metrics_require_admin_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_TOKEN", "metrics-token")
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    response = client.get("/metrics", headers={"X-Admin-Token": "metrics-token"})
+    assert response.status_code == 200
+    assert "http_requests_total" in response.text
+
+
+def test_metrics_public_when_configured(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_PUBLIC", True)
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics").headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
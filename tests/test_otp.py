@@ -0,0 +1,139 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.config import settings
+from app.routers import auth
+from app.utils import otp
+from app.utils.otp import InMemoryOTPStore, OTPStatus, SQLiteOTPStore, hash_code, otp_key
+
+PHONE = "201000000000"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(otp.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryOTPStore()
+    return SQLiteOTPStore(str(tmp_path / "otp_codes.db"))
+
+
+def verify(store, code, consume=False, phone=PHONE):
+    return asyncio.run(store.verify(phone, code, consume=consume))
+
+
+def test_valid_code_until_consumed(store, clock):
+    asyncio.run(store.issue(PHONE, "123456", ttl=600))
+    assert verify(store, "123456") == OTPStatus.VALID
+    assert verify(store, "123456") == OTPStatus.VALID
+    assert verify(store, "123456", consume=True) == OTPStatus.VALID
+    assert verify(store, "123456") == OTPStatus.MISSING
+
+
+def test_expiry(store, clock):
+    asyncio.run(store.issue(PHONE, "123456", ttl=600))
+    clock.now += 599
+    assert verify(store, "123456") == OTPStatus.VALID
+    clock.now += 1
+    assert verify(store, "123456") == OTPStatus.EXPIRED
+    # An expired code is dropped, not kept around
+    assert verify(store, "123456") == OTPStatus.MISSING
+
+
+def test_attempt_limit_locks_code(store, clock):
+    asyncio.run(store.issue(PHONE, "123456", ttl=600))
+    for _ in range(settings.OTP_MAX_ATTEMPTS - 1):
+        assert verify(store, "000000") == OTPStatus.INVALID
+    assert verify(store, "000000") == OTPStatus.LOCKED
+    # The right code no longer works once the code is locked
+    assert verify(store, "123456") == OTPStatus.MISSING
+
+
+def test_reissue_replaces_code_and_resets_attempts(store, clock):
+    asyncio.run(store.issue(PHONE, "123456", ttl=600))
+    for _ in range(settings.OTP_MAX_ATTEMPTS - 1):
+        verify(store, "000000")
+    asyncio.run(store.issue(PHONE, "654321", ttl=600))
+    assert verify(store, "123456") == OTPStatus.INVALID
+    assert verify(store, "654321") == OTPStatus.VALID
+
+
+def test_sweep_removes_only_expired_codes(store, clock):
+    asyncio.run(store.issue(PHONE, "123456", ttl=60))
+    asyncio.run(store.issue("201000000001", "123456", ttl=600))
+    clock.now += 60
+    assert asyncio.run(store.sweep()) == 1
+    assert verify(store, "123456", phone="201000000001") == OTPStatus.VALID
+
+
+def test_codes_are_stored_as_hmac(tmp_path, monkeypatch):
+    key = otp_key(PHONE)
+    memory = InMemoryOTPStore()
+    asyncio.run(memory.issue(PHONE, "123456", ttl=600))
+    (stored_key, entry), = memory._entries.items()
+    assert stored_key == key != PHONE
+    assert entry.code_hash == hash_code(key, "123456")
+
+    path = tmp_path / "otp_codes.db"
+    asyncio.run(SQLiteOTPStore(str(path)).issue(PHONE, "123456", ttl=600))
+    rows = sqlite3.connect(path).execute("SELECT key, code_hash FROM otp_codes").fetchall()
+    assert rows == [(key, hash_code(key, "123456"))]
+    raw = b"".join(file.read_bytes() for file in tmp_path.glob("otp_codes.db*"))
+    assert b"123456" not in raw and PHONE.encode() not in raw
+
+    # The HMAC is keyed: the same code hashes differently under another secret
+    monkeypatch.setattr(settings, "SECRET_KEY", settings.SECRET_KEY + "-rotated")
+    assert hash_code(key, "123456") != rows[0][1]
+
+
+def test_password_reset_flow(client, register_user, monkeypatch):
+    user, _ = register_user()
+    phone = user["phone_number"]
+    monkeypatch.setattr(auth, "generate_otp", lambda: "482913")
+
+    assert client.post("/auth/forgot-password", json={"phone_number": phone}).status_code == 200
+    response = client.post("/auth/verify-otp", json={"phone_number": phone, "otp_code": "000000"})
+    assert (response.status_code, response.json()["detail"]) == (400, "Invalid OTP code")
+    response = client.post("/auth/verify-otp", json={"phone_number": phone, "otp_code": "482913"})
+    assert response.status_code == 200
+
+    change = {"phone_number": phone, "otp_code": "482913", "new_password": "new-secret"}
+    assert client.post("/auth/change-password", json=change).status_code == 200
+    login = client.post("/auth/login", data={"username": phone, "password": "new-secret"})
+    assert login.status_code == 200
+
+    # Single use: the code was consumed by the password change
+    change["new_password"] = "another-secret"
+    response = client.post("/auth/change-password", json=change)
+    assert response.status_code == 400
+
+
+def test_password_reset_locks_after_max_attempts(client, register_user, monkeypatch):
+    user, _ = register_user()
+    phone = user["phone_number"]
+    monkeypatch.setattr(auth, "generate_otp", lambda: "482913")
+    assert client.post("/auth/forgot-password", json={"phone_number": phone}).status_code == 200
+
+    wrong = {"phone_number": phone, "otp_code": "000000"}
+    for _ in range(settings.OTP_MAX_ATTEMPTS - 1):
+        assert client.post("/auth/verify-otp", json=wrong).status_code == 400
+    response = client.post("/auth/verify-otp", json=wrong)
+    assert response.json()["detail"] == "Too many invalid attempts, please request a new OTP"
+
+    response = client.post("/auth/verify-otp", json={"phone_number": phone, "otp_code": "482913"})
+    assert response.status_code == 400
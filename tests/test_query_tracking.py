@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.user import User
+from app.utils.dependencies import CurrentUserDep, DatabaseDep
+from app.utils.query_tracking import RepeatedQueryError
+
+
+@pytest.fixture
+def strict_mode(monkeypatch):
+    monkeypatch.setattr(settings, "SQL_MAX_REPEATED_STATEMENTS", 3)
+
+
+@pytest.fixture(scope="module")
+def looping_route(app):
+    @app.get("/_test/n-plus-one")
+    async def n_plus_one(current_user: CurrentUserDep, db: DatabaseDep):
+        for _ in range(5):
+            await db.execute(select(User).where(User.user_id == current_user.user_id))
+        return {}
+
+
+def test_strict_mode_rejects_repeated_statement(client, register_user, strict_mode, looping_route):
+    _, headers = register_user()
+
+    with pytest.raises(RepeatedQueryError):
+        client.get("/_test/n-plus-one", headers=headers)
+
+
+def test_strict_mode_allows_family_members_list(client, register_user, strict_mode):
+    _, headers = register_user()
+    for _ in range(5):
+        relative, _ = register_user()
+        response = client.post("/family-members", headers=headers, json={
+            "linked_user_code_number": relative["code_number"],
+            "relation": "Sibling",
+        })
+        assert response.status_code == 201, response.text
+
+    response = client.get("/family-members", headers=headers)
+
+    assert response.status_code == 200
+    assert len(response.json()) == 5
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+from starlette.requests import Request
+
+from app.config import settings
+from app.utils import rate_limit
+from app.utils.rate_limit import (
+    InMemoryBackend,
+    Rate,
+    SlidingWindow,
+    SQLiteBackend,
+    TokenBucket,
+    client_ip,
+)
+
+# Start of a fixed window for every period used below
+T0 = 3600.0 * 1000
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryBackend()
+    return SQLiteBackend(str(tmp_path / "rate_limits.db"))
+
+
+def hit(backend, algorithm, now, key="k"):
+    return asyncio.run(backend.hit(key, algorithm, now))
+
+
+def test_rate_parse():
+    assert Rate.parse("5/minute") == Rate(5, 60)
+    assert Rate.parse("3/15 minutes") == Rate(3, 900)
+    assert Rate.parse(" 100 / 10 seconds ") == Rate(100, 10)
+    with pytest.raises(ValueError):
+        Rate.parse("5 per minute")
+
+
+def test_sliding_window_limit_and_reset(backend):
+    window = SlidingWindow(Rate(3, 60))
+    assert [hit(backend, window, T0 + 10).allowed for _ in range(3)] == [True] * 3
+
+    rejected = hit(backend, window, T0 + 10)
+    assert not rejected.allowed
+    assert rejected.retry_after == pytest.approx(50)
+
+    # Two windows later nothing of the old counts is left
+    assert hit(backend, window, T0 + 120).allowed
+
+
+def test_sliding_window_weights_previous_window(backend):
+    window = SlidingWindow(Rate(3, 60))
+    for _ in range(3):
+        assert hit(backend, window, T0 + 59).allowed
+
+    # Halfway through the next window, half of the previous 3 still count
+    assert hit(backend, window, T0 + 90).allowed
+    rejected = hit(backend, window, T0 + 90)
+    assert not rejected.allowed
+    assert rejected.retry_after == pytest.approx(10)
+    assert not hit(backend, window, T0 + 90 + rejected.retry_after - 1).allowed
+    assert hit(backend, window, T0 + 90 + rejected.retry_after).allowed
+
+
+def test_token_bucket_burst_and_refill(backend):
+    bucket = TokenBucket(Rate(5, 60))
+    assert [hit(backend, bucket, T0).allowed for _ in range(5)] == [True] * 5
+
+    rejected = hit(backend, bucket, T0 + 1)
+    assert not rejected.allowed
+    # One token every 12 seconds, 1 second of which has already passed
+    assert rejected.retry_after == pytest.approx(11)
+    assert hit(backend, bucket, T0 + 12).allowed
+    assert not hit(backend, bucket, T0 + 12).allowed
+
+    # A full refill restores the whole burst
+    assert [hit(backend, bucket, T0 + 72).allowed for _ in range(6)] == [True] * 5 + [False]
+
+
+def test_keys_are_independent_and_clear_resets(backend):
+    bucket = TokenBucket(Rate(1, 60))
+    assert hit(backend, bucket, T0, key="a").allowed
+    assert not hit(backend, bucket, T0, key="a").allowed
+    assert hit(backend, bucket, T0, key="b").allowed
+
+    backend.clear()
+    assert hit(backend, bucket, T0, key="a").allowed
+
+
+def test_backends_agree(tmp_path):
+    memory = InMemoryBackend()
+    sqlite = SQLiteBackend(str(tmp_path / "rate_limits.db"))
+    algorithms = [SlidingWindow(Rate(4, 10)), TokenBucket(Rate(3, 10))]
+    for step in range(200):
+        now = T0 + step * 0.7
+        for number, algorithm in enumerate(algorithms):
+            key = f"{number}:{step % 3}"
+            assert hit(memory, algorithm, now, key) == hit(sqlite, algorithm, now, key)
+
+
+def test_client_ip_trusts_forwarded_for_only_when_configured(monkeypatch):
+    request = Request({
+        "type": "http",
+        "headers": [(b"x-forwarded-for", b"203.0.113.7, 10.0.0.1")],
+        "client": ("10.0.0.1", 50000),
+    })
+    assert asyncio.run(client_ip(request)) == "10.0.0.1"
+    monkeypatch.setattr(settings, "RATE_LIMIT_TRUST_FORWARDED_FOR", True)
+    assert asyncio.run(client_ip(request)) == "203.0.113.7"
+
+
+def test_login_returns_429_with_retry_after(client, register_user, monkeypatch):
+    user, _ = register_user()
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "backend", InMemoryBackend())
+    form = {"username": user["phone_number"], "password": "wrong-password"}
+
+    rate = Rate.parse(settings.RATE_LIMIT_LOGIN_PER_PHONE)
+    for _ in range(rate.limit):
+        assert client.post("/auth/login", data=form).status_code == 401
+
+    response = client.post("/auth/login", data=form)
+    assert response.status_code == 429
+    retry_after = int(response.headers["retry-after"])
+    assert 1 <= retry_after <= rate.period
+    assert rate_limit.login_rate_limit.stats()["rejected"] >= 1
+
+    # The phone rule is per number: another account is still let through
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", False)
+    other, _ = register_user()
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    response = client.post("/auth/login", data={"username": other["phone_number"], "password": "secret123"})
+    assert response.status_code == 200
@@ -0,0 +1,21 @@
+def test_sync_after_linked_user_deletes_account(client, register_user):
+    _, headers = register_user()
+    relative, relative_headers = register_user()
+    response = client.post("/family-members", headers=headers, json={
+        "linked_user_code_number": relative["code_number"],
+        "relation": "Parent",
+    })
+    assert response.status_code == 201, response.text
+    family_id = response.json()["family_id"]
+
+    cursor = client.get("/sync", headers=headers).json()["next_cursor"]
+    assert client.delete("/users/me", headers=relative_headers).status_code == 204
+
+    response = client.get("/sync", headers=headers, params={"since": cursor})
+    assert response.status_code == 200, response.text
+    (change,) = response.json()["changes"]
+    assert change["type"] == "family_member"
+    assert change["data"]["family_id"] == family_id
+    assert change["data"]["linked_user_id"] is None
+    assert change["data"]["linked_user_code_number"] is None
+    assert change["data"]["name"] == f"{relative['first_name']} {relative['last_name']}"
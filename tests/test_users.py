@@ -0,0 +1,17 @@
+def test_record_after_linked_user_deletes_account(client, register_user):
+    _, headers = register_user()
+    relative, relative_headers = register_user()
+    response = client.post("/family-members", headers=headers, json={
+        "linked_user_code_number": relative["code_number"],
+        "relation": "Child",
+    })
+    assert response.status_code == 201, response.text
+    assert client.delete("/users/me", headers=relative_headers).status_code == 204
+
+    for params in ({}, {"include": "family_members"}):
+        response = client.get("/users/me/record", headers=headers, params=params)
+        assert response.status_code == 200, response.text
+        (member,) = response.json()["family_members"]
+        assert member["linked_user_id"] is None
+        assert member["linked_user_code_number"] is None
+        assert member["name"] == f"{relative['first_name']} {relative['last_name']}"